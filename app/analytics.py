@@ -0,0 +1,309 @@
+"""
+HebiKata - Classroom Analytics
+
+Server-side store of every learner's progress for the teacher dashboard
+(app/pages/teacher.py). Each save_progress() feeds the learner's snapshot
+in with ingest(), which overwrites that learner's row in place, so the
+store is always current without rereading anyone's saved progress.
+
+Data is kept column-wise in ``array`` buffers: one learners × exercises
+matrix (flattened row by row) each for attempts, successes, hint levels
+and attempts-to-mastery, plus per-learner score and classroom columns.
+Aggregates run over whole columns at once with NumPy when it is installed
+and with plain loops otherwise, and are cached until the next ingest.
+
+Each content pack has its own store. Its columns are keyed by exercise id,
+so when a pack's exercises change, snapshots from the new content add
+columns for new exercises and land in the right ones for the rest;
+columns of removed exercises stay behind, and the dashboard just never
+asks for them. Snapshots whose lists do not line up with their exercise
+ids are rejected and counted. Like the in-memory leaderboard, the stores
+cover the learners seen by this process since it started.
+"""
+
+import statistics
+import threading
+import warnings
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with streamlit
+    np = None
+
+# Width of the score histogram buckets (one success is worth 50 points).
+SCORE_BUCKET = 50
+
+
+@dataclass(frozen=True, slots=True)
+class ClassroomSummary:
+    """Aggregates over a set of learners; per-exercise lists follow exercise_ids."""
+
+    exercise_ids: list[str]
+    learners: int
+    attempts: list[int]
+    failure_rate: list[float]
+    median_attempts_to_mastery: list[float | None]
+    hint_usage: list[float]
+    score_histogram: list[tuple[int, int]]  # (bucket lower bound, learners)
+
+
+class AnalyticsStore:
+    """
+    Column-oriented progress of all learners over one curriculum.
+
+    Args:
+        mastery_threshold: Successes that count as mastering an exercise.
+    """
+
+    def __init__(self, mastery_threshold: int) -> None:
+        self.mastery_threshold = mastery_threshold
+        self.exercise_ids: list[str] = []
+        # Snapshots ingest() turned away (see the module docstring).
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._columns: dict[str, int] = {}
+        self._rows: dict[str, int] = {}
+        self._classrooms: dict[str, int] = {"": 0}
+        # learners × exercises, row-major
+        self._attempts = array("I")
+        self._successes = array("I")
+        self._hint_levels = array("b")
+        self._mastery_attempts = array("I")  # 0 = not mastered yet
+        # per learner
+        self._scores = array("i")
+        self._classroom = array("I")
+        self._version = 0
+        self._cache: dict[str | None, tuple[int, ClassroomSummary]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def classrooms(self) -> list[str]:
+        """Classroom codes with at least one learner, sorted."""
+        with self._lock:
+            return sorted(code for code in self._classrooms if code)
+
+    def ingest(
+        self, learner_id: str, classroom: str | None, snapshot: dict[str, Any]
+    ) -> bool:
+        """
+        Store a learner's progress snapshot, replacing any previous one.
+
+        Returns:
+            False if the snapshot has no exercise ids, or per-exercise lists
+            of another length; ``rejected`` counts these.
+        """
+        ids = snapshot.get("exercise_ids")
+        n = len(snapshot["successes"])
+        if ids is None or not (
+            len(ids) == n == len(snapshot["attempts"]) == len(snapshot["hint_levels"])
+        ):
+            with self._lock:
+                self.rejected += 1
+            return False
+
+        with self._lock:
+            if ids != self.exercise_ids:
+                self._add_columns([i for i in ids if i not in self._columns])
+            width = len(self.exercise_ids)
+
+            row = self._rows.get(learner_id)
+            if row is None:
+                row = self._rows[learner_id] = len(self._scores)
+                for column in self._matrix_columns():
+                    column.extend(bytes(width * column.itemsize))
+                self._scores.append(0)
+                self._classroom.append(0)
+
+            start, stop = row * width, (row + 1) * width
+            if ids == self.exercise_ids:
+                cells: range | list[int] = range(start, stop)
+                self._attempts[start:stop] = array("I", snapshot["attempts"])
+                self._successes[start:stop] = array("I", snapshot["successes"])
+                self._hint_levels[start:stop] = array("b", snapshot["hint_levels"])
+            else:
+                cells = [start + self._columns[i] for i in ids]
+                self._set_cells(start, width, cells, snapshot)
+            for i in cells:
+                if (
+                    not self._mastery_attempts[i]
+                    and self._successes[i] >= self.mastery_threshold
+                ):
+                    self._mastery_attempts[i] = self._attempts[i]
+            self._scores[row] = snapshot["score"]
+            self._classroom[row] = self._classrooms.setdefault(
+                classroom or "", len(self._classrooms)
+            )
+            self._version += 1
+        return True
+
+    def _add_columns(self, new_ids: list[str]) -> None:
+        """Widen every learner's row for exercises first seen now."""
+        if not new_ids:
+            return
+        old, rows = len(self.exercise_ids), len(self._scores)
+        new = old + len(new_ids)
+        widened = []
+        for column in self._matrix_columns():
+            wide = array(column.typecode, bytes(rows * new * column.itemsize))
+            for row in range(rows):
+                wide[row * new : row * new + old] = column[row * old : (row + 1) * old]
+            widened.append(wide)
+        (
+            self._attempts,
+            self._successes,
+            self._hint_levels,
+            self._mastery_attempts,
+        ) = widened
+        for exercise_id in new_ids:
+            self._columns[exercise_id] = len(self.exercise_ids)
+            self.exercise_ids.append(exercise_id)
+
+    def _set_cells(
+        self, start: int, width: int, cells: list[int], snapshot: dict[str, Any]
+    ) -> None:
+        """Write a snapshot that covers some of the columns, in its own order."""
+        kept = set(cells)
+        for i in range(start, start + width):
+            if i not in kept:  # exercise not in this learner's curriculum
+                self._attempts[i] = self._successes[i] = 0
+                self._mastery_attempts[i] = 0
+                self._hint_levels[i] = -1
+        for i, attempts, successes, hint_level in zip(
+            cells,
+            snapshot["attempts"],
+            snapshot["successes"],
+            snapshot["hint_levels"],
+            strict=True,
+        ):
+            self._attempts[i] = attempts
+            self._successes[i] = successes
+            self._hint_levels[i] = hint_level
+
+    def _matrix_columns(self) -> tuple[array, array, array, array]:
+        return (
+            self._attempts,
+            self._successes,
+            self._hint_levels,
+            self._mastery_attempts,
+        )
+
+    def summary(self, classroom: str | None = None) -> ClassroomSummary:
+        """Aggregates over all learners, or over one classroom's."""
+        with self._lock:
+            cached = self._cache.get(classroom)
+            if cached is not None and cached[0] == self._version:
+                return cached[1]
+            version = self._version
+            exercise_ids = list(self.exercise_ids)
+            class_id = self._classrooms.get(classroom or "", -1)
+            # Copies, so numpy views never pin the live, growable buffers.
+            columns = [array(c.typecode, c) for c in self._matrix_columns()]
+            scores = array("i", self._scores)
+            rows = array("I", self._classroom)
+
+        if classroom is not None:
+            selected = [r for r, c in enumerate(rows) if c == class_id]
+        else:
+            selected = list(range(len(scores)))
+        aggregate = _aggregate_numpy if np is not None else _aggregate_python
+        result = aggregate(columns, scores, selected, exercise_ids)
+        with self._lock:
+            self._cache[classroom] = (version, result)
+        return result
+
+
+def _aggregate_numpy(
+    columns: list[array], scores: array, selected: list[int], exercise_ids: list[str]
+) -> ClassroomSummary:
+    assert np is not None
+    n = len(exercise_ids)
+    index = np.asarray(selected, dtype=np.intp)
+    attempts, successes, hint_levels, mastery = (
+        np.frombuffer(c, dtype=c.typecode).reshape(-1, n)[index] if n else None
+        for c in columns
+    )
+    if attempts is None or not len(index):
+        return _empty_summary(exercise_ids)
+
+    total = attempts.sum(axis=0, dtype=np.int64)
+    failed = total - successes.sum(axis=0, dtype=np.int64)
+    tried = (attempts > 0).sum(axis=0)
+    hinted = ((hint_levels >= 0) & (attempts > 0)).sum(axis=0)
+    to_mastery = np.where(mastery > 0, mastery, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # no one mastered yet
+        medians = np.nanmedian(to_mastery, axis=0)
+    counts = np.bincount(np.frombuffer(scores, dtype=np.int32)[index] // SCORE_BUCKET)
+    return ClassroomSummary(
+        exercise_ids=exercise_ids,
+        learners=len(index),
+        attempts=total.tolist(),
+        failure_rate=np.divide(
+            failed, total, out=np.zeros(n), where=total > 0
+        ).tolist(),
+        median_attempts_to_mastery=[None if np.isnan(m) else float(m) for m in medians],
+        hint_usage=np.divide(hinted, tried, out=np.zeros(n), where=tried > 0).tolist(),
+        score_histogram=[
+            (int(b) * SCORE_BUCKET, int(c)) for b, c in enumerate(counts) if c
+        ],
+    )
+
+
+def _aggregate_python(
+    columns: list[array], scores: array, selected: list[int], exercise_ids: list[str]
+) -> ClassroomSummary:
+    n = len(exercise_ids)
+    if not n or not selected:
+        return _empty_summary(exercise_ids)
+    attempts, successes, hint_levels, mastery = columns
+    total, failed, tried, hinted = [0] * n, [0] * n, [0] * n, [0] * n
+    to_mastery: list[list[int]] = [[] for _ in range(n)]
+    for row in selected:
+        base = row * n
+        for i in range(n):
+            tries = attempts[base + i]
+            total[i] += tries
+            failed[i] += tries - successes[base + i]
+            if tries:
+                tried[i] += 1
+                if hint_levels[base + i] >= 0:
+                    hinted[i] += 1
+            if mastery[base + i]:
+                to_mastery[i].append(mastery[base + i])
+    counts = Counter(scores[row] // SCORE_BUCKET for row in selected)
+    return ClassroomSummary(
+        exercise_ids=exercise_ids,
+        learners=len(selected),
+        attempts=total,
+        failure_rate=[f / t if t else 0.0 for f, t in zip(failed, total, strict=True)],
+        median_attempts_to_mastery=[
+            float(statistics.median(m)) if m else None for m in to_mastery
+        ],
+        hint_usage=[h / t if t else 0.0 for h, t in zip(hinted, tried, strict=True)],
+        score_histogram=[(b * SCORE_BUCKET, counts[b]) for b in sorted(counts)],
+    )
+
+
+def _empty_summary(exercise_ids: list[str]) -> ClassroomSummary:
+    n = len(exercise_ids)
+    return ClassroomSummary(
+        exercise_ids, 0, [0] * n, [0.0] * n, [None] * n, [0.0] * n, []
+    )
+
+
+_stores: dict[str, AnalyticsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_analytics(pack: str, mastery_threshold: int) -> AnalyticsStore:
+    """A content pack's store, shared by all sessions and the teacher page."""
+    store = _stores.get(pack)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(pack, AnalyticsStore(mastery_threshold))
+    return store
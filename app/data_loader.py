@@ -4,21 +4,205 @@ HebiKata - Exercise Data Loader
 Loads exercise definitions from individual YAML files via the index registry.
 Each exercise is stored as data/exercises/{ref}.yaml and referenced in
 data/index.yaml.
+
+A curriculum is a content pack: a directory with ``index.yaml``,
+``exercises/``, ``solutions/`` and optionally ``fixtures/`` (data files
+exercises bind as read-only globals, see app.fixtures). The built-in
+``data/`` tree is the "core" pack; every subdirectory of ``packs/`` (or
+``HEBIKATA_PACKS_DIR``) with an index is another one, selected per
+session with ``?pack=NAME``.
+
+Loaded packs are cached by content hash with their reference solutions
+and compiled tests, so identical packs share one entry and an edited pack
+is reloaded. At most ``HEBIKATA_PACK_CACHE_SIZE`` packs stay cached; the
+least recently used one is evicted first. Sessions keep the exercise list
+they loaded, so an evicted pack only stays in memory while sessions use it.
 """
 
+import contextlib
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
+from types import CodeType
 from typing import Any
 
 import streamlit as st
 import yaml
 
+from app import metrics
+from app.env import env_int
+from app.fixtures import FIXTURES_DIR, resolve_fixtures
+
+PACKS_DIR_ENV = "HEBIKATA_PACKS_DIR"
+PACK_CACHE_SIZE_ENV = "HEBIKATA_PACK_CACHE_SIZE"
+DEFAULT_PACK = "core"
+DEFAULT_PACK_CACHE_SIZE = 4
+
+_PACK_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
 
 def _data_dir() -> Path:
     return Path(__file__).parent.parent / "data"
 
 
-@st.cache_data(show_spinner=False)
-def load_exercises() -> list[dict[str, Any]]:
+def _packs_dir() -> Path:
+    return Path(os.environ.get(PACKS_DIR_ENV) or _data_dir().parent / "packs")
+
+
+def available_packs() -> dict[str, Path]:
+    """Installed content packs by name, core first."""
+    packs = {DEFAULT_PACK: _data_dir()}
+    root = _packs_dir()
+    if root.is_dir():
+        for entry in sorted(root.iterdir()):
+            if (
+                entry.name not in packs
+                and _PACK_NAME.fullmatch(entry.name)
+                and (entry / "index.yaml").is_file()
+            ):
+                packs[entry.name] = entry
+    return packs
+
+
+@dataclass(slots=True)
+class PackContent:
+    """Everything cached for one version of a content pack."""
+
+    content_hash: str
+    exercises: list[dict[str, Any]]
+    solutions: dict[str, str]
+    # Test source -> code object, compiled as exec() would compile it.
+    compiled_tests: dict[str, CodeType]
+
+
+def _pack_files(path: Path) -> list[Path]:
+    files = [path / "index.yaml"]
+    for sub, pattern in (
+        ("exercises", "*.yaml"),
+        ("solutions", "*.py"),
+        (FIXTURES_DIR, "**/*"),
+    ):
+        files.extend(sorted((path / sub).glob(pattern)))
+    return files
+
+
+class PackCache:
+    """
+    LRU cache of loaded content packs, keyed by content hash.
+
+    Args:
+        max_packs: Packs kept before the least recently used is evicted.
+    """
+
+    def __init__(self, max_packs: int = DEFAULT_PACK_CACHE_SIZE) -> None:
+        self.max_packs = max(1, max_packs)
+        # Guards _packs and _load_locks only; packs load outside it.
+        self._lock = threading.Lock()
+        self._packs: OrderedDict[str, PackContent] = OrderedDict()
+        # Pack dir -> lock held while that pack is hashed or loaded, so a
+        # slow pack delays only the sessions waiting for the same pack.
+        self._load_locks: dict[Path, threading.Lock] = {}
+        # Pack dir -> (file sizes and mtimes, content hash), so unchanged
+        # packs are recognized without rereading their files.
+        self._hashes: dict[Path, tuple[tuple[tuple[str, int, int], ...], str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._packs)
+
+    def get(self, path: Path) -> PackContent:
+        """The cached content of the pack at ``path``, loading it if needed."""
+        files = _pack_files(path)
+        with self._lock:
+            load_lock = self._load_locks.setdefault(path, threading.Lock())
+        with load_lock:
+            content_hash = self._content_hash(path, files)
+            with self._lock:
+                content = self._packs.get(content_hash)
+                if content is not None:
+                    self._packs.move_to_end(content_hash)
+                    return content
+
+            metrics.EXERCISE_LOADS.inc()
+            with metrics.EXERCISE_LOAD_SECONDS.time():
+                content = _load_pack(path, content_hash)
+            with self._lock:
+                # Another directory with identical content may have won.
+                content = self._packs.setdefault(content_hash, content)
+                self._packs.move_to_end(content_hash)
+                while len(self._packs) > self.max_packs:
+                    self._packs.popitem(last=False)
+                    metrics.PACK_EVICTIONS.inc()
+            return content
+
+    def _content_hash(self, path: Path, files: list[Path]) -> str:
+        stats = []
+        for file in files:
+            try:
+                info = file.stat()
+            except FileNotFoundError:
+                continue
+            stats.append((file.name, info.st_mtime_ns, info.st_size))
+        fingerprint = tuple(stats)
+        known = self._hashes.get(path)
+        if known is not None and known[0] == fingerprint:
+            return known[1]
+
+        digest = hashlib.sha256()
+        for file in files:
+            if file.is_file():
+                digest.update(str(file.relative_to(path)).encode("utf-8") + b"\0")
+                digest.update(file.read_bytes())
+        content_hash = digest.hexdigest()
+        self._hashes[path] = (fingerprint, content_hash)
+        return content_hash
+
+    def compiled_tests(self, source: str) -> CodeType | None:
+        """Code object for test source from any cached pack, if present."""
+        with self._lock:
+            for content in self._packs.values():
+                code = content.compiled_tests.get(source)
+                if code is not None:
+                    return code
+        return None
+
+
+def _load_pack(path: Path, content_hash: str) -> PackContent:
+    exercises = read_exercises(path)
+    solutions = {
+        file.stem: file.read_text(encoding="utf-8")
+        for file in sorted((path / "solutions").glob("*.py"))
+    }
+    compiled: dict[str, CodeType] = {}
+    for exercise in exercises:
+        source = exercise.get("validation", {}).get("tests")
+        if isinstance(source, str) and source not in compiled:
+            # A test that does not compile is left for the engine to report.
+            with contextlib.suppress(SyntaxError):
+                compiled[source] = compile(source, "<string>", "exec")
+    return PackContent(content_hash, exercises, solutions, compiled)
+
+
+_pack_cache = PackCache(env_int(PACK_CACHE_SIZE_ENV, DEFAULT_PACK_CACHE_SIZE))
+
+
+def load_pack(pack: str = DEFAULT_PACK) -> PackContent:
+    """
+    Cached content of an installed pack.
+
+    Raises:
+        KeyError: No pack of that name is installed.
+    """
+    path = available_packs().get(pack)
+    if path is None:
+        raise KeyError(f"Unknown content pack: {pack!r}")
+    return _pack_cache.get(path)
+
+
+def load_exercises(pack: str = DEFAULT_PACK) -> list[dict[str, Any]]:
     """
     Load exercises from individual YAML files via index.yaml registry.
 
@@ -26,10 +210,42 @@ def load_exercises() -> list[dict[str, Any]]:
         Ordered list of exercise dictionaries. Invalid/missing files
         are logged and skipped so the app can degrade gracefully.
 
-    Cached via ``@st.cache_data`` to avoid re-reading all YAML files
-    on every Streamlit rerun.
+    The list is shared by every session on the same pack version and must
+    not be modified.
+    """
+    metrics.EXERCISE_CACHE_REQUESTS.inc()
+    return load_pack(pack).exercises
+
+
+def load_reference_solution(ref: str, pack: str = DEFAULT_PACK) -> str:
+    """
+    Return the reference solution ``solutions/{ref}.py`` of a pack.
+
+    Performance katas time the learner's code against it.
+    """
+    solutions = load_pack(pack).solutions
+    try:
+        return solutions[ref]
+    except KeyError:
+        raise FileNotFoundError(f"No reference solution for {ref!r}") from None
+
+
+def compiled_tests(source: str) -> CodeType | None:
+    """Cached code object for ``validation.tests`` source, if a pack has it."""
+    return _pack_cache.compiled_tests(source)
+
+
+def read_exercises(data: Path) -> list[dict[str, Any]]:
+    """
+    Read the exercises registered in ``data/index.yaml`` without caching.
+
+    Args:
+        data: Directory containing ``index.yaml`` and ``exercises/``.
+
+    Returns:
+        Ordered list of exercise dictionaries (see ``load_exercises()``),
+        with ``validation.fixtures`` resolved to their files.
     """
-    data = _data_dir()
     index_path = data / "index.yaml"
 
     if not index_path.is_file():
@@ -44,8 +260,12 @@ def load_exercises() -> list[dict[str, Any]]:
         ex_path = data / "exercises" / f"{ref}.yaml"
         try:
             with open(ex_path, encoding="utf-8") as f:
-                exercises.append(yaml.safe_load(f))
-        except (FileNotFoundError, yaml.YAMLError, KeyError) as e:
+                exercise = yaml.safe_load(f)
+            validation = exercise.get("validation") or {}
+            if validation.get("fixtures"):
+                validation["fixtures"] = resolve_fixtures(data, validation["fixtures"])
+            exercises.append(exercise)
+        except (OSError, ValueError, yaml.YAMLError, KeyError) as e:
             st.error(f"Failed to load exercise `{ref}`: {e}")
             continue
 
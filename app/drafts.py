@@ -0,0 +1,136 @@
+"""
+HebiKata - Code Drafts
+
+Unfinished code per exercise, so navigating away and back (or reloading
+the page) keeps the learner's work. Drafts are stored in localStorage under
+their own key, next to the progress key, so the progress saved on every
+submission stays small.
+
+Each draft is zlib-compressed and base64-encoded, which also keeps it free
+of the quotes and backslashes that localStorage writes through JavaScript
+would otherwise need escaped. The stored blob is kept under BUDGET_CHARS,
+well below the smallest browser localStorage quota (5 MB), by evicting the
+least recently edited drafts first; a draft that does not fit on its own
+is not kept.
+"""
+
+import base64
+import binascii
+import json
+import time
+import zlib
+
+BUDGET_CHARS = 512 * 1024
+
+
+def encode(code: str) -> str:
+    """Compress source code into a quote-free ASCII string."""
+    return base64.b64encode(zlib.compress(code.encode("utf-8"), 9)).decode("ascii")
+
+
+def decode(data: str) -> str:
+    return zlib.decompress(base64.b64decode(data)).decode("utf-8")
+
+
+def _entry_chars(exercise_id: str, saved_at: int, data: str) -> int:
+    # '"id":[saved_at,"data"],' in the serialized blob
+    return len(exercise_id) + len(str(saved_at)) + len(data) + 9
+
+
+class DraftStore:
+    """
+    Compressed drafts by exercise id, least recently edited first.
+
+    Args:
+        budget_chars: Maximum length of the serialized store.
+    """
+
+    def __init__(self, budget_chars: int = BUDGET_CHARS) -> None:
+        self.budget_chars = budget_chars
+        self.dirty = False
+        self._drafts: dict[str, tuple[int, str]] = {}
+        self._chars = 1  # "{}", less the comma counted for the last entry
+
+    def __len__(self) -> int:
+        return len(self._drafts)
+
+    def __contains__(self, exercise_id: object) -> bool:
+        return exercise_id in self._drafts
+
+    def get(self, exercise_id: str) -> str | None:
+        entry = self._drafts.get(exercise_id)
+        return None if entry is None else decode(entry[1])
+
+    def put(
+        self,
+        exercise_id: str,
+        code: str,
+        initial_code: str,
+        now: float | None = None,
+    ) -> None:
+        """
+        Keep ``code`` as the exercise's draft.
+
+        Code equal to the exercise's ``initial_code`` needs no draft, so any
+        existing one is discarded.
+        """
+        if code == initial_code:
+            self.discard(exercise_id)
+            return
+        data = encode(code)
+        entry = self._drafts.get(exercise_id)
+        if entry is not None and entry[1] == data:
+            return
+        self.discard(exercise_id)
+        saved_at = int(time.time() if now is None else now)
+        chars = _entry_chars(exercise_id, saved_at, data)
+        if chars + 1 > self.budget_chars:
+            return
+        self._drafts[exercise_id] = (saved_at, data)
+        self._chars += chars
+        self.dirty = True
+        while self._chars > self.budget_chars:
+            self.discard(next(iter(self._drafts)))
+
+    def discard(self, exercise_id: str) -> None:
+        entry = self._drafts.pop(exercise_id, None)
+        if entry is not None:
+            self._chars -= _entry_chars(exercise_id, *entry)
+            self.dirty = True
+
+    def dumps(self) -> str:
+        """Serialize for localStorage."""
+        return json.dumps(
+            {ex_id: [t, data] for ex_id, (t, data) in self._drafts.items()},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def loads(cls, raw: str | None, budget_chars: int = BUDGET_CHARS) -> "DraftStore":
+        """
+        Restore a store from dumps() output.
+
+        Corrupt input yields an empty store; unreadable drafts are dropped.
+        """
+        store = cls(budget_chars)
+        try:
+            saved = json.loads(raw) if raw else {}
+        except (json.JSONDecodeError, TypeError):
+            return store
+        if not isinstance(saved, dict):
+            return store
+        entries = []
+        for exercise_id, entry in saved.items():
+            try:
+                saved_at, data = int(entry[0]), str(entry[1])
+                decode(data)
+            except (TypeError, ValueError, IndexError, binascii.Error, zlib.error):
+                continue
+            entries.append((saved_at, exercise_id, data))
+        for saved_at, exercise_id, data in sorted(entries):
+            store._drafts[exercise_id] = (saved_at, data)
+            store._chars += _entry_chars(exercise_id, saved_at, data)
+        while store._chars > budget_chars:
+            store.discard(next(iter(store._drafts)))
+        store.dirty = False
+        return store
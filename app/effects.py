@@ -0,0 +1,63 @@
+"""
+HebiKata - Browser Effects
+
+Result animations and 8-bit sounds played entirely in the browser by a
+hidden custom component (app/components/effects). After a graded run the
+server builds one compact event (outcome, curriculum progress and,
+when the result has an execution trace, the sequence of executed lines)
+and renders the component with it; the canvas animation and the audio,
+synthesized into buffers when the component loads, then run without any
+further reruns.
+
+The component stays mounted at the same place in every run so an
+animation is never cut short, and it plays each event id once, so reruns
+that resend the same event are ignored.
+"""
+
+import uuid
+from pathlib import Path
+from typing import Any
+
+import streamlit.components.v1 as components
+
+from app.tracing import ExecutionTrace
+
+EFFECTS_KEY = "effects"
+
+# Executed lines sent for the snake to follow.
+MAX_TRACE_POINTS = 200
+
+_component = components.declare_component(
+    "effects", path=str(Path(__file__).parent / "components" / "effects")
+)
+
+
+def effect_event(
+    result: dict[str, Any], mastered: int, total: int, mastery: bool
+) -> dict[str, Any]:
+    """
+    The compact payload describing one graded run.
+
+    Args:
+        result: Grading result (``success`` and an optional ``trace``).
+        mastered: Exercises mastered so far.
+        total: Exercises in the curriculum.
+        mastery: Whether this run mastered the current exercise.
+    """
+    trace = result.get("trace")
+    lines = (
+        trace.lines[:MAX_TRACE_POINTS].tolist()
+        if isinstance(trace, ExecutionTrace) and len(trace)
+        else None
+    )
+    return {
+        "id": uuid.uuid4().hex[:12],
+        "kind": "mastery" if mastery else "pass" if result["success"] else "fail",
+        "progress": [mastered, total],
+        "trace": lines,
+    }
+
+
+def play_effects(event: dict[str, Any] | None) -> None:
+    """Render the effects component with the latest event, if any."""
+    _component(event=event, key=EFFECTS_KEY, default=None)
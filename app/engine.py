@@ -5,15 +5,31 @@ Provides the execute_code_with_tests() function that runs user-provided
 Python code in a sandboxed namespace and validates it against test functions.
 """
 
-import traceback
+import builtins
+from collections.abc import Collection, Mapping
+from types import CodeType
 from typing import Any
 
+from app import imports as sandbox_imports
+from app import tracing
+from app.errors import ErrorReport
+from app.fixtures import fixture_views
+from app.profiler import profiled
+
+# Engine frames are noise in the tracebacks shown to learners.
+_HIDDEN_FILES = frozenset({__file__, sandbox_imports.__file__})
+
+# ``__name__`` of the module learner code runs as.
+KATA_MODULE = "kata"
+
 _SAFE_BUILTINS: dict[str, Any] = {
     "True": True,
     "False": False,
     "None": None,
     "Ellipsis": Ellipsis,
     "NotImplemented": NotImplemented,
+    # class statements (``__import__`` is added per run by new_namespace())
+    "__build_class__": builtins.__build_class__,
     # type constructors
     "bool": bool,
     "int": int,
@@ -110,29 +126,93 @@ _SAFE_BUILTINS: dict[str, Any] = {
 }
 
 
-def execute_code_with_tests(user_code: str, test_code: str) -> dict[str, Any]:
+def new_namespace(
+    imports: Collection[str] | None = None,
+    modules: Mapping[str, str] | None = None,
+    fixtures: Mapping[str, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    Fresh globals for running learner code.
+
+    Args:
+        imports: Stdlib modules that may be imported; None for the default
+            set (see app.imports.SAFE_MODULES).
+        modules: Helper module sources by name, importable as well.
+        fixtures: Resolved data fixtures (see app.fixtures), bound as
+            read-only memoryviews under their names.
+    """
+    run_builtins = dict(_SAFE_BUILTINS)
+    run_builtins["__import__"] = sandbox_imports.Importer(
+        imports, modules, run_builtins
+    )
+    return {
+        "__builtins__": run_builtins,
+        "__name__": KATA_MODULE,
+        **fixture_views(fixtures),
+    }
+
+
+@profiled
+def execute_code_with_tests(
+    user_code: str,
+    test_code: str | CodeType,
+    trace: bool = False,
+    imports: Collection[str] | None = None,
+    modules: Mapping[str, str] | None = None,
+    fixtures: Mapping[str, Any] | None = None,
+) -> dict[str, Any]:
     """
     Execute user code and run test functions against it in a sandboxed namespace.
 
     Args:
         user_code: The user's Python code to execute and test.
-        test_code: Test function code (must define a function starting with 'test_').
+        test_code: Test function code (must define a function starting with
+            'test_'), as source or compiled for exec().
+        trace: Also record the lines of user code executed, including those
+            run from inside the tests (see app.tracing).
+        imports: Importable stdlib modules (``validation.imports``); None for
+            the default set.
+        modules: Helper modules the code may import (``validation.modules``).
+        fixtures: Data fixtures bound as globals (``validation.fixtures``,
+            as resolved by the data loader).
 
     Returns:
         Dict with keys:
             - success (bool): True if all tests passed.
             - message (str): User-friendly success/failure message.
-            - error (str | None): Error traceback if failed, None if success.
+            - error (ErrorReport | str | None): Traceback report for
+              exceptions, the assertion message for failed tests, None on
+              success. Use ``str()`` to format it.
+            - trace (ExecutionTrace | None): Only when ``trace`` is True; None
+              if tracing is unavailable or the code does not compile.
     """
-    namespace: dict[str, Any] = {"__builtins__": _SAFE_BUILTINS}
+    namespace = new_namespace(imports, modules, fixtures)
+    if not trace:
+        return _run(user_code, test_code, namespace)
+
+    try:
+        code = compile(user_code, "<string>", "exec")
+    except Exception:
+        code = None
+    if code is None:
+        # Let the untraced run report the error exactly as it normally would.
+        return {**_run(user_code, test_code, namespace), "trace": None}
+
+    with tracing.capture(code) as recorded:
+        result = _run(code, test_code, namespace)
+    return {**result, "trace": recorded}
+
 
+def _run(
+    user_code: str | CodeType, test_code: str | CodeType, namespace: dict[str, Any]
+) -> dict[str, Any]:
     try:
         exec(user_code, namespace)
     except Exception as e:
         return {
             "success": False,
             "message": f"❌ Error: {type(e).__name__}",
-            "error": traceback.format_exc(),
+            "error": ErrorReport.from_exception(e, _HIDDEN_FILES),
         }
 
     try:
@@ -141,7 +221,7 @@ def execute_code_with_tests(user_code: str, test_code: str) -> dict[str, Any]:
         return {
             "success": False,
             "message": f"❌ Error: {type(e).__name__}",
-            "error": traceback.format_exc(),
+            "error": ErrorReport.from_exception(e, _HIDDEN_FILES),
         }
 
     test_funcs = [
@@ -170,7 +250,7 @@ def execute_code_with_tests(user_code: str, test_code: str) -> dict[str, Any]:
         return {
             "success": False,
             "message": f"❌ Error: {type(e).__name__}",
-            "error": traceback.format_exc(),
+            "error": ErrorReport.from_exception(e, _HIDDEN_FILES),
         }
 
     return {"success": True, "message": "✅ All tests passed!", "error": None}
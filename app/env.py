@@ -0,0 +1,53 @@
+"""
+HebiKata - Environment Settings
+
+Reads the ``HEBIKATA_*`` environment variables. An unset, empty or
+malformed value means the default, so a typo in a deployment falls back
+to the documented behaviour instead of failing every rerun.
+"""
+
+import math
+import os
+
+_TRUE = frozenset({"1", "true", "yes", "on"})
+
+
+def env_flag(name: str) -> bool:
+    """Whether ``name`` is set to 1, true, yes or on (any case)."""
+    return os.environ.get(name, "").strip().lower() in _TRUE
+
+
+def env_float(name: str, default: float, minimum: float | None = None) -> float:
+    """
+    ``name`` as a finite float, or ``default``.
+
+    Args:
+        minimum: Smaller values (not the default) are raised to this.
+    """
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    if not math.isfinite(value):
+        return default
+    return value if minimum is None else max(minimum, value)
+
+
+def env_int(name: str, default: int, minimum: int | None = None) -> int:
+    """
+    ``name`` as an integer, or ``default``.
+
+    Args:
+        minimum: Smaller values (not the default) are raised to this.
+    """
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if minimum is None else max(minimum, value)
@@ -0,0 +1,125 @@
+"""
+HebiKata - Error Reports
+
+Compact, structured replacement for ``traceback.format_exc()`` strings in
+engine results. An ErrorReport keeps only what the "Error Details" panel
+shows: the exception summary and a short list of learner-facing frames.
+
+- Frames from the grading harness (app/engine.py, app/performance.py) are
+  dropped; learners only need their own code and the tests.
+- Runs of the same frame, as in a RecursionError, are stored once with a
+  repeat count and printed the way CPython does.
+- At most MAX_FRAMES entries and MAX_SUMMARY_CHARS of message are kept.
+- Nothing is formatted until ``str()`` is called, and no traceback or frame
+  objects are retained, so a failing run does not pin the learner's
+  namespaces in session state.
+
+Chained exceptions (``__cause__``/``__context__``) are not included.
+"""
+
+import linecache
+import traceback
+from collections.abc import Collection
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+
+MAX_FRAMES = 20
+MAX_SUMMARY_CHARS = 2_000
+
+# Frames kept from the start and the end of the stack when it is capped.
+_HEAD_FRAMES = 5
+# CPython prints a repeated frame this many times before collapsing it.
+_RECURSION_CUTOFF = 3
+
+
+class ErrorFrame(NamedTuple):
+    filename: str
+    lineno: int
+    name: str
+    repeats: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class ErrorReport:
+    """A learner-facing traceback, formatted on demand."""
+
+    exc_type: str
+    summary: str
+    frames: tuple[ErrorFrame, ...] = ()
+    omitted: int = 0
+
+    @classmethod
+    def from_exception(
+        cls, exc: BaseException, hidden_files: Collection[str] = ()
+    ) -> "ErrorReport":
+        """
+        Capture ``exc`` and its traceback.
+
+        Args:
+            exc: The exception being handled.
+            hidden_files: Source paths whose frames are left out.
+        """
+        frames: list[ErrorFrame] = []
+        for frame, lineno in traceback.walk_tb(exc.__traceback__):
+            code = frame.f_code
+            if code.co_filename in hidden_files:
+                continue
+            if (
+                frames
+                and frames[-1].lineno == lineno
+                and frames[-1].filename == code.co_filename
+                and frames[-1].name == code.co_name
+            ):
+                frames[-1] = frames[-1]._replace(repeats=frames[-1].repeats + 1)
+            else:
+                frames.append(ErrorFrame(code.co_filename, lineno, code.co_name))
+
+        omitted = 0
+        if len(frames) > MAX_FRAMES:
+            tail = MAX_FRAMES - _HEAD_FRAMES
+            omitted = sum(f.repeats for f in frames[_HEAD_FRAMES:-tail])
+            frames = frames[:_HEAD_FRAMES] + frames[-tail:]
+
+        summary = "".join(traceback.format_exception_only(type(exc), exc))
+        if len(summary) > MAX_SUMMARY_CHARS:
+            summary = summary[:MAX_SUMMARY_CHARS] + "… (truncated)\n"
+        return cls(type(exc).__name__, summary, tuple(frames), omitted)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready form, e.g. for the grading service."""
+        return {
+            "exc_type": self.exc_type,
+            "summary": self.summary,
+            "frames": [list(f) for f in self.frames],
+            "omitted": self.omitted,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ErrorReport":
+        return cls(
+            data["exc_type"],
+            data["summary"],
+            tuple(ErrorFrame(*f) for f in data["frames"]),
+            data["omitted"],
+        )
+
+    def format(self) -> str:
+        """Render in the layout of ``traceback.format_exc()``."""
+        lines = ["Traceback (most recent call last):\n"] if self.frames else []
+        for i, frame in enumerate(self.frames):
+            if i == _HEAD_FRAMES and self.omitted:
+                lines.append(f"  [... {self.omitted} more frames ...]\n")
+            entry = f'  File "{frame.filename}", line {frame.lineno}, in {frame.name}\n'
+            source = linecache.getline(frame.filename, frame.lineno).strip()
+            if source:
+                entry += f"    {source}\n"
+            lines.extend([entry] * min(frame.repeats, _RECURSION_CUTOFF))
+            if frame.repeats > _RECURSION_CUTOFF:
+                more = frame.repeats - _RECURSION_CUTOFF
+                noun = "time" if more == 1 else "times"
+                lines.append(f"  [Previous line repeated {more} more {noun}]\n")
+        lines.append(self.summary)
+        return "".join(lines)
+
+    def __str__(self) -> str:
+        return self.format()
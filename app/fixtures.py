@@ -0,0 +1,176 @@
+"""
+HebiKata - Data Fixtures
+
+Read-only datasets (spectra, wordlists, CSV logs) that exercises bind as
+globals in the sandbox, declared in ``validation.fixtures``:
+
+    validation:
+      fixtures:
+        spectrum:
+          file: spectrum.f64   # in the pack's fixtures/ directory
+          format: d            # element type (struct code), default B (bytes)
+        words: words.txt       # shorthand for a byte buffer
+
+Each file is copied once per host into a named
+``multiprocessing.shared_memory`` segment, which every process (the app
+and grading service workers alike) maps read-only and keeps mapped. Where
+shared memory is unavailable the file itself is memory-mapped instead,
+which the OS page cache shares just as well. Either way a run receives a
+fresh read-only ``memoryview`` of the mapping, cast to the declared
+format: no copy is made, and neither writing to the view nor releasing it
+affects other runs.
+
+Segments are named after the file's path, size and modification time, so
+an edited fixture gets a new segment, and the mapping of its previous
+version is released once the runs using it are done. A segment is
+removed when the process that created it exits (on Windows, when the
+last process that opened it does); processes that still have it mapped
+keep their mapping, and the next one to need it creates a new segment.
+"""
+
+import hashlib
+import keyword
+import mmap
+import os
+import struct
+import sys
+import threading
+from collections.abc import Mapping
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any
+
+FIXTURES_DIR = "fixtures"
+
+# memoryview.cast() formats a fixture may declare.
+FORMATS = frozenset("bBhHiIlLqQfd")
+
+_READY = 1  # last byte of a segment once its data is complete
+
+_views: dict[str, memoryview] = {}
+# Fixture file path -> key of the mapping in _views for its current version.
+_view_keys: dict[str, str] = {}
+_views_lock = threading.Lock()
+
+
+def resolve_fixtures(data: Path, declared: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Validate ``validation.fixtures`` and pin each entry to its file.
+
+    Args:
+        data: The content pack directory.
+        declared: Fixture name -> file name, or ``{file, format}``.
+
+    Returns:
+        Fixture name -> ``{path, format, size, key}``, ready for the engine.
+
+    Raises:
+        ValueError: A name, format or path is invalid.
+        OSError: A file cannot be read.
+    """
+    root = (data / FIXTURES_DIR).resolve()
+    resolved = {}
+    for name, spec in declared.items():
+        if not str(name).isidentifier() or keyword.iskeyword(name):
+            raise ValueError(f"fixture name {name!r} is not a valid identifier")
+        if isinstance(spec, str):
+            spec = {"file": spec}
+        fmt = spec.get("format", "B")
+        if fmt not in FORMATS:
+            raise ValueError(f"fixture {name!r}: unsupported format {fmt!r}")
+        path = (root / str(spec["file"])).resolve()
+        if not path.is_relative_to(root):
+            raise ValueError(f"fixture {name!r} is outside {FIXTURES_DIR}/")
+        info = path.stat()
+        if info.st_size % struct.calcsize(fmt):
+            raise ValueError(f"fixture {name!r} is not a whole number of {fmt!r}")
+        identity = f"{path}\0{info.st_size}\0{info.st_mtime_ns}"
+        resolved[name] = {
+            "path": str(path),
+            "format": fmt,
+            "size": info.st_size,
+            "key": hashlib.sha256(identity.encode("utf-8")).hexdigest()[:24],
+        }
+    return resolved
+
+
+def fixture_views(fixtures: Mapping[str, Any] | None) -> dict[str, memoryview]:
+    """Fresh read-only views of resolved fixtures, by name."""
+    if not fixtures:
+        return {}
+    views = {}
+    for name, spec in fixtures.items():
+        base = _views.get(spec["key"])
+        if base is None:
+            with _views_lock:
+                base = _views.get(spec["key"])
+                if base is None:
+                    base = _views[spec["key"]] = _map(spec["key"], spec)
+                    _release_stale(spec["path"], spec["key"])
+        views[name] = base[:] if spec["format"] == "B" else base.cast(spec["format"])
+    return views
+
+
+def _release_stale(path: str, key: str) -> None:
+    """Drop the mapping of an earlier version of the file at ``path``."""
+    stale = _view_keys.get(path)
+    _view_keys[path] = key
+    if stale is not None and stale != key:
+        old = _views.pop(stale, None)
+        if old is not None:
+            # Views handed to runs keep the mapping alive until they go.
+            old.release()
+
+
+def _map(key: str, spec: Mapping[str, Any]) -> memoryview:
+    size = spec["size"]
+    if not size:
+        return memoryview(b"")
+    try:
+        view = _shared_view(f"hk_{key}", Path(spec["path"]), size)
+    except (OSError, ValueError):  # no shared memory, or a segment being created
+        view = None
+    return view if view is not None else _file_view(Path(spec["path"]), size)
+
+
+def _shared_view(name: str, path: Path, size: int) -> memoryview | None:
+    """Read-only view of the host-wide segment, filling it if it is new."""
+    try:
+        segment = shared_memory.SharedMemory(name, create=True, size=size + 1)
+    except FileExistsError:
+        segment = _attach(name)
+    else:
+        with open(path, "rb") as f:
+            f.readinto(segment.buf[:size])
+        segment.buf[size] = _READY
+    try:
+        if segment.size < size + 1 or segment.buf[size] != _READY:
+            return None  # another process is still filling it
+        if os.name == "nt":
+            mapping = mmap.mmap(
+                -1, size + 1, tagname=segment.name, access=mmap.ACCESS_READ
+            )
+        else:
+            # SharedMemory only maps read-write; map its descriptor again.
+            mapping = mmap.mmap(segment._fd, size + 1, access=mmap.ACCESS_READ)  # type: ignore[attr-defined]
+    finally:
+        segment.close()
+    return memoryview(mapping)[:size]
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open another process's segment without taking over its removal."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    segment = shared_memory.SharedMemory(name)
+    if os.name != "nt":
+        # 3.12 registers every opener with the resource tracker, which would
+        # unlink the segment when the first of them exits.
+        resource_tracker.unregister(segment._name, "shared_memory")  # type: ignore[attr-defined]
+    return segment
+
+
+def _file_view(path: Path, size: int) -> memoryview:
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+    return memoryview(mapping)
@@ -0,0 +1,160 @@
+"""
+HebiKata - Grading
+
+Single entry point for grading a submission. ``grade()`` sends the work to
+the standalone grading service when ``HEBIKATA_GRADER_URL`` is set to an
+``http://`` URL (see app/grading_service.py), to a pool of subinterpreters in this process when
+``HEBIKATA_SUBINTERPRETERS`` is set (see app/subinterp.py), and grades
+in-process otherwise, or whenever either cannot produce a result.
+
+Results cross the wire as JSON; ``encode_result()`` and ``decode_result()``
+convert the ErrorReport in a failure result to and from plain data.
+"""
+
+import logging
+import os
+import threading
+from types import CodeType
+from typing import Any
+
+from app import metrics, subinterp
+from app.engine import execute_code_with_tests
+from app.env import env_float
+from app.errors import ErrorReport
+from app.grading_client import (
+    DEFAULT_JOB_TIMEOUT,
+    RESPONSE_MARGIN_SECONDS,
+    GraderUnavailableError,
+    GradingClient,
+)
+from app.performance import grade_performance, is_performance_kata
+
+GRADER_URL_ENV = "HEBIKATA_GRADER_URL"
+GRADER_TIMEOUT_ENV = "HEBIKATA_GRADER_TIMEOUT"
+
+# Exercise keys the grader needs; the rest stays out of request bodies.
+_GRADING_KEYS = ("id", "type", "validation", "performance")
+
+_client: GradingClient | None = None
+# A HEBIKATA_GRADER_URL the client rejected, so it is reported only once.
+_bad_url: str | None = None
+_client_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def _default_client() -> GradingClient | None:
+    """The client for ``HEBIKATA_GRADER_URL``; None if unset or unusable."""
+    global _client, _bad_url
+    url = os.environ.get(GRADER_URL_ENV, "").strip()
+    if not url or url == _bad_url:
+        return None
+    if _client is None or _client.base_url != url:
+        with _client_lock:
+            if _client is None or _client.base_url != url:
+                job_timeout = env_float(GRADER_TIMEOUT_ENV, DEFAULT_JOB_TIMEOUT)
+                try:
+                    _client = GradingClient(
+                        url, timeout=job_timeout + RESPONSE_MARGIN_SECONDS
+                    )
+                except ValueError as e:
+                    _bad_url = url
+                    logger.warning("%s; grading in-process", e)
+                    return None
+    return _client
+
+
+def grade_locally(
+    user_code: str,
+    exercise: dict[str, Any],
+    reference_code: str | None = None,
+    tests: CodeType | None = None,
+) -> dict[str, Any]:
+    """
+    Grade in this process.
+
+    Args:
+        user_code: The learner's submission.
+        exercise: Exercise dict (at least ``validation``, plus ``type`` and
+            ``performance`` for performance katas).
+        reference_code: Reference solution; required for performance katas.
+        tests: ``validation.tests`` already compiled (see
+            app.data_loader.compiled_tests()), to skip compiling it again.
+
+    Returns:
+        The execute_code_with_tests() or grade_performance() result.
+    """
+    if is_performance_kata(exercise):
+        if reference_code is None:
+            raise ValueError(f"{exercise.get('id')} needs its reference solution")
+        return grade_performance(user_code, exercise, reference_code, tests)
+    validation = exercise["validation"]
+    return execute_code_with_tests(
+        user_code,
+        tests or validation["tests"],
+        imports=validation.get("imports"),
+        modules=validation.get("modules"),
+        fixtures=validation.get("fixtures"),
+    )
+
+
+def grade(
+    user_code: str,
+    exercise: dict[str, Any],
+    reference_code: str | None = None,
+    tests: CodeType | None = None,
+) -> dict[str, Any]:
+    """
+    Grade a submission on the grading service if configured, else locally.
+
+    Same arguments and result as grade_locally(); the service and the
+    subinterpreters compile the tests themselves. Their errors are never
+    surfaced to the learner: the submission is graded in-process instead.
+    """
+    client = _default_client()
+    if client is None:
+        pool = subinterp.get_pool()
+        if pool is None:
+            metrics.GRADING_REQUESTS.labels("local").inc()
+            return grade_locally(user_code, exercise, reference_code, tests)
+        future = pool.submit(user_code, _grading_view(exercise), reference_code)
+        try:
+            result = decode_result(future.result())
+        except subinterp.SubinterpreterError:
+            metrics.GRADING_REQUESTS.labels("fallback").inc()
+            return grade_locally(user_code, exercise, reference_code, tests)
+        metrics.GRADING_REQUESTS.labels("subinterpreter").inc()
+        return result
+
+    request = {
+        "user_code": user_code,
+        "exercise": _grading_view(exercise),
+        "reference_code": reference_code,
+    }
+    try:
+        result = decode_result(client.grade(request))
+    except GraderUnavailableError:
+        metrics.GRADING_REQUESTS.labels("fallback").inc()
+        return grade_locally(user_code, exercise, reference_code, tests)
+    metrics.GRADING_REQUESTS.labels("remote").inc()
+    return result
+
+
+def _grading_view(exercise: dict[str, Any]) -> dict[str, Any]:
+    return {k: exercise[k] for k in _GRADING_KEYS if k in exercise}
+
+
+def encode_result(result: dict[str, Any]) -> dict[str, Any]:
+    """Make a grading result JSON-serializable."""
+    error = result.get("error")
+    if isinstance(error, ErrorReport):
+        return {**result, "error": {"report": error.to_dict()}}
+    return result
+
+
+def decode_result(data: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of encode_result()."""
+    error = data.get("error")
+    if isinstance(error, dict):
+        return {**data, "error": ErrorReport.from_dict(error["report"])}
+    return data
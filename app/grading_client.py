@@ -0,0 +1,142 @@
+"""
+HebiKata - Grading Service Client
+
+HTTP/1.1 client for app/grading_service.py. Connections are kept alive and
+pooled, so a rerun reuses a warm socket instead of paying for a TCP
+handshake per submission. After a failure the client reports the service
+as unavailable for RETRY_AFTER_SECONDS, so callers fall back to in-process
+grading without waiting on a dead service for every submission.
+
+The service answers a submission that runs too long with a failed result
+after its job timeout, so a slow submission never marks it down. The
+socket timeout only has to cover that job timeout plus transfer time.
+"""
+
+import http.client
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+DEFAULT_POOL_SIZE = 8
+# The service's default ``--timeout`` for one job.
+DEFAULT_JOB_TIMEOUT = 20.0
+# Added to the job timeout for queueing and transfer.
+RESPONSE_MARGIN_SECONDS = 5.0
+DEFAULT_TIMEOUT = DEFAULT_JOB_TIMEOUT + RESPONSE_MARGIN_SECONDS
+RETRY_AFTER_SECONDS = 10.0
+
+logger = logging.getLogger(__name__)
+
+
+class GraderUnavailableError(Exception):
+    """The grading service could not produce a result."""
+
+
+class GradingClient:
+    """
+    Pooled keep-alive client for one grading service.
+
+    Args:
+        base_url: Service URL such as ``http://127.0.0.1:8765``.
+        pool_size: Idle connections kept open for reuse.
+        timeout: Socket timeout for one request, in seconds; must exceed
+            the service's job timeout.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"Unsupported grading service URL: {base_url!r}")
+        self.base_url = base_url
+        self._host = parts.hostname
+        self._port = parts.port or 80
+        self._path = parts.path.rstrip("/") + "/grade"
+        self._timeout = timeout
+        self._idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue(
+            maxsize=pool_size
+        )
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPConnection(
+                self._host, self._port, timeout=self._timeout
+            )
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _mark_down(self, reason: str) -> GraderUnavailableError:
+        with self._lock:
+            self._down_until = time.monotonic() + RETRY_AFTER_SECONDS
+        logger.warning("%s; grading in-process for %g s", reason, RETRY_AFTER_SECONDS)
+        return GraderUnavailableError(reason)
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def grade(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        POST a grading request and return the decoded JSON response.
+
+        Raises:
+            GraderUnavailableError: The service is marked down, unreachable,
+                timed out, or answered with an error status or a body that is
+                not a JSON object.
+        """
+        if time.monotonic() < self._down_until:
+            raise GraderUnavailableError("grading service marked down")
+
+        body = json.dumps(request).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                conn.request("POST", self._path, body, headers)
+                response = conn.getresponse()
+                payload = response.read()
+            except TimeoutError as e:
+                conn.close()
+                raise self._mark_down(f"grading service timed out: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                # A pooled connection the server already closed fails on first
+                # use; retry once on a fresh connection before giving up.
+                if attempt == 0:
+                    continue
+                raise self._mark_down(f"grading service unreachable: {e}") from e
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            if response.status != 200:
+                raise self._mark_down(f"grading service answered {response.status}")
+            try:
+                data = json.loads(payload)
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                raise self._mark_down("grading service answered malformed JSON")
+            return data
+        raise AssertionError("unreachable")
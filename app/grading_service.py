@@ -0,0 +1,289 @@
+"""
+HebiKata - Grading Service
+
+Standalone HTTP service that grades submissions in a pool of worker
+processes, so Streamlit frontends and sandbox capacity scale separately.
+Point any number of frontends at it with ``HEBIKATA_GRADER_URL``.
+
+Endpoints (HTTP/1.1, keep-alive):
+
+- ``POST /grade``: ``{"user_code", "exercise", "reference_code"}`` in,
+  grading result out (see app.grading.encode_result()).
+- ``GET /healthz``: liveness and worker count.
+- ``GET /metrics``: Prometheus text for this process.
+
+Workers are spawned processes recycled every MAX_TASKS_PER_CHILD jobs, so
+one learner's leaked state never outlives a few submissions. With
+``--backend subinterpreters`` they are instead subinterpreters of the
+service process (see app/subinterp.py), recycled the same way.
+
+Jobs wait for a free worker in the service, so the timeout counts from
+when a job starts running. A job that exceeds it is answered with a failed
+grading result telling the learner their code took too long, and its
+worker is freed: the process pool is killed and replaced (jobs it was
+running are retried), while an interpreter, which cannot be stopped, is
+left to finish on its own and a new one takes its place. If a worker process dies, the pool is
+replaced and the job retried once on the new one.
+
+Usage:
+    python -m app.grading_service --port 8765 --workers 4
+    python -m app.grading_service --workers 8 --backend subinterpreters
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from app import metrics
+from app.grading import encode_result, grade_locally
+from app.grading_client import DEFAULT_JOB_TIMEOUT
+from app.subinterp import SubinterpreterError, SubinterpreterPool
+
+DEFAULT_PORT = 8765
+MAX_REQUEST_BYTES = 1 << 20
+MAX_TASKS_PER_CHILD = 200
+BACKENDS = ("processes", "subinterpreters")
+
+
+def _grade_job(
+    user_code: str, exercise: dict[str, Any], reference_code: str | None
+) -> dict[str, Any]:
+    return encode_result(grade_locally(user_code, exercise, reference_code))
+
+
+def _noop() -> None:
+    pass
+
+
+def _failure(message: str, error: str) -> dict[str, Any]:
+    return {"success": False, "message": message, "error": error}
+
+
+class GradingServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server that hands grading jobs to a pool of workers.
+
+    Raises:
+        SubinterpreterError: The subinterpreters backend is unavailable.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        workers: int,
+        job_timeout: float = DEFAULT_JOB_TIMEOUT,
+        backend: str = "processes",
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend!r}")
+        super().__init__(address, _GradingHandler)
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.backend = backend
+        self.pool: ProcessPoolExecutor | None = None
+        self.interpreters: SubinterpreterPool | None = None
+        self._pool_lock = threading.Lock()
+        # One per worker: a job only reaches the pool when it can start.
+        self._slots = threading.BoundedSemaphore(workers)
+        if backend == "subinterpreters":
+            try:
+                self.interpreters = SubinterpreterPool(
+                    workers, max_runs=MAX_TASKS_PER_CHILD
+                )
+            except SubinterpreterError:
+                super().server_close()
+                raise
+        else:
+            self.pool = self._start_pool()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=MAX_TASKS_PER_CHILD,
+        )
+        # Start every worker now rather than on the first submissions.
+        for future in [pool.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor, kill: bool = False) -> None:
+        """
+        Swap in a fresh pool, unless another request already did.
+
+        Args:
+            kill: Kill the old pool's workers first, for a job that will
+                not finish on its own.
+        """
+        with self._pool_lock:
+            if self.pool is broken:
+                if kill:
+                    for process in list((broken._processes or {}).values()):
+                        process.kill()
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._start_pool()
+
+    def submit(
+        self, user_code: str, exercise: dict[str, Any], reference_code: str | None
+    ) -> Future[dict[str, Any]]:
+        """Queue a job; the future's result is encoded for JSON."""
+        if self.interpreters is not None:
+            return self.interpreters.submit(user_code, exercise, reference_code)
+        assert self.pool is not None
+        return self.pool.submit(_grade_job, user_code, exercise, reference_code)
+
+    def grade(
+        self, user_code: str, exercise: dict[str, Any], reference_code: str | None
+    ) -> dict[str, Any]:
+        """Grade one job within the timeout; the result is encoded for JSON."""
+        with self._slots:
+            return self._grade(user_code, exercise, reference_code)
+
+    def _grade(
+        self, user_code: str, exercise: dict[str, Any], reference_code: str | None
+    ) -> dict[str, Any]:
+        for attempt in range(2):
+            pool = self.pool
+            try:
+                future = self.submit(user_code, exercise, reference_code)
+                return future.result(timeout=self.job_timeout)
+            except TimeoutError:
+                self._stop(future, pool)
+                return _failure(
+                    "⏱ Timed out: your code ran too long",
+                    f"Grading stopped after {self.job_timeout:g} s. "
+                    "Look for a loop that never ends.",
+                )
+            except BrokenProcessPool:
+                # A worker died (maybe under this very job); the executor
+                # refuses all further work, so replace it.
+                assert pool is not None
+                self._replace_pool(pool)
+                if attempt:
+                    return _failure(
+                        "❌ Error: the grader crashed",
+                        "A grading worker stopped while running your code.",
+                    )
+        raise AssertionError("unreachable")
+
+    def _stop(self, future: Future[Any], pool: ProcessPoolExecutor | None) -> None:
+        """Free the worker stuck on a timed-out job."""
+        if self.interpreters is not None:
+            self.interpreters.abandon(future)
+        elif not future.cancel():
+            assert pool is not None
+            self._replace_pool(pool, kill=True)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+        if self.interpreters is not None:
+            self.interpreters.close()
+
+
+class _GradingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: GradingServer
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        path = self.path.split("?")[0]
+        if path == "/healthz":
+            self._send(
+                200,
+                {
+                    "status": "ok",
+                    "workers": self.server.workers,
+                    "backend": self.server.backend,
+                },
+            )
+        elif path == "/metrics":
+            body = metrics.REGISTRY.render().encode("utf-8")
+            self._send_bytes(200, body, "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send(413, {"error": "request too large"})
+            return
+        raw = self.rfile.read(length)
+        if self.path != "/grade":
+            self._send(404, {"error": "not found"})
+            return
+
+        try:
+            request = json.loads(raw)
+            job = (
+                str(request["user_code"]),
+                dict(request["exercise"]),
+                request.get("reference_code"),
+            )
+        except (ValueError, KeyError, TypeError):
+            self._send(400, {"error": "expected user_code and exercise"})
+            return
+
+        with metrics.ENGINE_SECONDS.time():
+            try:
+                result = self.server.grade(*job)
+            except Exception as e:
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+                return
+        metrics.SUBMISSIONS.labels("pass" if result["success"] else "fail").inc()
+        self._send(200, result)
+
+    def _send(self, status: int, data: dict[str, Any]) -> None:
+        self._send_bytes(status, json.dumps(data).encode("utf-8"), "application/json")
+
+    def _send_bytes(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the HebiKata grading service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_JOB_TIMEOUT)
+    parser.add_argument("--backend", choices=BACKENDS, default="processes")
+    args = parser.parse_args()
+
+    server = GradingServer(
+        (args.host, args.port), args.workers, args.timeout, args.backend
+    )
+    print(
+        f"Grading on http://{args.host}:{server.server_port} "
+        f"({args.workers} {args.backend} workers)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    if server.interpreters is not None and server.interpreters.abandoned():
+        # An interpreter stuck in a timed-out job would abort a normal exit.
+        sys.stdout.flush()
+        os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
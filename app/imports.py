@@ -0,0 +1,289 @@
+"""
+HebiKata - Sandbox Imports
+
+Controlled ``__import__`` for the engine sandbox. Submissions may import
+the stdlib modules in SAFE_MODULES (or the narrower list an exercise gives
+in ``validation.imports``) and any helper modules the exercise ships in
+``validation.modules``; every other import raises ImportError.
+
+The stdlib modules are imported once per process, and the public names of
+each are frozen into a shared read-only mapping. An import statement in a
+submission only wraps that mapping in a ReadOnlyModule, so ``import math``
+costs a dict lookup, and ``math.pi = 3`` fails instead of leaking into
+other learners' runs. Modules with hidden global state get fresh state per
+run instead (``random`` is bound to its own ``random.Random``), and helper
+modules are compiled once and executed per run.
+
+The classes those modules export are frozen the way built-in types are
+(``json.JSONEncoder.encode = ...`` raises TypeError), and their pure-Python
+functions are copied per run, so setting ``__defaults__`` or an attribute
+on one stays in the run; subclassing, ``isinstance()`` and ``except``
+clauses see the real classes. Classes are frozen through ``ctypes``, which
+subinterpreters cannot load; there they stay mutable, and the interpreter
+is replaced after a few runs instead. ``from json import decoder`` and other
+names a module does not export raise ImportError.
+
+This guards shared modules against accidental mutation; it is not a
+security boundary (see app/grading_service.py for process isolation).
+"""
+
+import importlib
+import random
+import sys
+from collections.abc import Callable, Collection, Mapping
+from functools import lru_cache
+from types import CodeType, FunctionType, MappingProxyType, ModuleType
+from typing import Any
+
+try:
+    import ctypes
+except ImportError:  # not loadable in subinterpreters (see app/subinterp.py)
+    ctypes = None  # type: ignore[assignment]
+
+SAFE_MODULES = frozenset(
+    {
+        "bisect",
+        "cmath",
+        "collections",
+        "copy",
+        "dataclasses",
+        "datetime",
+        "decimal",
+        "enum",
+        "fractions",
+        "functools",
+        "heapq",
+        "itertools",
+        "json",
+        "math",
+        "operator",
+        "random",
+        "re",
+        "statistics",
+        "string",
+        "textwrap",
+        "typing",
+    }
+)
+
+Exports = Mapping[str, Any]
+
+
+class ReadOnlyModule:
+    """Module stand-in whose attributes cannot be set or deleted."""
+
+    __slots__ = ("_exports",)
+
+    def __init__(self, exports: Exports) -> None:
+        object.__setattr__(self, "_exports", exports)
+
+    def __getattr__(self, attr: str) -> Any:
+        try:
+            return self._exports[attr]
+        except KeyError:
+            raise AttributeError(
+                f"module {self._exports['__name__']!r} has no attribute {attr!r}"
+            ) from None
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        raise AttributeError(f"module {self._exports['__name__']!r} is read-only")
+
+    def __delattr__(self, attr: str) -> None:
+        raise AttributeError(f"module {self._exports['__name__']!r} is read-only")
+
+    def __dir__(self) -> list[str]:
+        return sorted(self._exports)
+
+    def __repr__(self) -> str:
+        return f"<module {self._exports['__name__']!r} (read-only)>"
+
+
+def _public_names(namespace: Mapping[str, Any]) -> list[str]:
+    names = namespace.get("__all__")
+    if names is None:
+        names = [name for name in namespace if not name.startswith("_")]
+    # Re-exported modules (``dataclasses.sys``, ``random._os``...) stay out.
+    return [
+        name
+        for name in names
+        if name in namespace
+        and not (
+            isinstance(namespace[name], ModuleType)
+            and namespace[name].__name__ not in SAFE_MODULES
+        )
+    ]
+
+
+def _freeze(name: str, namespace: Mapping[str, Any]) -> Exports:
+    public = _public_names(namespace)
+    exports = {attr: namespace[attr] for attr in public}
+    exports["__name__"] = name
+    exports["__all__"] = tuple(public)
+    exports["__doc__"] = namespace.get("__doc__")
+    return MappingProxyType(exports)
+
+
+# Py_TPFLAGS_IMMUTABLETYPE: set on built-in types, checked by type.__setattr__.
+_IMMUTABLE_TYPE = 1 << 8
+
+
+def _find_flags_offset() -> int | None:
+    """Offset of ``tp_flags`` in a CPython type object, None elsewhere."""
+    if ctypes is None or sys.implementation.name != "cpython":
+        return None
+
+    class Probe:
+        pass
+
+    word = ctypes.sizeof(ctypes.c_void_p)
+    probes = (type, object, int, Probe)
+    for offset in range(0, 32 * word, word):
+        if all(
+            ctypes.c_ulong.from_address(id(cls) + offset).value == cls.__flags__
+            for cls in probes
+        ):
+            return offset
+    return None
+
+
+_FLAGS_OFFSET = _find_flags_offset()
+
+
+def _freeze_class(cls: type) -> None:
+    if _FLAGS_OFFSET is None or cls.__flags__ & _IMMUTABLE_TYPE:
+        return
+    flags = ctypes.c_ulong.from_address(id(cls) + _FLAGS_OFFSET)
+    flags.value |= _IMMUTABLE_TYPE
+
+
+def _freeze_stdlib(name: str) -> Exports:
+    exports = _freeze(name, vars(importlib.import_module(name)))
+    for value in exports.values():
+        if isinstance(value, type):
+            _freeze_class(value)
+    return exports
+
+
+_STDLIB: dict[str, Exports] = {name: _freeze_stdlib(name) for name in SAFE_MODULES}
+
+# Pure-Python functions by module, copied into each run's exports.
+_FUNCTIONS: dict[str, tuple[str, ...]] = {
+    name: tuple(
+        attr for attr, value in exports.items() if isinstance(value, FunctionType)
+    )
+    for name, exports in _STDLIB.items()
+}
+
+# The module-level functions of ``random`` are methods of one shared
+# generator; rebind them to a fresh one per run so seeding stays private.
+_RANDOM_METHODS = tuple(
+    attr
+    for attr, value in _STDLIB["random"].items()
+    if getattr(value, "__self__", None) is random._inst  # type: ignore[attr-defined]
+)
+
+
+def _fresh_random() -> Exports:
+    generator = random.Random()
+    return MappingProxyType(
+        {
+            **_STDLIB["random"],
+            **{attr: getattr(generator, attr) for attr in _RANDOM_METHODS},
+        }
+    )
+
+
+_PER_RUN: dict[str, Callable[[], Exports]] = {"random": _fresh_random}
+
+
+def _copy_function(function: FunctionType) -> FunctionType:
+    copy = FunctionType(
+        function.__code__,
+        function.__globals__,
+        function.__name__,
+        function.__defaults__,
+        function.__closure__,
+    )
+    copy.__kwdefaults__ = (
+        None if function.__kwdefaults__ is None else dict(function.__kwdefaults__)
+    )
+    copy.__qualname__ = function.__qualname__
+    copy.__module__ = function.__module__
+    copy.__doc__ = function.__doc__
+    copy.__annotations__ = dict(function.__annotations__)
+    copy.__dict__.update(function.__dict__)
+    return copy
+
+
+def _stdlib_exports(name: str) -> Exports:
+    per_run = _PER_RUN.get(name)
+    exports = per_run() if per_run is not None else _STDLIB[name]
+    if not _FUNCTIONS[name]:
+        return exports
+    return MappingProxyType(
+        {
+            **exports,
+            **{attr: _copy_function(exports[attr]) for attr in _FUNCTIONS[name]},
+        }
+    )
+
+
+@lru_cache(maxsize=256)
+def _compile_helper(name: str, source: str) -> CodeType:
+    return compile(source, f"<{name}>", "exec")
+
+
+class Importer:
+    """
+    ``__import__`` replacement for one sandboxed run.
+
+    Args:
+        allowed: Stdlib modules the exercise may import; None for all of
+            SAFE_MODULES. Names outside SAFE_MODULES are never importable.
+        helpers: Helper module sources by module name.
+        builtins: Builtins the helper modules execute with.
+    """
+
+    __slots__ = ("_allowed", "_helpers", "_builtins", "_loaded")
+
+    def __init__(
+        self,
+        allowed: Collection[str] | None = None,
+        helpers: Mapping[str, str] | None = None,
+        builtins: dict[str, Any] | None = None,
+    ) -> None:
+        self._allowed = SAFE_MODULES if allowed is None else SAFE_MODULES & set(allowed)
+        self._helpers = helpers or {}
+        self._builtins = builtins or {}
+        self._loaded: dict[str, ReadOnlyModule] = {}
+
+    def __call__(
+        self,
+        name: str,
+        globals: Mapping[str, Any] | None = None,  # noqa: A002
+        locals: Mapping[str, Any] | None = None,  # noqa: A002
+        fromlist: Collection[str] | None = (),
+        level: int = 0,
+    ) -> ReadOnlyModule:
+        module = self._loaded.get(name)
+        if module is None:
+            if level:
+                raise ImportError("relative imports are not supported", name=name)
+            module = self._loaded[name] = ReadOnlyModule(self._exports(name))
+        # IMPORT_FROM falls back to sys.modules["<name>.<attr>"], which
+        # would hand out real submodules such as ``json.decoder``.
+        for attr in fromlist or ():
+            if attr != "*" and attr not in module._exports:
+                raise ImportError(
+                    f"cannot import name {attr!r} from {name!r}", name=name
+                )
+        return module
+
+    def _exports(self, name: str) -> Exports:
+        if name in self._helpers:
+            namespace = {"__builtins__": self._builtins, "__name__": name}
+            exec(_compile_helper(name, self._helpers[name]), namespace)
+            return _freeze(name, namespace)
+        if name not in self._allowed:
+            raise ImportError(f"import of {name!r} is not allowed here", name=name)
+        return _stdlib_exports(name)
@@ -0,0 +1,275 @@
+"""
+HebiKata - Submission Journal
+
+Opt-in, append-only record of graded submissions for replaying real
+traffic against engine changes (see benchmarks/replay.py). Set
+``HEBIKATA_JOURNAL_DIR`` to enable it; each ``_run_tests()`` then appends
+one JSON line with the content pack and exercise id, the code, the
+outcome and the grading time.
+
+The journal is a directory of gzip-compressed JSONL segments. The segment
+being written is named ``*.jsonl.gz.part`` and is renamed to
+``*.jsonl.gz`` when it reaches SEGMENT_BYTES of uncompressed data or the
+process exits, so readers only ever see complete files. A ``.part``
+segment left behind by a process that died is finished when a
+JournalWriter next opens the directory: its complete records are
+rewritten as a closed segment. ``compact()``
+streams closed segments into one, recompressed at the highest level,
+after dropping whole oldest segments once the journal outgrows its size
+budget:
+
+    python -m app.journal compact /var/lib/hebikata/journal --retain-mb 256
+"""
+
+import argparse
+import atexit
+import contextlib
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+JOURNAL_DIR_ENV = "HEBIKATA_JOURNAL_DIR"
+
+SEGMENT_BYTES = 8 << 20  # uncompressed bytes per segment
+RETAIN_BYTES = 256 << 20  # compressed bytes kept by compact()
+
+_SUFFIX = ".jsonl.gz"
+_PART_SUFFIX = _SUFFIX + ".part"
+
+# Segments this process is writing, which recover_segments() leaves alone.
+_open_parts: set[Path] = set()
+
+
+class JournalWriter:
+    """
+    Thread-safe appender of JSON records to rotating gzip segments.
+
+    Args:
+        directory: Journal directory; created if missing.
+        segment_bytes: Uncompressed size at which a segment is closed.
+    """
+
+    def __init__(
+        self, directory: str | Path, segment_bytes: int = SEGMENT_BYTES
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        recover_segments(self.directory)
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._file: gzip.GzipFile | None = None
+        self._path: Path | None = None
+        self._written = 0
+
+    def append(self, record: dict[str, Any]) -> None:
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                # Nanosecond start times keep segments in write order.
+                self._path = self.directory / (
+                    f"journal-{time.time_ns()}-{os.getpid()}{_PART_SUFFIX}"
+                )
+                self._file = gzip.GzipFile(self._path, "wb", compresslevel=6)
+                _open_parts.add(self._path)
+                self._written = 0
+            self._file.write(line)
+            self._written += len(line)
+            if self._written >= self.segment_bytes:
+                self._close_segment()
+
+    def close(self) -> None:
+        """Close and publish the current segment."""
+        with self._lock:
+            if self._file is not None:
+                self._close_segment()
+
+    def _close_segment(self) -> None:
+        assert self._file is not None and self._path is not None
+        self._file.close()
+        self._path.rename(self._path.with_name(self._path.name[: -len(".part")]))
+        _open_parts.discard(self._path)
+        self._file = self._path = None
+
+
+def _writer_alive(part: Path) -> bool:
+    pid = int(part.name[: -len(_PART_SUFFIX)].split("-")[2])
+    if pid == os.getpid():
+        return part in _open_parts
+    if os.name != "posix":
+        return True  # no cheap liveness check; leave it to its owner
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # alive, owned by another user
+    return True
+
+
+def recover_segments(directory: str | Path) -> list[Path]:
+    """
+    Finish the ``.part`` segments of processes that are no longer running.
+
+    The complete records of each are rewritten as a closed segment; a line
+    cut short by the crash is dropped.
+
+    Returns:
+        The segments recovered, oldest first.
+    """
+    recovered = []
+    for part in sorted(Path(directory).glob(f"journal-*{_PART_SUFFIX}")):
+        if _writer_alive(part):
+            continue
+        closed = part.with_name(part.name[: -len(".part")])
+        tmp = closed.with_name(closed.name + ".tmp")
+        lines = 0
+        with gzip.open(part, "rb") as src, gzip.open(tmp, "wb") as dst:
+            try:
+                for line in src:
+                    if line.endswith(b"\n"):
+                        dst.write(line)
+                        lines += 1
+            except (EOFError, OSError, zlib.error):
+                pass  # truncated or corrupt from here on
+        if lines:
+            tmp.replace(closed)
+            recovered.append(closed)
+        else:
+            tmp.unlink()
+        part.unlink()
+    return sorted(recovered, key=lambda p: int(p.name.split("-")[1]))
+
+
+def segments(directory: str | Path) -> list[Path]:
+    """Closed segments of a journal, oldest first."""
+    return sorted(
+        Path(directory).glob(f"journal-*{_SUFFIX}"),
+        key=lambda p: int(p.name.split("-")[1]),
+    )
+
+
+def read_journal(paths: Iterable[str | Path]) -> Iterator[dict[str, Any]]:
+    """
+    Yield the records in journal segments, in order.
+
+    Args:
+        paths: Segment files, or journal directories (closed segments only).
+    """
+    for path in paths:
+        path = Path(path)
+        for segment in segments(path) if path.is_dir() else [path]:
+            with gzip.open(segment, "rt", encoding="utf-8") as f:
+                try:
+                    for line in f:
+                        yield json.loads(line)
+                except EOFError:
+                    # A segment cut short by a crash: keep what was readable.
+                    continue
+
+
+def compact(directory: str | Path, retain_bytes: int = RETAIN_BYTES) -> Path | None:
+    """
+    Merge the closed segments in ``directory`` into one.
+
+    Records are kept in order and streamed, never all held in memory. The
+    oldest segments are dropped whole while the rest exceed
+    ``retain_bytes``; the newest segment is always kept.
+
+    Returns:
+        The merged segment, or None if there was nothing to merge.
+    """
+    inputs = segments(directory)
+    sizes = [p.stat().st_size for p in inputs]
+    if len(inputs) < 2 and sum(sizes) <= retain_bytes:
+        return None
+
+    kept, total = 0, sum(sizes)
+    while kept < len(inputs) - 1 and total > retain_bytes:
+        total -= sizes[kept]
+        kept += 1
+
+    first = inputs[kept].name.split("-")[1]
+    merged = Path(directory) / f"journal-{first}-compacted{_SUFFIX}"
+    part = merged.with_name(merged.name + ".tmp")
+    with gzip.open(part, "wt", encoding="utf-8", compresslevel=9) as f:
+        for record in read_journal(inputs[kept:]):
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    # Publish before deleting, so a crash can duplicate records but not lose them.
+    part.replace(merged)
+    for path in inputs:
+        if path != merged:
+            path.unlink()
+    return merged
+
+
+# ═══════════════════════════════════════════════════════════════
+# APP HOOK
+# ═══════════════════════════════════════════════════════════════
+
+_writer: JournalWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def _default_writer() -> JournalWriter | None:
+    global _writer
+    directory = os.environ.get(JOURNAL_DIR_ENV, "").strip()
+    if not directory:
+        return None
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = JournalWriter(directory)
+                atexit.register(_writer.close)
+    return _writer
+
+
+def record_submission(
+    pack: str,
+    exercise_id: str,
+    user_code: str,
+    result: dict[str, Any],
+    seconds: float,
+) -> None:
+    """Append a graded submission to the journal, if one is configured."""
+    writer = _default_writer()
+    if writer is None:
+        return
+    error = result.get("error")
+    performance = result.get("performance")
+    with contextlib.suppress(OSError):
+        writer.append(
+            {
+                "t": round(time.time(), 3),
+                "pack": pack,
+                "exercise": exercise_id,
+                "code": user_code,
+                "success": result["success"],
+                "error": getattr(error, "exc_type", None),
+                "seconds": round(seconds, 6),
+                "ratio": performance["ratio"] if performance else None,
+            }
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain a submission journal.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compact_cmd = sub.add_parser("compact", help="merge closed segments")
+    compact_cmd.add_argument("directory", type=Path)
+    compact_cmd.add_argument(
+        "--retain-mb", type=float, default=RETAIN_BYTES / (1 << 20)
+    )
+    args = parser.parse_args()
+
+    merged = compact(args.directory, int(args.retain_mb * (1 << 20)))
+    print(f"Compacted into {merged}" if merged else "Nothing to compact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+HebiKata - Leaderboards
+
+Global and classroom leaderboards over every learner's score. Each board
+keeps its learners in an indexable skiplist ordered by score, so a score
+change, a rank lookup and reaching the k-th entry are O(log n) no matter
+how many learners there are. The top of each board is cached and only
+recomputed when a change lands inside it.
+
+Scores are persisted in SQLite. With ``HEBIKATA_LEADERBOARD_DB`` unset the
+database is in memory and boards are shared by the sessions of one
+Streamlit process; point it at a file to keep scores across restarts and
+share them between frontends. Every write stamps its row with the next
+number of a database-wide sequence, and removals leave a tombstone row,
+so when ``PRAGMA data_version`` shows another process committed, only
+the rows stamped after the last one seen are read and applied.
+"""
+
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple
+
+LEADERBOARD_DB_ENV = "HEBIKATA_LEADERBOARD_DB"
+GLOBAL_BOARD = "global"
+TOP_K = 10
+
+_MAX_LEVELS = 24  # plenty for 2**24 learners per board
+
+
+class Entry(NamedTuple):
+    learner_id: str
+    name: str
+    score: int
+
+
+# ═══════════════════════════════════════════════════════════════
+# INDEXABLE SKIPLIST
+# ═══════════════════════════════════════════════════════════════
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, levels: int) -> None:
+        self.key = key
+        self.next: list[_Node | None] = [None] * levels
+        # width[i]: how many positions next[i] is ahead of this node.
+        self.width = [1] * levels
+
+
+class IndexableSkiplist:
+    """
+    Sorted collection of unique keys with O(log n) insert, remove and rank.
+
+    Every link records how many positions it skips, so the position of a key
+    is the sum of the link widths followed to reach it.
+    """
+
+    def __init__(self, seed: int | None = None) -> None:
+        self._head = _Node(None, _MAX_LEVELS)
+        self._size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        node = self._head.next[0]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    def _path(self, key: Any) -> tuple[list[_Node], list[int]]:
+        """Last node before ``key`` on each level, and that node's position."""
+        chain: list[_Node] = [self._head] * _MAX_LEVELS
+        positions = [0] * _MAX_LEVELS
+        node, pos = self._head, 0
+        for level in reversed(range(_MAX_LEVELS)):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key < key:
+                pos += node.width[level]
+                node, nxt = nxt, nxt.next[level]
+            chain[level] = node
+            positions[level] = pos
+        return chain, positions
+
+    def insert(self, key: Any) -> int:
+        """Insert ``key`` and return its 0-based position."""
+        chain, positions = self._path(key)
+        levels = 1
+        while levels < _MAX_LEVELS and self._random.random() < 0.5:
+            levels += 1
+
+        new = _Node(key, levels)
+        index = positions[0]  # node positions count from 1; head is 0
+        for level in range(levels):
+            prev = chain[level]
+            skipped = index + 1 - positions[level]
+            new.next[level] = prev.next[level]
+            new.width[level] = prev.width[level] - skipped + 1
+            prev.next[level] = new
+            prev.width[level] = skipped
+        for level in range(levels, _MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+        return index
+
+    def remove(self, key: Any) -> int:
+        """Remove ``key`` and return the position it had."""
+        chain, positions = self._path(key)
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), _MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+        return positions[0]
+
+    def index(self, key: Any) -> int:
+        """0-based position of ``key``."""
+        chain, positions = self._path(key)
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        return positions[0]
+
+    def __getitem__(self, index: int) -> Any:
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        node, remaining = self._head, index + 1
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]  # type: ignore[assignment]
+        return node.key
+
+    def head(self, k: int) -> list[Any]:
+        """The first ``k`` keys, in O(log n + k)."""
+        keys = []
+        node = self._head.next[0]
+        while node is not None and len(keys) < k:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+# ═══════════════════════════════════════════════════════════════
+# LEADERBOARD
+# ═══════════════════════════════════════════════════════════════
+
+# Sort key: highest score first, then whoever reached it first.
+_Key = tuple[int, float, str]
+
+
+class _Board:
+    __slots__ = ("order", "keys", "names", "top")
+
+    def __init__(self) -> None:
+        self.order = IndexableSkiplist()
+        self.keys: dict[str, _Key] = {}
+        self.names: dict[str, str] = {}
+        self.top: tuple[Entry, ...] | None = None
+
+    def put(self, learner_id: str, name: str, score: int, reached_at: float) -> None:
+        touched = TOP_K  # positions below TOP_K leave the cached top intact
+        old = self.keys.get(learner_id)
+        if old is not None:
+            touched = min(touched, self.order.remove(old))
+        key = (-score, reached_at, learner_id)
+        touched = min(touched, self.order.insert(key))
+        self.keys[learner_id] = key
+        self.names[learner_id] = name
+        if touched < TOP_K:
+            self.top = None
+
+    def drop(self, learner_id: str) -> None:
+        key = self.keys.pop(learner_id, None)
+        if key is None:
+            return
+        self.names.pop(learner_id, None)
+        if self.order.remove(key) < TOP_K:
+            self.top = None
+
+    def entry(self, key: _Key) -> Entry:
+        return Entry(key[2], self.names[key[2]], -key[0])
+
+
+# Writers are serialized, so this numbers rows in commit order.
+_NEXT_SEQ = "(SELECT COALESCE(MAX(seq), 0) + 1 FROM scores)"
+
+
+class Leaderboard:
+    """
+    Thread-safe set of named boards backed by one SQLite database.
+
+    Args:
+        path: SQLite database path, or ":memory:".
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " board TEXT NOT NULL, learner_id TEXT NOT NULL, name TEXT NOT NULL,"
+            " score INTEGER NOT NULL, reached_at REAL NOT NULL,"
+            " PRIMARY KEY (board, learner_id))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(scores)")}
+        for column in ("seq", "deleted"):  # added after the first release
+            if column not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE scores ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+                )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS scores_seq ON scores (seq)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._boards: dict[str, _Board] = {}
+        self._data_version = -1
+        self._seq = -1
+        self._sync()
+
+    def _sync(self) -> None:
+        """Apply the rows other connections committed since the last sync."""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        rows = self._conn.execute(
+            "SELECT board, learner_id, name, score, reached_at, deleted, seq"
+            " FROM scores WHERE seq > ? ORDER BY seq",
+            (self._seq,),
+        )
+        for board, learner_id, name, score, reached_at, deleted, seq in rows:
+            if deleted:
+                found = self._boards.get(board)
+                if found is not None:
+                    found.drop(learner_id)
+            else:
+                self._board(board).put(learner_id, name, score, reached_at)
+            self._seq = seq
+
+    def _board(self, board: str) -> _Board:
+        found = self._boards.get(board)
+        if found is None:
+            found = self._boards[board] = _Board()
+        return found
+
+    def submit(
+        self, learner_id: str, name: str, score: int, boards: Iterable[str]
+    ) -> None:
+        """Record ``learner_id``'s current score on each of ``boards``."""
+        reached_at = time.time()
+        with self._lock:
+            self._sync()
+            for board in boards:
+                self._board(board).put(learner_id, name, score, reached_at)
+                self._conn.execute(
+                    "INSERT INTO scores VALUES (?, ?, ?, ?, ?, " + _NEXT_SEQ + ", 0)"
+                    " ON CONFLICT (board, learner_id) DO UPDATE SET"
+                    " name = excluded.name, score = excluded.score,"
+                    " reached_at = excluded.reached_at, seq = excluded.seq,"
+                    " deleted = 0",
+                    (board, learner_id, name, score, reached_at),
+                )
+            self._conn.commit()
+
+    def remove(self, learner_id: str) -> None:
+        """Drop ``learner_id`` from every board."""
+        with self._lock:
+            self._sync()
+            for board in self._boards.values():
+                board.drop(learner_id)
+            # Tombstones, so other processes see the removal in their next sync.
+            self._conn.execute(
+                "UPDATE scores SET deleted = 1, seq = "
+                + _NEXT_SEQ
+                + " WHERE learner_id = ? AND NOT deleted",
+                (learner_id,),
+            )
+            self._conn.commit()
+
+    def top(self, board: str, k: int = TOP_K) -> tuple[Entry, ...]:
+        """The ``k`` best entries of ``board``, best first."""
+        with self._lock:
+            self._sync()
+            found = self._boards.get(board)
+            if found is None:
+                return ()
+            if k > TOP_K:
+                return tuple(found.entry(key) for key in found.order.head(k))
+            if found.top is None:
+                found.top = tuple(found.entry(key) for key in found.order.head(TOP_K))
+            return found.top[:k]
+
+    def rank(self, board: str, learner_id: str) -> tuple[int, int] | None:
+        """1-based rank of ``learner_id`` on ``board`` and the board size."""
+        with self._lock:
+            self._sync()
+            found = self._boards.get(board)
+            if found is None or learner_id not in found.keys:
+                return None
+            return found.order.index(found.keys[learner_id]) + 1, len(found.order)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_default: Leaderboard | None = None
+_default_lock = threading.Lock()
+
+
+def get_leaderboard() -> Leaderboard:
+    """The process-wide leaderboard configured by ``HEBIKATA_LEADERBOARD_DB``."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = Leaderboard(os.environ.get(LEADERBOARD_DB_ENV, ":memory:"))
+    return _default
+
+
+def classroom_board(code: str) -> str:
+    return f"class:{code}"
+
+
+_ADJECTIVES = ("Swift", "Silent", "Clever", "Bold", "Nimble", "Mighty", "Lucky", "Keen")
+_SNAKES = ("Cobra", "Viper", "Python", "Mamba", "Adder", "Krait", "Boa", "Taipan")
+
+
+def display_name(learner_id: str) -> str:
+    """
+    Stable anonymous handle such as "Swift Mamba 3F" for a learner id.
+
+    Learner ids come back from the browser, so any string is accepted: the
+    handle is derived from a hash of it.
+    """
+    n = int.from_bytes(
+        hashlib.blake2b(learner_id.encode("utf-8"), digest_size=4).digest(), "big"
+    )
+    return (
+        f"{_ADJECTIVES[n % len(_ADJECTIVES)]} {_SNAKES[n // 8 % len(_SNAKES)]} "
+        f"{n >> 24:02X}"
+    )
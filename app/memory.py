@@ -0,0 +1,246 @@
+"""
+HebiKata - Session Memory
+
+Accounts for the memory each browser session holds on the server and
+evicts idle sessions so long-running servers (a school day of learners
+coming and going) stay flat.
+
+Every rerun reports itself with ``track_session()``. At most once per
+ACCOUNT_SECONDS a session measures its own state with ``deep_sizeof()``,
+leaving out the exercise list shared by every session on a pack. At most
+once per SWEEP_SECONDS, whichever session is running also sweeps the
+tracker: sessions idle for longer than ``HEBIKATA_SESSION_TTL`` seconds,
+and, while the measured total exceeds ``HEBIKATA_SESSION_BUDGET_MB``, the
+least recently active sessions, are asked to rerun. That rerun flushes
+progress and drafts to the browser, drops the session state and shows a
+"paused" screen; resuming restores progress from localStorage as a page
+reload would.
+
+Sessions whose browser has disconnected cannot be flushed; they are only
+forgotten here, and Streamlit discards their state on its own.
+"""
+
+import sys
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from app import metrics
+from app.env import env_float
+
+SESSION_TTL_ENV = "HEBIKATA_SESSION_TTL"
+SESSION_BUDGET_ENV = "HEBIKATA_SESSION_BUDGET_MB"
+
+DEFAULT_TTL_SECONDS = 1800.0
+ACCOUNT_SECONDS = 60.0
+SWEEP_SECONDS = 30.0
+# Sessions active this recently are never evicted to meet the budget.
+MIN_IDLE_SECONDS = 120.0
+
+
+def deep_sizeof(obj: Any, seen: set[int] | None = None) -> int:
+    """
+    Approximate retained size of ``obj`` by walking containers once.
+
+    Objects whose ids are already in ``seen`` (and everything reachable
+    only through them) are not counted.
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, list | tuple | set | frozenset):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+@dataclass
+class _Session:
+    last_seen: float
+    measured_at: float = float("-inf")
+    nbytes: int = 0
+    # Eviction reason once a rerun has been requested to flush the session.
+    evicting: str | None = None
+
+
+class SessionTracker:
+    """
+    Last activity and measured size per session id.
+
+    Args:
+        ttl: Idle seconds before a session is evicted; 0 disables it.
+        budget_bytes: Bytes all sessions may hold before the least recently
+            active are evicted; 0 for no budget.
+    """
+
+    def __init__(self, ttl: float, budget_bytes: int) -> None:
+        self.ttl = ttl
+        self.budget_bytes = budget_bytes
+        self._sessions: dict[str, _Session] = {}
+        self._lock = threading.Lock()
+        self._swept_at = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(s.nbytes for s in self._sessions.values())
+
+    def touch(self, session_id: str, now: float) -> tuple[bool, str | None]:
+        """
+        Record activity of a session.
+
+        Returns whether its size is due to be measured, and the eviction
+        reason if the session has been asked to flush and close.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session(now)
+            session.last_seen = now
+            return now - session.measured_at >= ACCOUNT_SECONDS, session.evicting
+
+    def record_size(self, session_id: str, nbytes: int, now: float) -> None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.nbytes = nbytes
+                session.measured_at = now
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def sweep(self, now: float, force: bool = False) -> list[tuple[str, str]]:
+        """
+        Sessions to evict now, as (session id, reason) pairs.
+
+        Idle sessions come first ("idle"), then the least recently active
+        ones while the total is over budget ("budget"). Each session is
+        returned once; unless ``force`` is set, sweeps closer together than
+        SWEEP_SECONDS return nothing.
+        """
+        with self._lock:
+            if not force and now - self._swept_at < SWEEP_SECONDS:
+                return []
+            self._swept_at = now
+            candidates = sorted(
+                (s.last_seen, session_id)
+                for session_id, s in self._sessions.items()
+                if s.evicting is None
+            )
+            total = sum(s.nbytes for s in self._sessions.values())
+            evicted: list[tuple[str, str]] = []
+            for last_seen, session_id in candidates:
+                session = self._sessions[session_id]
+                if self.ttl and now - last_seen > self.ttl:
+                    reason = "idle"
+                elif (
+                    self.budget_bytes
+                    and total > self.budget_bytes
+                    and now - last_seen > MIN_IDLE_SECONDS
+                ):
+                    reason = "budget"
+                else:
+                    continue
+                session.evicting = reason
+                total -= session.nbytes
+                evicted.append((session_id, reason))
+            return evicted
+
+
+_tracker: SessionTracker | None = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker() -> SessionTracker:
+    """The process-wide tracker, configured from the environment."""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                budget_mb = env_float(SESSION_BUDGET_ENV, 0.0, 0.0)
+                _tracker = SessionTracker(
+                    env_float(SESSION_TTL_ENV, DEFAULT_TTL_SECONDS, 0.0),
+                    int(budget_mb * 1024 * 1024),
+                )
+    return _tracker
+
+
+def session_bytes(state: dict[str, Any], shared: Iterable[object] = ()) -> int:
+    """Size of one session's state, not counting the ``shared`` objects."""
+    return deep_sizeof(state, {id(obj) for obj in shared})
+
+
+def _request_rerun(session_id: str) -> bool:
+    """
+    Ask a connected session to rerun; False if it is not connected.
+
+    This reaches into Streamlit's private runtime; if that changed shape,
+    the session is treated as not connected and is not evicted.
+    """
+    if not Runtime.exists():
+        return False
+    try:
+        info = Runtime.instance()._session_mgr.get_active_session_info(session_id)
+        if info is None:
+            return False
+        session = info.session
+        session._event_loop.call_soon_threadsafe(session.request_rerun, None)
+    except AttributeError:
+        return False
+    return True
+
+
+def track_session(state: Any, shared: Iterable[object] = ()) -> str | None:
+    """
+    Record a rerun of the current session and sweep idle sessions.
+
+    Args:
+        state: The session's state (``st.session_state``).
+        shared: Objects held by the state but shared with other sessions.
+
+    Returns:
+        The eviction reason if this session should flush its progress and
+        release its state (see ``session.evict_session_state()``), else None.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    tracker = get_tracker()
+    now = time.monotonic()
+    measure, evicting = tracker.touch(ctx.session_id, now)
+    if evicting is not None:
+        tracker.forget(ctx.session_id)
+        metrics.SESSIONS_EVICTED.labels(evicting).inc()
+        return evicting
+    if measure:
+        tracker.record_size(ctx.session_id, session_bytes(state.to_dict(), shared), now)
+    for session_id, _reason in tracker.sweep(now):
+        if not _request_rerun(session_id):
+            tracker.forget(session_id)
+    return None
+
+
+metrics.REGISTRY.gauge(
+    "hebikata_tracked_sessions",
+    "Sessions with server-side state, as last seen by the memory tracker.",
+    lambda: len(get_tracker()),
+)
+metrics.REGISTRY.gauge(
+    "hebikata_session_bytes",
+    "Approximate bytes of session state held, from the latest measurements.",
+    lambda: get_tracker().total_bytes,
+)
@@ -0,0 +1,465 @@
+"""
+HebiKata - Operational Metrics
+
+A small in-process metrics registry with Prometheus text exposition.
+Counters and histograms are always collected (an increment is a couple of
+attribute lookups and a float add on a thread-private cell, with no lock);
+exposition is opt-in:
+
+- ``HEBIKATA_METRICS_PORT``: serve ``/metrics`` on ``127.0.0.1:<port>``.
+- ``HEBIKATA_METRICS_FILE``: rewrite this file every
+  ``HEBIKATA_METRICS_INTERVAL`` seconds (default 15, at least 1), e.g.
+  for the node_exporter textfile collector.
+"""
+
+import bisect
+import math
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager, suppress
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from app.env import env_float
+
+METRICS_PORT_ENV = "HEBIKATA_METRICS_PORT"
+METRICS_FILE_ENV = "HEBIKATA_METRICS_FILE"
+METRICS_INTERVAL_ENV = "HEBIKATA_METRICS_INTERVAL"
+
+DEFAULT_METRICS_INTERVAL = 15.0
+MIN_METRICS_INTERVAL = 1.0
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+class _ShardedCells:
+    """
+    Per-thread float cells that are summed on read.
+
+    Only the owning thread writes to its cell, so increments need no lock;
+    the lock is taken once per thread to register a new cell, and by readers.
+    Streamlit runs every rerun on a fresh thread, so cells of finished
+    threads are folded into ``_retired`` whenever a cell is registered or
+    read, keeping the list as long as the number of live threads whether
+    or not metrics are ever scraped.
+    """
+
+    def __init__(self, width: int) -> None:
+        self._local = threading.local()
+        self._cells: list[tuple[weakref.ref[threading.Thread], list[float]]] = []
+        self._retired = [0.0] * width
+        self._lock = threading.Lock()
+
+    def cell(self) -> list[float]:
+        cell: list[float] | None = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = [0.0] * len(self._retired)
+            self._local.cell = cell
+            with self._lock:
+                self._fold_finished()
+                self._cells.append((weakref.ref(threading.current_thread()), cell))
+        return cell
+
+    def totals(self) -> list[float]:
+        with self._lock:
+            self._fold_finished()
+            totals = list(self._retired)
+            for _ref, cell in self._cells:
+                totals = [a + b for a, b in zip(totals, cell, strict=True)]
+            return totals
+
+    def _fold_finished(self) -> None:
+        # Caller holds the lock; a finished thread never writes its cell again.
+        live = []
+        for ref, cell in self._cells:
+            thread = ref()
+            if thread is None or not thread.is_alive():
+                self._retired = [
+                    a + b for a, b in zip(self._retired, cell, strict=True)
+                ]
+            else:
+                live.append((ref, cell))
+        self._cells = live
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], Any] = {}
+        self._children_lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> Any:
+        """Return the child metric for one combination of label values."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._children_lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _label_dicts(self) -> Iterator[tuple[dict[str, str], Any]]:
+        for key, child in list(self._children.items()):
+            yield dict(zip(self.labelnames, key, strict=True)), child
+
+    def samples(self) -> Iterator[Sample]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    def __init__(self) -> None:
+        self._cells = _ShardedCells(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.cell()[0] += amount
+
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. submissions graded."""
+
+    type_name = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def value(self) -> float:
+        return float(self._children[()].value())
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._label_dicts():
+            yield f"{self.name}_total", labels, child.value()
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self._buckets = buckets
+        # Layout: one count per bucket (plus +Inf), then sum, then count.
+        self._cells = _ShardedCells(len(buckets) + 3)
+
+    def observe(self, value: float) -> None:
+        cell = self._cells.cell()
+        cell[bisect.bisect_left(self._buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> tuple[list[float], float, float]:
+        totals = self._cells.totals()
+        return totals[:-2], totals[-2], totals[-1]
+
+
+class Histogram(_Metric):
+    """Distribution of observations (latencies in seconds) in fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def time(self) -> Any:
+        """Context manager observing the elapsed wall time of its block."""
+        return self._children[()].time()
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._label_dicts():
+            counts, total, count = child.snapshot()
+            cumulative = 0.0
+            for bound, bucket_count in zip(
+                (*self.buckets, math.inf), counts, strict=True
+            ):
+                cumulative += bucket_count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                yield f"{self.name}_bucket", {**labels, "le": le}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class Gauge(_Metric):
+    """Point-in-time value read from a callback when metrics are scraped."""
+
+    type_name = "gauge"
+
+    def __init__(
+        self, name: str, documentation: str, callback: Callable[[], float | None]
+    ) -> None:
+        self._callback = callback
+        super().__init__(name, documentation)
+
+    def _new_child(self) -> None:
+        return None
+
+    def samples(self) -> Iterator[Sample]:
+        try:
+            value = self._callback()
+        except Exception:
+            return
+        if value is not None:
+            yield self.name, {}, float(value)
+
+
+class CallbackCounter(Gauge):
+    """Running total read from a callback, e.g. a cache's hit count."""
+
+    type_name = "counter"
+
+    def samples(self) -> Iterator[Sample]:
+        for _name, labels, value in super().samples():
+            yield f"{self.name}_total", labels, value
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> Any:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[no-any-return]
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames))  # type: ignore[no-any-return]
+
+    def gauge(
+        self, name: str, documentation: str, callback: Callable[[], float | None]
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, callback))  # type: ignore[no-any-return]
+
+    def callback_counter(
+        self, name: str, documentation: str, callback: Callable[[], float | None]
+    ) -> CallbackCounter:
+        return self.register(CallbackCounter(name, documentation, callback))  # type: ignore[no-any-return]
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(labels)} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(int(value)) if value.is_integer() else repr(value)
+
+
+REGISTRY = Registry()
+
+
+# ═══════════════════════════════════════════════════════════════
+# APPLICATION METRICS
+# ═══════════════════════════════════════════════════════════════
+
+
+def _active_sessions() -> float | None:
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return None
+    return float(Runtime.instance()._session_mgr.num_active_sessions())
+
+
+SUBMISSIONS = REGISTRY.counter(
+    "hebikata_submissions", "Submissions graded, by outcome.", ["outcome"]
+)
+ENGINE_SECONDS = REGISTRY.histogram(
+    "hebikata_engine_seconds", "Wall time spent grading one submission."
+)
+EXERCISE_CACHE_REQUESTS = REGISTRY.counter(
+    "hebikata_exercise_cache_requests",
+    "Exercise list requests; subtract hebikata_exercise_loads_total for hits.",
+)
+EXERCISE_LOADS = REGISTRY.counter(
+    "hebikata_exercise_loads", "Exercise list reads from disk (cache misses)."
+)
+EXERCISE_LOAD_SECONDS = REGISTRY.histogram(
+    "hebikata_exercise_load_seconds", "Time to read the exercise YAML tree."
+)
+PACK_EVICTIONS = REGISTRY.counter(
+    "hebikata_pack_evictions", "Content packs evicted from the LRU pack cache."
+)
+PROGRESS_SAVE_SECONDS = REGISTRY.histogram(
+    "hebikata_progress_save_seconds", "Time to serialize and queue a progress save."
+)
+PROGRESS_RESTORES = REGISTRY.counter(
+    "hebikata_progress_restores",
+    "Progress lookups at session start, by result.",
+    ["result"],
+)
+SESSIONS_STARTED = REGISTRY.counter(
+    "hebikata_sessions_started", "Browser sessions initialized."
+)
+SESSIONS_EVICTED = REGISTRY.counter(
+    "hebikata_sessions_evicted",
+    "Sessions whose state was flushed and released, by reason: idle past the "
+    "TTL, or over the memory budget.",
+    ["reason"],
+)
+RUNS_THROTTLED = REGISTRY.counter(
+    "hebikata_runs_throttled",
+    "Test runs refused by the rate limiter, by bucket: session, client or global.",
+    ["scope"],
+)
+GRADING_REQUESTS = REGISTRY.counter(
+    "hebikata_grading_requests",
+    "Submissions by grading backend: local, remote, subinterpreter, or "
+    "fallback to local after the grading service or a subinterpreter failed.",
+    ["backend"],
+)
+ACTIVE_SESSIONS = REGISTRY.gauge(
+    "hebikata_active_sessions", "Sessions with a connected browser.", _active_sessions
+)
+
+
+# ═══════════════════════════════════════════════════════════════
+# EXPOSITION
+# ═══════════════════════════════════════════════════════════════
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+def write_metrics_file(path: str) -> None:
+    """Atomically replace ``path`` with the current exposition text."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp, path)
+
+
+def _file_writer(path: str, interval: float) -> None:
+    while True:
+        with suppress(OSError):
+            write_metrics_file(path)
+        time.sleep(interval)
+
+
+_exporter_lock = threading.Lock()
+_exporter_started = False
+
+
+def start_exporters() -> None:
+    """Start the configured exporters once per process (no-op if unset)."""
+    global _exporter_started
+    if _exporter_started:
+        return
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+        port = os.environ.get(METRICS_PORT_ENV)
+        if port:
+            try:
+                server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+            except (OSError, ValueError):
+                server = None
+            if server is not None:
+                threading.Thread(
+                    target=server.serve_forever, name="hebikata-metrics", daemon=True
+                ).start()
+
+        path = os.environ.get(METRICS_FILE_ENV)
+        if path:
+            interval = env_float(
+                METRICS_INTERVAL_ENV, DEFAULT_METRICS_INTERVAL, MIN_METRICS_INTERVAL
+            )
+            threading.Thread(
+                target=_file_writer,
+                args=(path, interval),
+                name="hebikata-metrics-file",
+                daemon=True,
+            ).start()
@@ -0,0 +1,480 @@
+"""
+HebiKata - Mutation Testing
+
+Authoring tool that measures how strong each exercise's tests are. Every
+reference solution in ``data/solutions`` is mutated at the AST level
+(flipped comparisons, changed constants, swapped or negated branches,
+swapped arithmetic and boolean operators) and each mutant is graded
+against the exercise's ``validation.tests``. A mutant the tests still
+pass "survives": the tests cannot tell it from a correct solution, so the
+kata accepts that bug too. Some survivors are equivalent to the
+reference (``x >= 1`` for ``x > 0`` on integers) and need no new test.
+
+Mutants of all exercises are graded together in a pool of spawned worker
+processes. A mutant still running after ``--timeout`` seconds (a flipped
+loop condition that never ends) counts as killed; the timeout needs
+SIGALRM, so on Windows such a mutant stalls its worker.
+
+Results are cached by a hash of everything that decides them (the
+mutation operators, the reference solution, the tests and the import
+settings), so a rerun only grades exercises that changed:
+
+    python -m app.mutation                       # every exercise
+    python -m app.mutation ctrl_boss_001 --show-survivors
+    python -m app.mutation --min-score 80        # exit 1 below 80%
+"""
+
+import argparse
+import ast
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FrameType
+from typing import Any, NamedTuple
+
+from app.data_loader import read_exercises
+from app.engine import execute_code_with_tests
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+CACHE_PATH = Path(".mutation_cache.json")
+DEFAULT_TIMEOUT = 5.0
+
+# Bump when the operators change, so cached results are recomputed.
+MUTATOR_VERSION = 1
+
+KILLED = "killed"
+SURVIVED = "survived"
+TIMEOUT = "timeout"
+
+_SYMBOLS: dict[type, str] = {
+    ast.Eq: "==",
+    ast.NotEq: "!=",
+    ast.Lt: "<",
+    ast.LtE: "<=",
+    ast.Gt: ">",
+    ast.GtE: ">=",
+    ast.In: "in",
+    ast.NotIn: "not in",
+    ast.Is: "is",
+    ast.IsNot: "is not",
+    ast.Add: "+",
+    ast.Sub: "-",
+    ast.Mult: "*",
+    ast.Div: "/",
+    ast.FloorDiv: "//",
+    ast.Mod: "%",
+    ast.And: "and",
+    ast.Or: "or",
+}
+_FLIPPED: dict[type, type] = {
+    ast.Eq: ast.NotEq,
+    ast.NotEq: ast.Eq,
+    ast.Lt: ast.GtE,
+    ast.GtE: ast.Lt,
+    ast.Gt: ast.LtE,
+    ast.LtE: ast.Gt,
+    ast.In: ast.NotIn,
+    ast.NotIn: ast.In,
+    ast.Is: ast.IsNot,
+    ast.IsNot: ast.Is,
+    ast.Add: ast.Sub,
+    ast.Sub: ast.Add,
+    ast.Mult: ast.Div,
+    ast.Div: ast.Mult,
+    ast.FloorDiv: ast.Div,
+    ast.Mod: ast.FloorDiv,
+    ast.And: ast.Or,
+    ast.Or: ast.And,
+}
+
+
+class Mutant(NamedTuple):
+    line: int
+    description: str
+    source: str
+
+
+# ═══════════════════════════════════════════════════════════════
+# MUTANTS
+# ═══════════════════════════════════════════════════════════════
+
+
+class _Mutator(ast.NodeTransformer):
+    """
+    Applies the ``target``-th mutation site in traversal order.
+
+    With the default target of -1 nothing changes and ``sites`` ends up as
+    the number of sites. Children are visited before their parent, so a
+    mutation never changes which sites are visited after it.
+    """
+
+    def __init__(self, target: int = -1) -> None:
+        self.target = target
+        self.sites = 0
+        self.applied: tuple[int, str] | None = None
+
+    def _hit(self, node: ast.AST, description: str) -> bool:
+        hit = self.sites == self.target
+        self.sites += 1
+        if hit:
+            self.applied = (getattr(node, "lineno", 0), description)
+        return hit
+
+    def _swap(self, node: ast.AST, op: ast.AST) -> ast.AST:
+        flipped = _FLIPPED.get(type(op))
+        if flipped is not None and self._hit(
+            node, f"'{_SYMBOLS[type(op)]}' -> '{_SYMBOLS[flipped]}'"
+        ):
+            return flipped()
+        return op
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:  # noqa: N802
+        self.generic_visit(node)
+        node.ops = [self._swap(node, op) for op in node.ops]  # type: ignore[misc]
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:  # noqa: N802
+        self.generic_visit(node)
+        node.op = self._swap(node, node.op)  # type: ignore[assignment]
+        return node
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> ast.AST:  # noqa: N802
+        self.generic_visit(node)
+        node.op = self._swap(node, node.op)  # type: ignore[assignment]
+        return node
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:  # noqa: N802
+        self.generic_visit(node)
+        node.op = self._swap(node, node.op)  # type: ignore[assignment]
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:  # noqa: N802
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not) and self._hit(node, "removed 'not'"):
+            return node.operand
+        return node
+
+    def visit_If(self, node: ast.If) -> ast.AST:  # noqa: N802
+        self.generic_visit(node)
+        if node.orelse:
+            if self._hit(node, "swapped if/else branches"):
+                node.body, node.orelse = node.orelse, node.body
+        elif self._hit(node, "negated if condition"):
+            node.test = ast.UnaryOp(ast.Not(), node.test)
+        return node
+
+    def visit_IfExp(self, node: ast.IfExp) -> ast.AST:  # noqa: N802
+        self.generic_visit(node)
+        if self._hit(node, "swapped conditional expression branches"):
+            node.body, node.orelse = node.orelse, node.body
+        return node
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:  # noqa: N802
+        value = node.value
+        if isinstance(value, bool):
+            new: object = not value
+        elif isinstance(value, int | float):
+            new = value + 1
+        elif isinstance(value, str):
+            new = "" if value else "x"
+        else:
+            return node
+        if self._hit(node, f"{value!r} -> {new!r}"):
+            return ast.Constant(new)
+        return node
+
+    def visit_Expr(self, node: ast.Expr) -> ast.AST:  # noqa: N802
+        # Docstrings and other bare strings do nothing worth mutating.
+        if isinstance(node.value, ast.Constant):
+            return node
+        self.generic_visit(node)
+        return node
+
+    def visit_JoinedStr(self, node: ast.JoinedStr) -> ast.AST:  # noqa: N802
+        # Only the expressions inside an f-string, not its literal parts.
+        for part in node.values:
+            if isinstance(part, ast.FormattedValue):
+                part.value = self.visit(part.value)
+        return node
+
+
+def mutants(source: str) -> list[Mutant]:
+    """
+    One mutant per mutation site in ``source`` by line, duplicates removed.
+
+    Raises:
+        SyntaxError: ``source`` does not parse.
+    """
+    counter = _Mutator()
+    counter.visit(ast.parse(source))
+    seen = {ast.unparse(ast.parse(source))}
+    found = []
+    for target in range(counter.sites):
+        mutator = _Mutator(target)
+        tree = ast.fix_missing_locations(mutator.visit(ast.parse(source)))
+        mutated = ast.unparse(tree)
+        if mutator.applied is None or mutated in seen:
+            continue
+        seen.add(mutated)
+        found.append(Mutant(*mutator.applied, mutated))
+    found.sort(key=lambda m: m.line)
+    return found
+
+
+# ═══════════════════════════════════════════════════════════════
+# GRADING
+# ═══════════════════════════════════════════════════════════════
+
+
+class _Timeout(BaseException):
+    """Raised by the alarm; not an Exception, so the engine does not catch it."""
+
+
+def _alarm(signum: int, frame: FrameType | None) -> None:
+    raise _Timeout
+
+
+def grade_mutant(
+    source: str,
+    tests: str,
+    imports: list[str] | None,
+    modules: dict[str, str] | None,
+    fixtures: dict[str, Any] | None,
+    timeout: float,
+) -> str:
+    """KILLED, SURVIVED or TIMEOUT for one program against the tests."""
+    alarm = hasattr(signal, "setitimer")
+    if alarm:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        result = execute_code_with_tests(
+            source, tests, imports=imports, modules=modules, fixtures=fixtures
+        )
+    except _Timeout:
+        return TIMEOUT
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return SURVIVED if result["success"] else KILLED
+
+
+def content_key(reference: str, validation: dict[str, Any]) -> str:
+    """Cache key for an exercise's mutation results."""
+    payload = json.dumps(
+        [
+            MUTATOR_VERSION,
+            reference,
+            validation["tests"],
+            validation.get("imports"),
+            validation.get("modules"),
+            validation.get("fixtures"),
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class MutationReport:
+    exercise: str
+    total: int = 0
+    killed: int = 0
+    survivors: list[tuple[int, str]] = field(default_factory=list)
+    error: str | None = None
+    cached: bool = False
+
+    @property
+    def score(self) -> float:
+        """Share of mutants killed, 1.0 for an exercise without mutants."""
+        return self.killed / self.total if self.total else 1.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total,
+            "killed": self.killed,
+            "survivors": self.survivors,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, exercise: str, data: dict[str, Any]) -> "MutationReport":
+        return cls(
+            exercise,
+            int(data["total"]),
+            int(data["killed"]),
+            [(int(line), str(text)) for line, text in data["survivors"]],
+            data.get("error"),
+            cached=True,
+        )
+
+
+def load_cache(path: Path) -> dict[str, dict[str, Any]]:
+    """Results by content key; a missing or corrupt file is an empty cache."""
+    try:
+        cache = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_cache(path: Path, cache: dict[str, dict[str, Any]]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(cache, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def run(
+    exercises: Iterable[dict[str, Any]],
+    data: Path = DATA_DIR,
+    cache: dict[str, dict[str, Any]] | None = None,
+    workers: int = 1,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> list[MutationReport]:
+    """
+    Mutation-test each exercise's reference solution against its tests.
+
+    Exercises whose content key is in ``cache`` are not graded again; new
+    results are added to it. With ``workers`` above 1 the mutants are
+    graded in that many processes, otherwise in this one.
+    """
+    cache = {} if cache is None else cache
+    reports: list[MutationReport] = []
+    # (report, content key, validation, programs: reference first, then mutants)
+    pending: list[tuple[MutationReport, str, dict[str, Any], list[Mutant]]] = []
+    for exercise in exercises:
+        report = MutationReport(exercise["id"])
+        reports.append(report)
+        path = data / "solutions" / f"{exercise['id']}.py"
+        try:
+            reference = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            report.error = "no reference solution"
+            continue
+        validation = exercise["validation"]
+        key = content_key(reference, validation)
+        if key in cache:
+            reports[-1] = MutationReport.from_dict(report.exercise, cache[key])
+            continue
+        try:
+            programs = [Mutant(0, "reference", reference), *mutants(reference)]
+        except SyntaxError as e:
+            report.error = f"reference does not parse: {e}"
+            continue
+        pending.append((report, key, validation, programs))
+
+    jobs = [
+        (
+            program.source,
+            validation["tests"],
+            validation.get("imports"),
+            validation.get("modules"),
+            validation.get("fixtures"),
+            timeout,
+        )
+        for _report, _key, validation, programs in pending
+        for program in programs
+    ]
+    if workers > 1 and jobs:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            outcomes = iter(list(pool.map(grade_mutant, *zip(*jobs, strict=True))))
+    else:
+        outcomes = iter([grade_mutant(*job) for job in jobs])
+
+    for report, key, _validation, programs in pending:
+        results = [next(outcomes) for _ in programs]
+        if results[0] != SURVIVED:
+            report.error = f"reference solution fails its tests ({results[0]})"
+            continue
+        report.total = len(programs) - 1
+        report.killed = sum(r != SURVIVED for r in results[1:])
+        report.survivors = [
+            (m.line, m.description)
+            for m, r in zip(programs[1:], results[1:], strict=True)
+            if r == SURVIVED
+        ]
+        cache[key] = report.to_dict()
+    return reports
+
+
+# ═══════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════
+
+
+def _report_lines(reports: list[MutationReport], show: bool) -> Iterator[str]:
+    width = max((len(r.exercise) for r in reports), default=0)
+    for r in reports:
+        if r.error:
+            yield f"{r.exercise:<{width}}   ----  {r.error}"
+            continue
+        cached = "  (cached)" if r.cached else ""
+        if not r.total:
+            yield f"{r.exercise:<{width}}   ----  no mutation sites{cached}"
+            continue
+        yield (
+            f"{r.exercise:<{width}}  {r.score:5.0%}  "
+            f"{r.killed}/{r.total} killed, {len(r.survivors)} survived{cached}"
+        )
+        if show:
+            for line, description in r.survivors:
+                yield f"    L{line:<4} {description}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Mutation-test reference solutions against exercise tests."
+    )
+    parser.add_argument("exercises", nargs="*", help="exercise ids (default: all)")
+    parser.add_argument("--data", type=Path, default=DATA_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--cache", type=Path, default=CACHE_PATH)
+    parser.add_argument("--no-cache", action="store_true", help="regrade everything")
+    parser.add_argument(
+        "--show-survivors", action="store_true", help="list surviving mutants"
+    )
+    parser.add_argument(
+        "--min-score", type=float, default=0.0, help="fail below this percentage"
+    )
+    args = parser.parse_args()
+
+    exercises = read_exercises(args.data)
+    if args.exercises:
+        wanted = set(args.exercises)
+        exercises = [ex for ex in exercises if ex["id"] in wanted]
+        unknown = wanted - {ex["id"] for ex in exercises}
+        if unknown:
+            print(f"Unknown exercises: {', '.join(sorted(unknown))}")
+            return 2
+
+    cache = {} if args.no_cache else load_cache(args.cache)
+    reports = run(exercises, args.data, cache, args.workers, args.timeout)
+    if not args.no_cache:
+        with contextlib.suppress(OSError):
+            save_cache(args.cache, cache)
+
+    for line in _report_lines(reports, args.show_survivors):
+        print(line)
+    graded = [r for r in reports if r.error is None]
+    total = sum(r.total for r in graded)
+    killed = sum(r.killed for r in graded)
+    overall = killed / total if total else 1.0
+    print(f"\nmutation score {overall:.0%} ({killed}/{total} killed)")
+
+    weak = [r for r in graded if r.score * 100 < args.min_score]
+    return 1 if weak else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
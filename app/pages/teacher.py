@@ -0,0 +1,24 @@
+"""
+HebiKata - Teacher Dashboard
+
+Streamlit page with classroom analytics at ``/teacher?class=CODE``. It is
+not listed in the navigation and asks for ``HEBIKATA_TEACHER_KEY`` (or
+takes it as ``?key=``).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import streamlit as st
+
+from app.ui import render_teacher_dashboard
+
+st.set_page_config(
+    page_title="HebiKata - Teacher Dashboard",
+    page_icon="🐍",
+    layout="wide",
+)
+
+render_teacher_dashboard()
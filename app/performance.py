@@ -0,0 +1,213 @@
+"""
+HebiKata - Performance Katas
+
+Grades exercises with ``type: performance``. Once the usual tests pass, the
+learner's entrypoint function is timed against the reference solution in
+data/solutions on input built by the exercise's ``make_input(size)``
+generator. The speed ratio decides pass/fail against the exercise budget
+and how large a score bonus the learner earns.
+
+Timings follow ``timeit``: warmup calls, a loop count calibrated so each
+batch lasts at least MIN_BATCH_SECONDS, garbage collection paused, and the
+best of N batches. User and reference batches are interleaved so that load
+from other sessions slows both sides alike and the ratio stays stable.
+"""
+
+import gc
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from types import CodeType
+from typing import Any
+
+from app.engine import _HIDDEN_FILES as _ENGINE_FILES
+from app.engine import execute_code_with_tests, new_namespace
+from app.errors import ErrorReport
+from app.profiler import profiled
+
+PERFORMANCE_BONUS = 25
+MIN_BATCH_SECONDS = 0.01
+MAX_CALL_SECONDS = 1.0
+
+_HIDDEN_FILES = _ENGINE_FILES | {__file__}
+
+
+@dataclass(frozen=True)
+class PerformanceSpec:
+    """The ``performance:`` block of an exercise YAML."""
+
+    entrypoint: str
+    input_code: str
+    size: int
+    budget: float
+    repeats: int = 5
+    warmup: int = 1
+
+    @classmethod
+    def from_exercise(cls, exercise: dict[str, Any]) -> "PerformanceSpec":
+        block = exercise["performance"]
+        return cls(
+            entrypoint=block["entrypoint"],
+            input_code=block["input"],
+            size=int(block["size"]),
+            budget=float(block["budget"]),
+            repeats=int(block.get("repeats", 5)),
+            warmup=int(block.get("warmup", 1)),
+        )
+
+
+@dataclass(frozen=True)
+class Timing:
+    """Best per-call times of the learner's and the reference entrypoint."""
+
+    user_seconds: float
+    reference_seconds: float
+
+    @property
+    def ratio(self) -> float:
+        return self.user_seconds / self.reference_seconds
+
+
+def is_performance_kata(exercise: dict[str, Any]) -> bool:
+    return exercise.get("type") == "performance"
+
+
+def speed_bonus(ratio: float, budget: float) -> int:
+    """
+    Score bonus for running at ``ratio`` times the reference time.
+
+    Matching or beating the reference earns PERFORMANCE_BONUS; the bonus
+    falls linearly to zero at the budget and stays zero beyond it.
+    """
+    if ratio <= 1:
+        return PERFORMANCE_BONUS
+    if ratio >= budget:
+        return 0
+    return round(PERFORMANCE_BONUS * (budget - ratio) / (budget - 1))
+
+
+def _load(code: str, name: str, validation: dict[str, Any]) -> Callable[..., Any]:
+    namespace = new_namespace(
+        validation.get("imports"),
+        validation.get("modules"),
+        validation.get("fixtures"),
+    )
+    exec(code, namespace)
+    func = namespace.get(name)
+    if not callable(func):
+        raise NameError(f"{name}() is not defined")
+    return func  # type: ignore[no-any-return]
+
+
+def _batch(func: Callable[..., Any], args: tuple[Any, ...], number: int) -> float:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def time_against_reference(
+    user: Callable[..., Any],
+    reference: Callable[..., Any],
+    args: tuple[Any, ...],
+    spec: PerformanceSpec,
+) -> Timing:
+    """
+    Time ``user(*args)`` and ``reference(*args)`` with interleaved batches.
+
+    A learner call slower than MAX_CALL_SECONDS ends the measurement early
+    with that single call as the result, so hopelessly slow code fails fast.
+    """
+    numbers = []
+    for func in (user, reference):
+        elapsed = 0.0
+        for _ in range(max(1, spec.warmup)):
+            elapsed = _batch(func, args, 1)
+        if func is user and elapsed > MAX_CALL_SECONDS:
+            return Timing(elapsed, _batch(reference, args, 1))
+        numbers.append(max(1, math.ceil(MIN_BATCH_SECONDS / max(elapsed, 1e-9))))
+
+    best_user = best_reference = math.inf
+    for _ in range(spec.repeats):
+        best_user = min(best_user, _batch(user, args, numbers[0]) / numbers[0])
+        best_reference = min(
+            best_reference, _batch(reference, args, numbers[1]) / numbers[1]
+        )
+    return Timing(best_user, best_reference)
+
+
+@profiled
+def grade_performance(
+    user_code: str,
+    exercise: dict[str, Any],
+    reference_code: str,
+    tests: CodeType | None = None,
+) -> dict[str, Any]:
+    """
+    Run the exercise tests, then time the learner against the reference.
+
+    Args:
+        user_code: The learner's submission.
+        exercise: Exercise dict with ``validation`` and ``performance`` blocks.
+        reference_code: Source of data/solutions/{id}.py.
+        tests: ``validation.tests`` already compiled, if available.
+
+    Returns:
+        The execute_code_with_tests() result when the tests fail; otherwise
+        the same keys plus ``performance`` (user/reference seconds, ratio,
+        budget and bonus), failing if the ratio exceeds the budget.
+    """
+    validation = exercise["validation"]
+    result = execute_code_with_tests(
+        user_code,
+        tests or validation["tests"],
+        imports=validation.get("imports"),
+        modules=validation.get("modules"),
+        fixtures=validation.get("fixtures"),
+    )
+    if not result["success"]:
+        return result
+
+    spec = PerformanceSpec.from_exercise(exercise)
+    try:
+        user = _load(user_code, spec.entrypoint, validation)
+        reference = _load(reference_code, spec.entrypoint, validation)
+        args = tuple(_load(spec.input_code, "make_input", validation)(spec.size))
+        timing = time_against_reference(user, reference, args, spec)
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"❌ Error: {type(e).__name__}",
+            "error": ErrorReport.from_exception(e, _HIDDEN_FILES),
+        }
+
+    performance = {
+        "user_seconds": timing.user_seconds,
+        "reference_seconds": timing.reference_seconds,
+        "ratio": timing.ratio,
+        "budget": spec.budget,
+        "bonus": speed_bonus(timing.ratio, spec.budget),
+    }
+    if timing.ratio > spec.budget:
+        return {
+            "success": False,
+            "message": (
+                f"⏱ Too slow: {timing.ratio:.1f}× the reference time "
+                f"(budget {spec.budget:g}×)"
+            ),
+            "error": None,
+            "performance": performance,
+        }
+    return {
+        "success": True,
+        "message": f"✅ All tests passed at {timing.ratio:.1f}× the reference time!",
+        "error": None,
+        "performance": performance,
+    }
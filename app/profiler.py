@@ -0,0 +1,117 @@
+"""
+HebiKata - Rerun Profiler
+
+Opt-in developer instrumentation for finding slow parts of a rerun.
+Set ``HEBIKATA_PROFILE=1`` to enable it; when unset, ``profiled()`` returns
+the wrapped function unchanged so production reruns pay nothing.
+
+Each Streamlit rerun executes on its own script thread, so samples are
+collected per thread and handed to the UI by ``collect_samples()`` at the
+end of ``render_app()``. Set ``HEBIKATA_PROFILE_FILE`` to also append every
+rerun's samples as one JSON line for offline analysis.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from functools import wraps
+from typing import Any
+
+from app.env import env_flag
+
+PROFILE_ENV = "HEBIKATA_PROFILE"
+PROFILE_FILE_ENV = "HEBIKATA_PROFILE_FILE"
+
+ENABLED = env_flag(PROFILE_ENV)
+
+
+@dataclass(frozen=True, slots=True)
+class Sample:
+    """One timed call: nesting depth plus start offset and duration in ns."""
+
+    name: str
+    depth: int
+    start_ns: int
+    duration_ns: int
+
+
+class _ThreadSamples(threading.local):
+    def __init__(self) -> None:
+        self.samples: list[Sample] = []
+        self.depth = 0
+        self.origin_ns: int | None = None
+
+
+_local = _ThreadSamples()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block and record it as a sample on this thread."""
+    if not ENABLED:
+        yield
+        return
+
+    start = time.perf_counter_ns()
+    if _local.origin_ns is None:
+        _local.origin_ns = start
+    depth = _local.depth
+    _local.depth += 1
+    try:
+        yield
+    finally:
+        _local.depth = depth
+        _local.samples.append(
+            Sample(
+                name=name,
+                depth=depth,
+                start_ns=start - _local.origin_ns,
+                duration_ns=time.perf_counter_ns() - start,
+            )
+        )
+
+
+def profiled(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator that records each call of ``func`` when profiling is enabled."""
+    if not ENABLED:
+        return func
+
+    name = func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with span(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def collect_samples() -> list[Sample]:
+    """
+    Return this thread's samples in call order and start a fresh collection.
+
+    Samples are appended when a call *finishes*, so they are re-sorted by
+    start offset to give a top-down, flame-style ordering.
+    """
+    samples = sorted(_local.samples, key=lambda s: (s.start_ns, s.depth))
+    _local.samples = []
+    _local.depth = 0
+    _local.origin_ns = None
+
+    path = os.environ.get(PROFILE_FILE_ENV)
+    if path and samples:
+        _append_samples(path, samples)
+    return samples
+
+
+def _append_samples(path: str, samples: list[Sample]) -> None:
+    record = {"ts": time.time(), "samples": [asdict(s) for s in samples]}
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError:
+        pass
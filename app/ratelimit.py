@@ -0,0 +1,199 @@
+"""
+HebiKata - Run Rate Limiting
+
+Token buckets in front of ``_run_tests()`` so one learner hammering Run
+Tests, or a scripted client, cannot take the engine away from the rest of
+a class. Each run takes one token from every bucket that applies:
+
+- the session's own bucket (``HEBIKATA_SESSION_RUNS_PER_MIN``, bursts of
+  ``HEBIKATA_SESSION_RUN_BURST``),
+- optionally one per client IP address (``HEBIKATA_CLIENT_RUNS_PER_MIN``),
+  which also covers reloads and extra tabs; leave it off when a whole
+  class shares one address behind NAT,
+- optionally one for the whole server (``HEBIKATA_GLOBAL_RUNS_PER_MIN``).
+
+Client and global buckets allow bursts of ten seconds' worth of runs. A
+rate of 0 disables a bucket. A throttled run is not graded, so it costs
+no attempt and no life; the learner is told how long to wait.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+import streamlit as st
+
+from app import metrics
+from app.env import env_float
+
+SESSION_RATE_ENV = "HEBIKATA_SESSION_RUNS_PER_MIN"
+SESSION_BURST_ENV = "HEBIKATA_SESSION_RUN_BURST"
+CLIENT_RATE_ENV = "HEBIKATA_CLIENT_RUNS_PER_MIN"
+GLOBAL_RATE_ENV = "HEBIKATA_GLOBAL_RUNS_PER_MIN"
+
+DEFAULT_SESSION_RUNS_PER_MIN = 12.0
+DEFAULT_SESSION_RUN_BURST = 5.0
+# Client buckets kept before the least recently used is dropped.
+MAX_CLIENTS = 4096
+
+_BUCKET_KEY = "run_bucket"
+
+
+class TokenBucket:
+    """
+    ``burst`` tokens refilled at ``rate`` tokens per second.
+
+    Not thread-safe on its own; RateLimiter serializes access.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available; 0.0 if one is now."""
+        elapsed = max(now - self.updated, 0.0)
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated = max(now, self.updated)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class Throttle(NamedTuple):
+    scope: str  # "session", "client" or "global"
+    wait_seconds: float
+
+
+class RateLimiter:
+    """
+    Session, per-client and global buckets; rates are runs per minute.
+
+    Session buckets belong to their session (see ``new_session_bucket()``);
+    the limiter keeps the client and global ones.
+    """
+
+    def __init__(
+        self,
+        session_rate: float,
+        session_burst: float,
+        client_rate: float = 0.0,
+        global_rate: float = 0.0,
+        max_clients: int = MAX_CLIENTS,
+    ) -> None:
+        self.session_rate = session_rate / 60
+        self.session_burst = max(session_burst, 1.0)
+        self.client_rate = client_rate / 60
+        self.max_clients = max_clients
+        self._clients: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._global = (
+            TokenBucket(global_rate / 60, _burst(global_rate), time.monotonic())
+            if global_rate
+            else None
+        )
+        self._lock = threading.Lock()
+
+    def new_session_bucket(self, now: float | None = None) -> TokenBucket | None:
+        if not self.session_rate:
+            return None
+        now = time.monotonic() if now is None else now
+        return TokenBucket(self.session_rate, self.session_burst, now)
+
+    def _client_bucket(self, client: str | None, now: float) -> TokenBucket | None:
+        if not self.client_rate or client is None:
+            return None
+        bucket = self._clients.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.client_rate, _burst(self.client_rate * 60), now)
+            self._clients[client] = bucket
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client)
+        return bucket
+
+    def acquire(
+        self,
+        session_bucket: TokenBucket | None,
+        client: str | None,
+        now: float | None = None,
+    ) -> Throttle | None:
+        """
+        Take a token from every applicable bucket, or none if any is empty.
+
+        Returns None when the run may go ahead, else the bucket that must
+        refill longest and how long that takes.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            buckets = [
+                ("session", session_bucket),
+                ("client", self._client_bucket(client, now)),
+                ("global", self._global),
+            ]
+            throttle = None
+            for scope, bucket in buckets:
+                if bucket is None:
+                    continue
+                wait = bucket.wait_time(now)
+                if wait and (throttle is None or wait > throttle.wait_seconds):
+                    throttle = Throttle(scope, wait)
+            if throttle is None:
+                for _scope, bucket in buckets:
+                    if bucket is not None:
+                        bucket.take()
+            return throttle
+
+
+def _burst(runs_per_min: float) -> float:
+    return max(runs_per_min / 6, 1.0)
+
+
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> RateLimiter:
+    """The process-wide limiter, configured from the environment."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    env_float(SESSION_RATE_ENV, DEFAULT_SESSION_RUNS_PER_MIN, 0.0),
+                    env_float(SESSION_BURST_ENV, DEFAULT_SESSION_RUN_BURST, 1.0),
+                    env_float(CLIENT_RATE_ENV, 0.0, 0.0),
+                    env_float(GLOBAL_RATE_ENV, 0.0, 0.0),
+                )
+    return _limiter
+
+
+def acquire_run() -> Throttle | None:
+    """
+    Admit one test run for the current session, or say why not.
+
+    The session's bucket lives in its session state.
+    """
+    limiter = get_limiter()
+    if _BUCKET_KEY not in st.session_state:
+        st.session_state[_BUCKET_KEY] = limiter.new_session_bucket()
+    throttle = limiter.acquire(st.session_state[_BUCKET_KEY], st.context.ip_address)
+    if throttle is not None:
+        metrics.RUNS_THROTTLED.labels(throttle.scope).inc()
+    return throttle
+
+
+def throttle_message(throttle: Throttle) -> str:
+    seconds = max(1, round(throttle.wait_seconds))
+    if throttle.scope == "global":
+        return f"The dojo is busy right now. Try again in {seconds} s."
+    return (
+        f"Slow down, ninja! Try again in {seconds} s. "
+        "Throttled runs don't cost a life."
+    )
@@ -0,0 +1,148 @@
+"""
+HebiKata - Spaced Repetition
+
+SM-2 review scheduling. A graded submission rates the learner's recall of
+that exercise (0-5), which moves its next review further out after a
+clean solve and brings it back within minutes after a failure. Only the
+first graded run on a new or due exercise counts as a review, or one
+MIN_REVIEW_GAP_SECONDS after the last review: the runs it takes to get a
+solution right are practice, not recall. A failed exercise is due again
+after RELEARN_SECONDS, so its next run is graded as relearning.
+
+A ReviewQueue keeps the scheduled exercises in a binary heap keyed by due
+time, so rescheduling an exercise and asking "what should I practice now"
+are O(log n) however many exercises a learner has seen. Rescheduling
+pushes a new heap entry and leaves the old one behind; stale entries are
+skipped when they surface and the heap is rebuilt once they outnumber the
+live ones.
+"""
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Any
+
+DAY_SECONDS = 86_400.0
+# A failed exercise comes back this soon, whatever its interval was.
+RELEARN_SECONDS = 600.0
+# A run this long after the last review counts even if it is not yet due.
+MIN_REVIEW_GAP_SECONDS = DAY_SECONDS
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# Recall ratings below this reset the repetition count.
+PASSING_QUALITY = 3
+
+
+def recall_quality(success: bool, hints_used: int) -> int:
+    """
+    Rate a submission on SM-2's 0-5 recall scale.
+
+    A solve without hints is perfect recall (5); each hint costs a point,
+    down to the passing grade of 3. A failed run rates 1.
+    """
+    if not success:
+        return 1
+    return max(PASSING_QUALITY, 5 - hints_used)
+
+
+@dataclass(slots=True)
+class ReviewCard:
+    """Scheduling state of one exercise."""
+
+    ease: float = DEFAULT_EASE
+    interval_days: float = 0.0
+    repetitions: int = 0
+    due: float = 0.0
+    reviewed: float | None = None
+
+    def review(self, quality: int, now: float) -> None:
+        """Apply one SM-2 review graded ``quality`` (0-5) at time ``now``."""
+        if quality >= PASSING_QUALITY:
+            if self.repetitions == 0:
+                self.interval_days = 1.0
+            elif self.repetitions == 1:
+                self.interval_days = 6.0
+            else:
+                self.interval_days = round(self.interval_days * self.ease, 2)
+            self.repetitions += 1
+            self.due = now + self.interval_days * DAY_SECONDS
+        else:
+            self.repetitions = 0
+            self.interval_days = 0.0
+            self.due = now + RELEARN_SECONDS
+        self.reviewed = now
+        miss = 5 - quality
+        self.ease = max(MIN_EASE, self.ease + 0.1 - miss * (0.08 + miss * 0.02))
+
+
+class ReviewQueue:
+    """Review schedule for one learner, keyed by exercise index."""
+
+    def __init__(self) -> None:
+        self._cards: dict[int, ReviewCard] = {}
+        self._heap: list[tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def __contains__(self, exercise_idx: object) -> bool:
+        return exercise_idx in self._cards
+
+    def card(self, exercise_idx: int) -> ReviewCard | None:
+        return self._cards.get(exercise_idx)
+
+    def wants_review(self, exercise_idx: int, now: float | None = None) -> bool:
+        """Whether a graded run on ``exercise_idx`` now counts as a review."""
+        card = self._cards.get(exercise_idx)
+        if card is None or card.reviewed is None:
+            return True
+        now = time.time() if now is None else now
+        return card.due <= now or now - card.reviewed >= MIN_REVIEW_GAP_SECONDS
+
+    def record(
+        self, exercise_idx: int, quality: int, now: float | None = None
+    ) -> ReviewCard:
+        """Reschedule ``exercise_idx`` after a review graded ``quality``."""
+        card = self._cards.get(exercise_idx)
+        if card is None:
+            card = self._cards[exercise_idx] = ReviewCard()
+        card.review(quality, time.time() if now is None else now)
+        heapq.heappush(self._heap, (card.due, exercise_idx))
+        if len(self._heap) > 2 * len(self._cards) + 16:
+            self._heap = [(c.due, i) for i, c in self._cards.items()]
+            heapq.heapify(self._heap)
+        return card
+
+    def peek(self) -> tuple[float, int] | None:
+        """``(due, exercise_idx)`` of the earliest scheduled review."""
+        heap = self._heap
+        while heap:
+            due, exercise_idx = heap[0]
+            if self._cards[exercise_idx].due == due:
+                return due, exercise_idx
+            heapq.heappop(heap)  # superseded by a later record()
+        return None
+
+    def next_due(self, now: float | None = None) -> int | None:
+        """The exercise most overdue for review, or None if nothing is due."""
+        head = self.peek()
+        if head is None or head[0] > (time.time() if now is None else now):
+            return None
+        return head[1]
+
+    def to_list(self) -> list[list[Any]]:
+        """JSON-ready form for saved progress."""
+        return [
+            [idx, c.ease, c.interval_days, c.repetitions, c.due, c.reviewed]
+            for idx, c in self._cards.items()
+        ]
+
+    @classmethod
+    def from_list(cls, rows: list[list[Any]]) -> "ReviewQueue":
+        queue = cls()
+        for idx, *fields in rows:  # rows saved before ``reviewed`` have 4 fields
+            queue._cards[idx] = ReviewCard(*fields)
+        queue._heap = [(c.due, i) for i, c in queue._cards.items()]
+        heapq.heapify(queue._heap)
+        return queue
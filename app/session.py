@@ -7,12 +7,26 @@ browser refreshes and session timeouts.
 """
 
 import json
+import re
+import time
+import uuid
 from typing import Any
 
 import streamlit as st
-from streamlit_js_eval import get_local_storage, set_local_storage
-
-from app.data_loader import load_exercises
+from streamlit_js_eval import set_local_storage, streamlit_js_eval
+
+from app import metrics
+from app.analytics import get_analytics
+from app.data_loader import DEFAULT_PACK, available_packs, load_exercises
+from app.drafts import DraftStore
+from app.leaderboard import (
+    GLOBAL_BOARD,
+    classroom_board,
+    display_name,
+    get_leaderboard,
+)
+from app.profiler import profiled
+from app.review import ReviewQueue, recall_quality
 
 STORAGE_KEY = "hebikata_progress"
 
@@ -21,63 +35,268 @@ MASTERY_THRESHOLD = 3
 POINTS_PER_SUCCESS = 50
 HINT_PENALTY = 10
 
+# Minimum seconds between draft writes while the learner types.
+DRAFT_SAVE_SECONDS = 5.0
 
-def save_progress() -> None:
-    """Serialize current session state to browser localStorage."""
-    state = {
+_CLASSROOM_CODE = re.compile(r"[A-Za-z0-9_-]{1,32}")
+
+
+class StoragePendingError(Exception):
+    """The browser has yet to answer a localStorage read; it reruns when it does."""
+
+
+def storage_key(pack: str) -> str:
+    """localStorage key of a content pack's progress; each pack has its own."""
+    return STORAGE_KEY if pack == DEFAULT_PACK else f"{STORAGE_KEY}:{pack}"
+
+
+def progress_snapshot() -> dict[str, Any]:
+    """Return the persisted subset of session state as a JSON-ready dict."""
+    return {
+        "learner_id": st.session_state.learner_id,
+        "exercise_ids": [exercise["id"] for exercise in st.session_state.exercises],
         "successes": st.session_state.successes,
         "attempts": st.session_state.attempts,
         "score": st.session_state.score,
         "lives": st.session_state.lives,
         "current_exercise_idx": st.session_state.current_exercise_idx,
         "hint_levels": st.session_state.hint_levels,
+        "review": st.session_state.review.to_list(),
     }
-    set_local_storage(STORAGE_KEY, json.dumps(state))
 
 
-def load_progress() -> dict[str, Any] | None:
-    """Deserialize saved progress from browser localStorage."""
-    raw = get_local_storage(STORAGE_KEY)
+@profiled
+def save_progress() -> None:
+    """
+    Serialize current session state to browser localStorage.
+
+    Also writes pending code drafts and feeds the classroom analytics and
+    the leaderboards.
+    """
+    with metrics.PROGRESS_SAVE_SECONDS.time():
+        snapshot = progress_snapshot()
+        set_local_storage(storage_key(st.session_state.pack), json.dumps(snapshot))
+        save_drafts(force=True)
+    get_analytics(st.session_state.pack, MASTERY_THRESHOLD).ingest(
+        st.session_state.learner_id, st.session_state.classroom, snapshot
+    )
+    publish_score()
+
+
+def publish_score() -> None:
+    """Push the current score to the global and classroom leaderboards."""
+    score = st.session_state.score
+    published = st.session_state.published_score
+    if score == published or (published is None and score == 0):
+        return
+    boards = [GLOBAL_BOARD]
+    if st.session_state.classroom:
+        boards.append(classroom_board(st.session_state.classroom))
+    learner_id = st.session_state.learner_id
+    get_leaderboard().submit(learner_id, display_name(learner_id), score, boards)
+    st.session_state.published_score = score
+
+
+def _classroom_from_url() -> str | None:
+    """Classroom code from the ``?class=CODE`` query parameter, if valid."""
+    code = st.query_params.get("class")
+    if code and _CLASSROOM_CODE.fullmatch(code):
+        return code
+    return None
+
+
+def _pack_from_url() -> str:
+    """Content pack from the ``?pack=NAME`` query parameter, if installed."""
+    pack = st.query_params.get("pack")
+    if pack and pack in available_packs():
+        return pack
+    return DEFAULT_PACK
+
+
+def read_local_storage(key: str) -> str | None:
+    """
+    The value stored under ``key`` in browser localStorage, None if unset.
+
+    The browser answers through a component on a later rerun, and until
+    then the component reports None just like a missing key would. So the
+    value is read JSON-encoded, where a missing key is the string "null".
+
+    Raises:
+        StoragePendingError: The browser has not answered yet.
+    """
+    answer = streamlit_js_eval(
+        js_expressions=f"JSON.stringify(localStorage.getItem({json.dumps(key)}))",
+        key=f"read_local_storage_{key}",
+    )
+    if not isinstance(answer, str):
+        raise StoragePendingError(key)
+    return json.loads(answer)  # type: ignore[no-any-return]
+
+
+def load_progress(pack: str = DEFAULT_PACK) -> dict[str, Any] | None:
+    """
+    Deserialize a content pack's saved progress from browser localStorage.
+
+    Raises:
+        StoragePendingError: The browser has not answered yet.
+    """
+    raw = read_local_storage(storage_key(pack))
     if raw:
         try:
-            return json.loads(raw)  # type: ignore[no-any-return]
+            saved = json.loads(raw)
         except (json.JSONDecodeError, TypeError):
+            metrics.PROGRESS_RESTORES.labels("corrupt").inc()
             return None
+        metrics.PROGRESS_RESTORES.labels("restored").inc()
+        return saved  # type: ignore[no-any-return]
+    metrics.PROGRESS_RESTORES.labels("empty").inc()
     return None
 
 
+def migrate_progress(
+    saved: dict[str, Any], exercise_ids: list[str]
+) -> dict[str, Any] | None:
+    """
+    Line saved per-exercise progress up with the pack's exercises by id.
+
+    Exercises that left the pack are dropped and new ones start fresh.
+    Saves from before ids were stored are taken to cover the first
+    exercises of the pack in order, as the curriculum grows by appending.
+
+    Returns:
+        The per-exercise fields of ``saved`` (and ``current_exercise_idx``)
+        indexed like ``exercise_ids``, or None if they cannot be lined up.
+    """
+    successes = saved.get("successes", [])
+    saved_ids = saved.get("exercise_ids") or exercise_ids[: len(successes)]
+    if not successes or len(saved_ids) != len(successes):
+        return None
+    defaults = {"successes": 0, "attempts": 0, "hint_levels": -1}
+    lists = {
+        key: saved[key] if key in saved else [default] * len(saved_ids)
+        for key, default in defaults.items()
+    }
+    if any(len(values) != len(saved_ids) for values in lists.values()):
+        return None
+    old_index = {exercise_id: i for i, exercise_id in enumerate(saved_ids)}
+    positions = [old_index.get(exercise_id) for exercise_id in exercise_ids]
+    new_index = {old: new for new, old in enumerate(positions) if old is not None}
+    migrated: dict[str, Any] = {
+        key: [defaults[key] if old is None else values[old] for old in positions]
+        for key, values in lists.items()
+    }
+    migrated["current_exercise_idx"] = new_index.get(
+        saved.get("current_exercise_idx", 0), 0
+    )
+    migrated["review"] = ReviewQueue.from_list(
+        [
+            [new_index[row[0]], *row[1:]]
+            for row in saved.get("review", [])
+            if row[0] in new_index
+        ]
+    )
+    return migrated
+
+
+def _drafts_key(pack: str) -> str:
+    return f"{storage_key(pack)}:drafts"
+
+
+def save_drafts(force: bool = False) -> None:
+    """
+    Write changed code drafts to localStorage.
+
+    Unless ``force`` is set, writes are debounced to one per
+    DRAFT_SAVE_SECONDS; the next forced save picks up what was skipped.
+    """
+    drafts = st.session_state.drafts
+    if not drafts.dirty:
+        return
+    now = time.monotonic()
+    if not force and now - st.session_state.drafts_saved_at < DRAFT_SAVE_SECONDS:
+        return
+    set_local_storage(_drafts_key(st.session_state.pack), drafts.dumps())
+    drafts.dirty = False
+    st.session_state.drafts_saved_at = now
+
+
+def update_draft(code: str) -> None:
+    """Record editor contents as the current exercise's draft."""
+    st.session_state.user_code = code
+    exercise = get_current_exercise()
+    st.session_state.drafts.put(
+        exercise["id"], code, exercise["content"]["initial_code"]
+    )
+    save_drafts()
+
+
 def reset_all_progress() -> None:
-    """Clear localStorage and reset all session state variables."""
-    set_local_storage(STORAGE_KEY, "")
+    """Clear localStorage, leaderboard entries and all session state variables."""
+    if "pack" in st.session_state:
+        set_local_storage(storage_key(st.session_state.pack), "")
+        set_local_storage(_drafts_key(st.session_state.pack), "")
+    if "learner_id" in st.session_state:
+        get_leaderboard().remove(st.session_state.learner_id)
     for key in list(st.session_state.keys()):
         del st.session_state[key]
     st.rerun()
 
 
-def initialize_session_state() -> None:
+def evict_session_state() -> None:
+    """
+    Flush progress and drafts to localStorage, then drop the session state.
+
+    Only the ``evicted`` flag is kept; the next initialization after it is
+    cleared restores progress from localStorage, as a page reload would.
+    """
+    if "successes" in st.session_state:
+        save_progress()
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    st.session_state.evicted = True
+
+
+@profiled
+def initialize_session_state() -> bool:
     """
     Initialize Streamlit session state variables.
 
-    On first run, attempts to restore progress from localStorage.
-    Falls back to defaults if no saved data exists or if the exercise
-    count has changed (e.g., after an update adding new exercises).
+    On first run, loads the content pack chosen with ``?pack=`` and attempts
+    to restore progress for it from localStorage, matched to the current
+    exercises by id (see migrate_progress()).
+    Falls back to defaults if no saved data exists or it cannot be matched.
+
+    Returns:
+        False, leaving progress and drafts uninitialized, while the browser
+        has yet to answer the localStorage reads; the session reruns once it
+        has. Nothing is written back before then, so stored drafts and
+        progress cannot be overwritten with empty ones.
     """
     if "exercises" not in st.session_state:
-        st.session_state.exercises = load_exercises()
+        st.session_state.pack = _pack_from_url()
+        st.session_state.exercises = load_exercises(st.session_state.pack)
 
     num_exercises = len(st.session_state.exercises)
 
     if "successes" not in st.session_state:
-        saved = load_progress()
-        if saved and len(saved.get("successes", [])) == num_exercises:
-            st.session_state.successes = saved["successes"]
-            st.session_state.attempts = saved["attempts"]
-            st.session_state.score = saved["score"]
-            st.session_state.lives = saved["lives"]
-            st.session_state.current_exercise_idx = saved["current_exercise_idx"]
-            st.session_state.hint_levels = saved.get(
-                "hint_levels", [-1] * num_exercises
-            )
+        try:
+            stored_drafts = read_local_storage(_drafts_key(st.session_state.pack))
+            saved = load_progress(st.session_state.pack)
+        except StoragePendingError:
+            return False
+        metrics.SESSIONS_STARTED.inc()
+        st.session_state.learner_id = (saved or {}).get("learner_id") or (
+            uuid.uuid4().hex
+        )
+        st.session_state.classroom = _classroom_from_url()
+        st.session_state.published_score = None
+        exercise_ids = [exercise["id"] for exercise in st.session_state.exercises]
+        migrated = migrate_progress(saved, exercise_ids) if saved else None
+        if migrated:
+            for key, value in migrated.items():
+                st.session_state[key] = value
+            st.session_state.score = saved.get("score", 0)
+            st.session_state.lives = saved.get("lives", DEFAULT_LIVES)
         else:
             st.session_state.successes = [0] * num_exercises
             st.session_state.attempts = [0] * num_exercises
@@ -85,38 +304,77 @@ def initialize_session_state() -> None:
             st.session_state.lives = DEFAULT_LIVES
             st.session_state.current_exercise_idx = 0
             st.session_state.hint_levels = [-1] * num_exercises
+            st.session_state.review = ReviewQueue()
+        st.session_state.drafts = DraftStore.loads(stored_drafts)
+        st.session_state.drafts_saved_at = 0.0
 
     if "user_code" not in st.session_state:
-        current_exercise = st.session_state.exercises[
+        st.session_state.user_code = _exercise_code(
             st.session_state.current_exercise_idx
-        ]
-        st.session_state.user_code = current_exercise["content"]["initial_code"]
+        )
+    return True
+
+
+def _exercise_code(idx: int) -> str:
+    """The saved draft of exercise ``idx``, or its initial code."""
+    exercise = st.session_state.exercises[idx]
+    draft = st.session_state.drafts.get(exercise["id"])
+    return draft if draft is not None else exercise["content"]["initial_code"]  # type: ignore[no-any-return]
+
+
+def _open_exercise(idx: int) -> None:
+    """Switch to exercise ``idx``, keeping the current code as a draft."""
+    update_draft(st.session_state.user_code)
+    save_drafts(force=True)
+    st.session_state.current_exercise_idx = idx
+    st.session_state.user_code = _exercise_code(idx)
 
 
 def reset_exercise_code() -> None:
     """Reset code editor to initial state for current exercise."""
     current_exercise = st.session_state.exercises[st.session_state.current_exercise_idx]
     st.session_state.user_code = current_exercise["content"]["initial_code"]
+    st.session_state.drafts.discard(current_exercise["id"])
+    save_drafts(force=True)
 
 
 def next_exercise() -> None:
     """Navigate to next exercise in the sequence."""
     if st.session_state.current_exercise_idx < len(st.session_state.exercises) - 1:
-        st.session_state.current_exercise_idx += 1
-        current_exercise = st.session_state.exercises[
-            st.session_state.current_exercise_idx
-        ]
-        st.session_state.user_code = current_exercise["content"]["initial_code"]
+        _open_exercise(st.session_state.current_exercise_idx + 1)
 
 
 def previous_exercise() -> None:
     """Navigate to previous exercise in the sequence."""
     if st.session_state.current_exercise_idx > 0:
-        st.session_state.current_exercise_idx -= 1
-        current_exercise = st.session_state.exercises[
-            st.session_state.current_exercise_idx
-        ]
-        st.session_state.user_code = current_exercise["content"]["initial_code"]
+        _open_exercise(st.session_state.current_exercise_idx - 1)
+
+
+def record_review(success: bool) -> None:
+    """
+    Reschedule the current exercise's next review from a graded run.
+
+    Only a run on a new or due exercise counts (see
+    ReviewQueue.wants_review()); retries after it leave the schedule alone.
+    """
+    idx = st.session_state.current_exercise_idx
+    if not st.session_state.review.wants_review(idx):
+        return
+    hints_used = st.session_state.hint_levels[idx] + 1
+    st.session_state.review.record(idx, recall_quality(success, hints_used))
+
+
+def review_exercise() -> bool:
+    """
+    Jump to the exercise most overdue for review.
+
+    Returns False, leaving the current exercise in place, if nothing is due.
+    """
+    due_idx = st.session_state.review.next_due()
+    if due_idx is None:
+        return False
+    _open_exercise(due_idx)
+    return True
 
 
 def get_current_exercise() -> dict[str, Any]:
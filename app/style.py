@@ -0,0 +1,510 @@
+"""
+HebiKata - Style Feedback
+
+Small PEP 8 checker run on every submission. It covers the issues learners
+hit most, with pycodestyle/pep8-naming codes: line length and trailing
+whitespace, spacing around operators, commas, brackets and comments,
+comparisons to None/True/False, bare excepts, lambda assignments,
+statements sharing a line, blank lines around top-level definitions, and
+snake_case/CapWords naming.
+
+Results are cached by content at two levels: each physical line (text
+checks) and each top-level statement (token and AST checks, keyed by the
+statement's source). After a small edit only the changed lines and the
+statement containing them are checked again; blank-line spacing between
+statements is recomputed each time from line numbers alone.
+"""
+
+import ast
+import contextlib
+import io
+import keyword
+import re
+import tokenize
+from collections.abc import Iterator
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.profiler import profiled
+
+MAX_LINE_LENGTH = 79
+_CACHE_SIZE = 4096
+
+_SNAKE_CASE = re.compile(r"_{0,2}[a-z][a-z0-9_]*")
+_CAP_WORDS = re.compile(r"_?[A-Z][A-Za-z0-9]*")
+_CONSTANT = re.compile(r"_?[A-Z][A-Z0-9_]*")
+_MIXED_CASE = re.compile(r"_?[a-z][a-z0-9]*[A-Z]\w*")
+_AMBIGUOUS = frozenset({"l", "O", "I"})
+
+# Operators that always need a space on both sides.
+_SPACED_OPERATORS = frozenset(
+    {"==", "!=", "<", ">", "<=", ">=", "->", ":="}
+    | {op + "=" for op in ("+", "-", "*", "/", "//", "%", "**", "&", "|", "^")}
+    | {">>=", "<<=", "@="}
+)
+_SKIPPED_TOKENS = frozenset(
+    {
+        tokenize.NL,
+        tokenize.NEWLINE,
+        tokenize.INDENT,
+        tokenize.DEDENT,
+        tokenize.ENDMARKER,
+    }
+)
+# Python 3.12 tokenizes f-string replacement fields; their ``=``/``!r``/
+# format specs follow other rules, so operator checks skip them.
+_FSTRING_START = getattr(tokenize, "FSTRING_START", None)
+_FSTRING_END = getattr(tokenize, "FSTRING_END", None)
+_OPENERS = frozenset("([{")
+_CLOSERS = frozenset(")]}")
+
+
+class StyleIssue(NamedTuple):
+    """One finding; ``line`` and ``col`` are 1-based."""
+
+    line: int
+    col: int
+    code: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.line}:{self.col} {self.code} {self.message}"
+
+
+# (line offset within the checked text, col, code, message)
+_Finding = tuple[int, int, str, str]
+
+
+def _snake_case(name: str) -> str:
+    return re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", name).lower()
+
+
+# ═══════════════════════════════════════════════════════════════
+# LINES
+# ═══════════════════════════════════════════════════════════════
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _check_line(text: str) -> tuple[_Finding, ...]:
+    findings: list[_Finding] = []
+    if len(text) > MAX_LINE_LENGTH:
+        findings.append(
+            (
+                0,
+                MAX_LINE_LENGTH + 1,
+                "E501",
+                f"line too long ({len(text)} > {MAX_LINE_LENGTH} characters)",
+            )
+        )
+    stripped = text.rstrip()
+    if stripped and stripped != text:
+        findings.append((0, len(stripped) + 1, "W291", "trailing whitespace"))
+    elif text and not stripped:
+        findings.append((0, 1, "W293", "whitespace on a blank line"))
+    indent = text[: len(text) - len(text.lstrip())]
+    if "\t" in indent:
+        findings.append(
+            (0, indent.index("\t") + 1, "W191", "indent with spaces, not tabs")
+        )
+    return tuple(findings)
+
+
+# ═══════════════════════════════════════════════════════════════
+# STATEMENTS
+# ═══════════════════════════════════════════════════════════════
+
+
+def _tokens(text: str) -> list[tokenize.TokenInfo]:
+    tokens: list[tokenize.TokenInfo] = []
+    # On a tokenizer error, keep the tokens read so far.
+    with contextlib.suppress(tokenize.TokenError, SyntaxError):
+        tokens.extend(tokenize.generate_tokens(io.StringIO(text).readline))
+    return tokens
+
+
+def _token_findings(text: str) -> Iterator[_Finding]:
+    lines = text.splitlines()
+    tokens = [t for t in _tokens(text) if t.type not in _SKIPPED_TOKENS]
+    # Innermost open bracket, and whether its current item is annotated
+    # (``x: int = 1`` wants spaces around ``=``; ``f(x=1)`` does not). A
+    # lambda's parameter list counts as a bracket closed by its ``:``.
+    brackets: list[list[str | bool]] = []
+    fstrings = 0
+    for i, tok in enumerate(tokens):
+        if tok.type == _FSTRING_START:
+            fstrings += 1
+        elif tok.type == _FSTRING_END:
+            fstrings -= 1
+        if fstrings:
+            continue
+        row, col = tok.start
+        line = lines[row - 1] if row <= len(lines) else ""
+        prev = tokens[i - 1] if i else None
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        same_line_next = nxt is not None and nxt.start[0] == row
+        same_line_prev = prev is not None and prev.end[0] == row
+
+        if tok.type == tokenize.COMMENT:
+            body = tok.string
+            if same_line_prev:
+                if line[max(col - 2, 0) : col] != "  ":
+                    yield (
+                        row - 1,
+                        col + 1,
+                        "E261",
+                        "at least two spaces before inline comment",
+                    )
+                if not body.startswith("# ") and body != "#":
+                    yield (
+                        row - 1,
+                        col + 1,
+                        "E262",
+                        "inline comment should start with '# '",
+                    )
+            elif not body.startswith(("# ", "#!")) and body.strip("#"):
+                yield (row - 1, col + 1, "E265", "block comment should start with '# '")
+            continue
+
+        if tok.type != tokenize.OP:
+            if tok.type == tokenize.NAME and tok.string == "lambda":
+                brackets.append(["lambda", False])
+            if (
+                tok.type == tokenize.NAME
+                and not keyword.iskeyword(tok.string)
+                and nxt is not None
+                and nxt.string in ("(", "[")
+                and nxt.start[0] == row
+                and nxt.start[1] > tok.end[1]
+                and (prev is None or prev.string not in ("def", "class"))
+            ):
+                yield (
+                    row - 1,
+                    tok.end[1] + 1,
+                    "E211",
+                    f"whitespace before '{nxt.string}'",
+                )
+            continue
+
+        op = tok.string
+        if op in _OPENERS:
+            brackets.append([op, False])
+            if (
+                same_line_next
+                and nxt is not None
+                and nxt.start[1] > tok.end[1]
+                and nxt.type != tokenize.COMMENT
+            ):
+                yield (row - 1, col + 2, "E201", f"whitespace after '{op}'")
+        elif op in _CLOSERS:
+            if brackets:
+                brackets.pop()
+            if (
+                same_line_prev
+                and prev is not None
+                and prev.end[1] < col
+                and prev.string not in _OPENERS | {","}
+            ):
+                yield (row - 1, prev.end[1] + 1, "E202", f"whitespace before '{op}'")
+        elif op in (",", ";"):
+            if brackets:
+                brackets[-1][1] = False
+            if same_line_prev and prev is not None and prev.end[1] < col:
+                yield (row - 1, prev.end[1] + 1, "E203", f"whitespace before '{op}'")
+            if (
+                same_line_next
+                and nxt is not None
+                and nxt.start[1] == tok.end[1]
+                and nxt.string not in _CLOSERS
+            ):
+                yield (row - 1, col + 1, "E231", f"missing whitespace after '{op}'")
+        elif op == ":" and brackets and brackets[-1][0] == "lambda":
+            brackets.pop()
+        elif op == ":" and brackets and brackets[-1][0] == "(":
+            brackets[-1][1] = True
+        elif op == "=" and brackets and brackets[-1][0] in ("(", "lambda"):
+            spaced = line[col - 1 : col] == " " or line[col + 1 : col + 2] == " "
+            if brackets[-1][1]:
+                if line[col - 1 : col] != " " or line[col + 1 : col + 2] != " ":
+                    yield (
+                        row - 1,
+                        col + 1,
+                        "E252",
+                        "missing whitespace around parameter equals",
+                    )
+            elif spaced:
+                yield (
+                    row - 1,
+                    col + 1,
+                    "E251",
+                    "unexpected spaces around keyword / parameter equals",
+                )
+        elif op == "=" or op in _SPACED_OPERATORS:
+            if line[col - 1 : col] != " " or line[
+                col + len(op) : col + len(op) + 1
+            ] not in (
+                " ",
+                "",
+            ):
+                yield (
+                    row - 1,
+                    col + 1,
+                    "E225",
+                    f"missing whitespace around operator '{op}'",
+                )
+
+
+def _is_const(node: ast.expr, *values: object) -> bool:
+    return isinstance(node, ast.Constant) and any(node.value is v for v in values)
+
+
+def _name_findings(name: str, node: ast.AST, kind: str) -> Iterator[_Finding]:
+    row, col = node.lineno - 1, node.col_offset + 1  # type: ignore[attr-defined]
+    if name in _AMBIGUOUS:
+        yield (row, col, "E741", f"ambiguous {kind} name '{name}'")
+    elif kind == "function" and not _SNAKE_CASE.fullmatch(name):
+        if not (name.startswith("__") and name.endswith("__")):
+            yield (
+                row,
+                col,
+                "N802",
+                f"function name '{name}' should be snake_case ({_snake_case(name)})",
+            )
+    elif kind == "argument" and not _SNAKE_CASE.fullmatch(name):
+        yield (
+            row,
+            col,
+            "N803",
+            f"argument name '{name}' should be snake_case ({_snake_case(name)})",
+        )
+    elif kind == "variable" and _MIXED_CASE.fullmatch(name):
+        yield (
+            row,
+            col,
+            "N816",
+            f"variable '{name}' should be snake_case ({_snake_case(name)})",
+        )
+
+
+def _statement_lists(tree: ast.AST) -> Iterator[list[ast.stmt]]:
+    for node in ast.walk(tree):
+        for field in ("body", "orelse", "finalbody"):
+            body = getattr(node, field, None)
+            if isinstance(body, list) and body and isinstance(body[0], ast.stmt):
+                yield body
+        for handler in getattr(node, "handlers", ()):
+            yield handler.body
+
+
+def _ast_findings(tree: ast.Module) -> Iterator[_Finding]:
+    for body in _statement_lists(tree):
+        for before, after in zip(body, body[1:], strict=False):
+            if after.lineno == before.end_lineno:
+                yield (
+                    after.lineno - 1,
+                    after.col_offset + 1,
+                    "E702",
+                    "multiple statements on one line (semicolon)",
+                )
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield from _name_findings(node.name, node, "function")
+            for arg in (*node.args.posonlyargs, *node.args.args, *node.args.kwonlyargs):
+                yield from _name_findings(arg.arg, arg, "argument")
+        elif isinstance(node, ast.ClassDef) and not _CAP_WORDS.fullmatch(node.name):
+            yield (
+                node.lineno - 1,
+                node.col_offset + 1,
+                "N801",
+                f"class name '{node.name}' should use CapWords",
+            )
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            if not _CONSTANT.fullmatch(node.id):
+                yield from _name_findings(node.id, node, "variable")
+        elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Lambda):
+            yield (
+                node.lineno - 1,
+                node.col_offset + 1,
+                "E731",
+                "do not assign a lambda expression, use a def",
+            )
+        elif isinstance(node, ast.ExceptHandler) and node.type is None:
+            yield (
+                node.lineno - 1,
+                node.col_offset + 1,
+                "E722",
+                "do not use bare 'except'",
+            )
+        elif isinstance(node, ast.Compare):
+            operands = [node.left, *node.comparators]
+            for i, op in enumerate(node.ops):
+                if not isinstance(op, (ast.Eq, ast.NotEq)):
+                    continue
+                pair = operands[i : i + 2]
+                if any(_is_const(x, None) for x in pair):
+                    better = "is None" if isinstance(op, ast.Eq) else "is not None"
+                    yield (
+                        node.lineno - 1,
+                        node.col_offset + 1,
+                        "E711",
+                        f"comparison to None should be '{better}'",
+                    )
+                elif any(_is_const(x, True, False) for x in pair):
+                    yield (
+                        node.lineno - 1,
+                        node.col_offset + 1,
+                        "E712",
+                        "comparison to True/False: use 'if cond:' or 'if not cond:'",
+                    )
+        elif (
+            isinstance(node, ast.UnaryOp)
+            and isinstance(node.op, ast.Not)
+            and isinstance(node.operand, ast.Compare)
+            and len(node.operand.ops) == 1
+            and isinstance(node.operand.ops[0], (ast.In, ast.Is))
+        ):
+            code, better = (
+                ("E713", "not in")
+                if isinstance(node.operand.ops[0], ast.In)
+                else ("E714", "is not")
+            )
+            yield (
+                node.lineno - 1,
+                node.col_offset + 1,
+                code,
+                f"use 'x {better} y' instead of 'not x {better.split()[-1]} y'",
+            )
+
+        if isinstance(
+            node, (ast.If, ast.For, ast.While, ast.With, ast.FunctionDef, ast.ClassDef)
+        ):
+            first = node.body[0]
+            if first.lineno == node.lineno:
+                yield (
+                    first.lineno - 1,
+                    first.col_offset + 1,
+                    "E701",
+                    "multiple statements on one line (colon)",
+                )
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _check_block(text: str) -> tuple[_Finding, ...]:
+    """Token and AST checks for one top-level statement's source."""
+    findings = set(_token_findings(text))
+    with contextlib.suppress(SyntaxError):
+        findings.update(_ast_findings(ast.parse(text)))
+    return tuple(sorted(findings))
+
+
+# ═══════════════════════════════════════════════════════════════
+# MODULE
+# ═══════════════════════════════════════════════════════════════
+
+
+def _blocks(tree: ast.Module) -> list[tuple[int, int, bool]]:
+    """(first line, last line, is def/class) per top-level statement group."""
+    blocks: list[tuple[int, int, bool]] = []
+    for stmt in tree.body:
+        decorators = getattr(stmt, "decorator_list", [])
+        start = min([d.lineno for d in decorators] + [stmt.lineno])
+        end = stmt.end_lineno or stmt.lineno
+        is_def = isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        if blocks and start <= blocks[-1][1]:
+            # Statements sharing a line (``a = 1; b = 2``) are checked together.
+            first, _last, was_def = blocks[-1]
+            blocks[-1] = (first, max(end, _last), was_def or is_def)
+        else:
+            blocks.append((start, end, is_def))
+    return blocks
+
+
+def _blank_lines_before(lines: list[str], start: int) -> tuple[int, int]:
+    """Blank lines above line ``start``, skipping comments attached to it."""
+    row = start - 1  # index of the line above ``start``, 1-based
+    while row >= 1 and lines[row - 1].lstrip().startswith("#"):
+        row -= 1
+    first = row
+    blanks = 0
+    while row >= 1 and not lines[row - 1].strip():
+        blanks += 1
+        row -= 1
+    return blanks, first + 1
+
+
+def _spacing_findings(
+    lines: list[str], blocks: list[tuple[int, int, bool]]
+) -> Iterator[StyleIssue]:
+    for i, (start, _end, is_def) in enumerate(blocks):
+        if not i:
+            continue
+        blanks, row = _blank_lines_before(lines, start)
+        if is_def and blanks < 2:
+            yield StyleIssue(row, 1, "E302", f"expected 2 blank lines, found {blanks}")
+        elif blocks[i - 1][2] and blanks < 2:
+            yield StyleIssue(
+                row,
+                1,
+                "E305",
+                f"expected 2 blank lines after function or class, found {blanks}",
+            )
+    blanks = 0
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            if blanks > 2:
+                yield StyleIssue(number, 1, "E303", f"too many blank lines ({blanks})")
+            blanks = 0
+        else:
+            blanks += 1
+    if lines and blanks:
+        yield StyleIssue(len(lines), 1, "W391", "blank line at end of file")
+
+
+@profiled
+def check_style(source: str) -> tuple[StyleIssue, ...]:
+    """
+    PEP 8 findings for ``source``, ordered by position.
+
+    Code that does not parse only gets the line checks.
+    """
+    return _check_source(source)
+
+
+@lru_cache(maxsize=256)
+def _check_source(source: str) -> tuple[StyleIssue, ...]:
+    lines = source.splitlines()
+    issues = [
+        StyleIssue(number, col, code, message)
+        for number, line in enumerate(lines, 1)
+        for _row, col, code, message in _check_line(line)
+    ]
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return tuple(sorted(issues))
+
+    blocks = _blocks(tree)
+    # Comment-only stretches between statements are checked like statements.
+    spans: list[tuple[int, int]] = []
+    row = 1
+    for start, end, _is_def in blocks:
+        spans.extend([(row, start - 1), (start, end)])
+        row = end + 1
+    spans.append((row, len(lines)))
+    for start, end in spans:
+        text = "\n".join(lines[start - 1 : end])
+        if not text.strip():
+            continue
+        issues.extend(
+            StyleIssue(start + row, col, code, message)
+            for row, col, code, message in _check_block(text + "\n")
+        )
+    issues.extend(_spacing_findings(lines, blocks))
+    return tuple(sorted(issues))
+
+
+def cache_clear() -> None:
+    """Forget cached source, line and statement results."""
+    _check_source.cache_clear()
+    _check_line.cache_clear()
+    _check_block.cache_clear()
@@ -0,0 +1,337 @@
+"""
+HebiKata - Subinterpreter Grading Pool
+
+Grades submissions in a pool of isolated subinterpreters inside one
+process. On Python 3.12+ each interpreter has its own GIL (PEP 684), so
+submissions run in parallel as they do in the grading service's worker
+processes, without spawning processes or pickling jobs through pipes.
+
+Each pool thread owns one interpreter, which imports the app once and
+then grades whatever its thread is given: the request goes in as a JSON
+string and the encoded result (see app.grading.encode_result()) comes
+back over a channel. An interpreter is replaced after
+MAX_RUNS_PER_INTERPRETER submissions, so state a learner leaks into
+module globals does not outlive a few submissions.
+
+Several stdlib extension modules the sandbox offers (``_datetime``,
+``_decimal``, ``_hashlib``...) are not yet isolation-safe on 3.12: their
+static types belong to the first interpreter that imports them, and
+freeing them with a subinterpreter corrupts the heap. So the pool imports
+the whole grading stack, and with it every module a submission may
+import, in the main interpreter before it creates any interpreter, and
+interpreters start and stop one at a time.
+
+Interpreters come from CPython's private ``_xxsubinterpreters`` module
+(with ``_xxinterpchannels`` on 3.12); where it is missing ``available()``
+is False and grading stays in-process. Set ``HEBIKATA_SUBINTERPRETERS=N``
+to grade on N interpreters instead of the Streamlit thread, or run the
+grading service with ``--backend subinterpreters``.
+"""
+
+import atexit
+import contextlib
+import functools
+import importlib
+import json
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from types import CodeType
+from typing import Any
+
+from app.env import env_int
+
+try:
+    import _xxsubinterpreters as _interpreters
+except ImportError:
+    _interpreters = None
+
+try:
+    import _xxinterpchannels as _channels  # Python 3.12 moved channels here
+except ImportError:
+    _channels = None
+
+SUBINTERPRETERS_ENV = "HEBIKATA_SUBINTERPRETERS"
+
+MAX_RUNS_PER_INTERPRETER = 200
+
+_ROOT = str(Path(__file__).resolve().parent.parent)
+
+# Run once in each new interpreter; its __main__ keeps the names.
+_BOOT = f"""
+import sys
+if {_ROOT!r} not in sys.path:
+    sys.path.insert(0, {_ROOT!r})
+import app.grading
+from app.subinterp import _run_in_interpreter
+"""
+_RUN = "_run_in_interpreter(channel, request)"
+
+
+class SubinterpreterError(Exception):
+    """An interpreter could not start, or failed outside the engine."""
+
+
+# Serializes creating, booting and destroying interpreters.
+_lifecycle_lock = threading.Lock()
+
+
+def available() -> bool:
+    """Whether this Python can run a SubinterpreterPool."""
+    return _interpreters is not None and (
+        _channels is not None or hasattr(_interpreters, "channel_create")
+    )
+
+
+def _new_channel() -> Any:
+    # The channel is destroyed with its last ChannelID object; keep it.
+    if _channels is not None:
+        return _channels.create()
+    return _interpreters.channel_create()
+
+
+def _send(channel: Any, data: bytes) -> None:
+    if _channels is not None:
+        _channels.send(channel, data)
+    else:
+        _interpreters.channel_send(channel, data)
+
+
+def _recv(channel: Any) -> bytes:
+    if _channels is not None:
+        return _channels.recv(channel)  # type: ignore[no-any-return]
+    return _interpreters.channel_recv(channel)  # type: ignore[no-any-return]
+
+
+def _destroy_channel(channel: Any) -> None:
+    if _channels is not None:
+        _channels.destroy(channel)
+    else:
+        _interpreters.channel_destroy(channel)
+
+
+@functools.lru_cache(maxsize=256)
+def _compiled(tests: str) -> CodeType | None:
+    try:
+        return compile(tests, "<string>", "exec")
+    except SyntaxError:
+        return None  # left for the engine to report
+
+
+def _run_in_interpreter(channel: Any, request: str) -> None:
+    """Grade a JSON request and send the encoded result; runs in the pool."""
+    from app.grading import encode_result, grade_locally
+
+    job = json.loads(request)
+    tests = job["exercise"].get("validation", {}).get("tests")
+    result = grade_locally(
+        job["user_code"],
+        job["exercise"],
+        job["reference_code"],
+        _compiled(tests) if isinstance(tests, str) else None,
+    )
+    _send(channel, json.dumps(encode_result(result)).encode("utf-8"))
+
+
+class SubinterpreterPool:
+    """
+    Threads that each grade in their own interpreter.
+
+    Args:
+        workers: Interpreters, all started before the constructor returns.
+        max_runs: Submissions an interpreter grades before it is replaced.
+
+    Raises:
+        SubinterpreterError: Interpreters are unavailable or fail to start.
+    """
+
+    def __init__(self, workers: int, max_runs: int = MAX_RUNS_PER_INTERPRETER) -> None:
+        if not available():
+            raise SubinterpreterError("this Python has no subinterpreter support")
+        # The main interpreter must own every extension module first.
+        importlib.import_module("app.grading")
+        self.workers = max(1, workers)
+        self.max_runs = max(1, max_runs)
+        self._jobs: queue.SimpleQueue[tuple[Future[Any], str] | None] = (
+            queue.SimpleQueue()
+        )
+        # The job each thread is running, and jobs whose thread was replaced.
+        self._running: dict[threading.Thread, Future[Any]] = {}
+        self._abandoned: set[Future[Any]] = set()
+        self._threads_lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        started = [self._start_thread() for _ in range(self.workers)]
+        # Interpreters still alive at exit would abort the process.
+        atexit.register(self.close)
+        try:
+            for ready in started:
+                ready.result()
+        except SubinterpreterError:
+            self.close()
+            raise
+
+    def submit(
+        self,
+        user_code: str,
+        exercise: dict[str, Any],
+        reference_code: str | None = None,
+    ) -> Future[dict[str, Any]]:
+        """
+        Queue a submission; same arguments as app.grading.grade_locally().
+
+        ``exercise`` must be JSON-serializable. The future's result is
+        encoded (see app.grading.encode_result()); it raises
+        SubinterpreterError if grading raised.
+        """
+        request = json.dumps(
+            {
+                "user_code": user_code,
+                "exercise": exercise,
+                "reference_code": reference_code,
+            }
+        )
+        future: Future[dict[str, Any]] = Future()
+        self._jobs.put((future, request))
+        return future
+
+    def abandon(self, future: Future[Any]) -> None:
+        """
+        Give up on a running job and start a thread to take its place.
+
+        An interpreter cannot be interrupted, so the abandoned thread keeps
+        running the job; it stops, and its interpreter is destroyed, once
+        the job finishes. Until then the process cannot exit normally (see
+        abandoned()). Before 3.12 the interpreters share one GIL, which a
+        job that never returns keeps, so this only helps on 3.12+.
+        """
+        with self._threads_lock:
+            thread = next(
+                (t for t, job in self._running.items() if job is future), None
+            )
+            if thread is None or thread not in self._threads:
+                return
+            self._abandoned.add(future)
+            self._threads.remove(thread)
+            self._start_thread()
+
+    def abandoned(self) -> int:
+        """
+        Abandoned jobs still running.
+
+        Their interpreters cannot be destroyed, and CPython aborts at exit
+        while any interpreter is alive; leave with ``os._exit()`` instead.
+        """
+        with self._threads_lock:
+            return len(self._abandoned)
+
+    def close(self) -> None:
+        """Stop every thread once its current job is done (not abandoned ones)."""
+        atexit.unregister(self.close)
+        with self._threads_lock:
+            threads = list(self._threads)
+        for _ in threads:
+            self._jobs.put(None)
+        for thread in threads:
+            thread.join()
+
+    def _start_thread(self) -> Future[None]:
+        ready: Future[None] = Future()
+        thread = threading.Thread(
+            target=self._work,
+            args=(ready,),
+            name=f"subinterp-{len(self._threads)}",
+            daemon=True,
+        )
+        self._threads.append(thread)
+        thread.start()
+        return ready
+
+    def _boot(self) -> int:
+        with _lifecycle_lock:
+            interp = _interpreters.create()
+            try:
+                _interpreters.run_string(interp, _BOOT)
+            except Exception as e:
+                _interpreters.destroy(interp)
+                raise SubinterpreterError(f"interpreter failed to start: {e}") from None
+        return interp  # type: ignore[no-any-return]
+
+    def _destroy(self, interp: int) -> None:
+        with _lifecycle_lock:
+            _interpreters.destroy(interp)
+
+    def _work(self, started: Future[None]) -> None:
+        channel = _new_channel()
+        interp: int | None
+        try:
+            interp = self._boot()
+        except SubinterpreterError as e:
+            _destroy_channel(channel)
+            started.set_exception(e)
+            return
+        started.set_result(None)
+        thread = threading.current_thread()
+        runs = 0
+        try:
+            while (job := self._jobs.get()) is not None:
+                future, request = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                with self._threads_lock:
+                    self._running[thread] = future
+                try:
+                    if interp is None:  # a replacement failed to start earlier
+                        interp = self._boot()
+                    _interpreters.run_string(
+                        interp, _RUN, shared={"channel": channel, "request": request}
+                    )
+                    result = json.loads(_recv(channel))
+                except SubinterpreterError as e:
+                    future.set_exception(e)
+                except Exception as e:
+                    future.set_exception(SubinterpreterError(str(e)))
+                else:
+                    future.set_result(result)
+                with self._threads_lock:
+                    del self._running[thread]
+                    if future in self._abandoned:
+                        self._abandoned.discard(future)
+                        break
+                if interp is None:
+                    continue
+                runs += 1
+                if runs >= self.max_runs:
+                    self._destroy(interp)
+                    interp, runs = None, 0
+                    with contextlib.suppress(SubinterpreterError):
+                        interp = self._boot()
+        finally:
+            if interp is not None:
+                self._destroy(interp)
+            _destroy_channel(channel)
+
+
+_pool: SubinterpreterPool | None = None
+_pool_checked = False
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SubinterpreterPool | None:
+    """
+    The process-wide pool if ``HEBIKATA_SUBINTERPRETERS`` asks for one.
+
+    None when it is unset, 0 or not a number, or when interpreters are
+    unavailable or fail to start; callers then grade in-process.
+    """
+    global _pool, _pool_checked
+    if not _pool_checked:
+        with _pool_lock:
+            if not _pool_checked:
+                workers = env_int(SUBINTERPRETERS_ENV, 0)
+                try:
+                    _pool = SubinterpreterPool(workers) if workers > 0 else None
+                except SubinterpreterError:
+                    _pool = None
+                _pool_checked = True
+    return _pool
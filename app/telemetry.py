@@ -0,0 +1,126 @@
+"""
+HebiKata - Typing Telemetry
+
+Keystroke and time-on-task tracking for scoring. A hidden custom component
+(app/components/telemetry) watches the code editor in the browser and
+counts keystrokes, pauses and active time there; nothing is sent per
+keystroke. It ships one cumulative summary every FLUSH_SECONDS while the
+learner types, and right away when they submit (the editor's Run button or
+Ctrl+Enter, or the "Run Tests" button), so ``_run_tests()`` scores with
+current numbers at the cost of at most one rerun per flush.
+
+Counts cover a "window": one exercise until it is solved. A gap between
+keystrokes of PAUSE_SECONDS or more is a pause, and gaps of IDLE_SECONDS or
+more are not counted as time on task.
+
+The browser's numbers are only ever claims. ``pace_bonus()`` checks them
+against the server-side time since the window opened and credits no
+typing faster than MAX_KEYS_PER_SECOND, so a forged batch cannot buy the
+bonus with a made-up active time.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import streamlit.components.v1 as components
+
+TELEMETRY_KEY = "typing_telemetry"
+
+FLUSH_SECONDS = 30
+PAUSE_SECONDS = 5
+IDLE_SECONDS = 60
+
+PACE_BONUS = 20
+# Fastest sustained typing credited; faster claims take this long instead.
+MAX_KEYS_PER_SECOND = 15
+# Browser time and batching may run ahead of the server's clock by this much.
+CLOCK_SLACK_SECONDS = 5
+# Active seconds within which a solve earns the full pace bonus.
+PAR_SECONDS = {"beginner": 120, "intermediate": 300, "advanced": 600}
+DEFAULT_PAR_SECONDS = 300
+
+_component = components.declare_component(
+    "telemetry", path=str(Path(__file__).parent / "components" / "telemetry")
+)
+
+
+@dataclass(frozen=True, slots=True)
+class TypingStats:
+    """One window's summary as last reported by the browser."""
+
+    keystrokes: int
+    pauses: int
+    active_seconds: float
+
+
+def track_typing(window: str) -> None:
+    """
+    Render the (invisible) telemetry component for a counting window.
+
+    The browser resets its counts whenever ``window`` changes.
+    """
+    _component(
+        window=window,
+        flush_ms=FLUSH_SECONDS * 1000,
+        pause_ms=PAUSE_SECONDS * 1000,
+        idle_ms=IDLE_SECONDS * 1000,
+        key=TELEMETRY_KEY,
+        default=None,
+    )
+
+
+def typing_stats(value: Any, window: str) -> TypingStats | None:
+    """
+    Validate a batch sent by the component.
+
+    Returns:
+        The stats, or None if there is no batch for ``window`` yet.
+        Browser data is untrusted; malformed batches count as missing.
+    """
+    if not isinstance(value, dict) or value.get("window") != window:
+        return None
+    try:
+        keystrokes = int(value["keys"])
+        pauses = int(value["pauses"])
+        active_ms = int(value["active_ms"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if min(keystrokes, pauses, active_ms) < 0 or pauses > keystrokes:
+        return None
+    return TypingStats(keystrokes, pauses, active_ms / 1000)
+
+
+def par_seconds(exercise: dict[str, Any]) -> int:
+    """Active time expected to solve an exercise; boss katas get double."""
+    par = PAR_SECONDS.get(exercise["metadata"].get("difficulty"), DEFAULT_PAR_SECONDS)
+    return par * 2 if exercise.get("boss") else par
+
+
+def pace_bonus(
+    stats: TypingStats | None, exercise: dict[str, Any], elapsed_seconds: float
+) -> int:
+    """
+    Score bonus for solving ``exercise`` with ``stats`` time on task.
+
+    Solving within par earns PACE_BONUS; the bonus falls linearly to zero at
+    three times par. Resubmitting without typing earns nothing.
+
+    Args:
+        elapsed_seconds: Server-side time since the window opened. Stats
+            claiming more active time or keystrokes than fit in it earn
+            nothing, and active time is at least what the keystrokes take
+            at MAX_KEYS_PER_SECOND.
+    """
+    if stats is None or not stats.keystrokes:
+        return 0
+    limit = elapsed_seconds + CLOCK_SLACK_SECONDS
+    if stats.active_seconds > limit or stats.keystrokes > MAX_KEYS_PER_SECOND * limit:
+        return 0
+    active = max(stats.active_seconds, stats.keystrokes / MAX_KEYS_PER_SECOND)
+    par = par_seconds(exercise)
+    if active <= par:
+        return PACE_BONUS
+    if active >= 3 * par:
+        return 0
+    return round(PACE_BONUS * (3 * par - active) / (2 * par))
@@ -0,0 +1,218 @@
+"""
+HebiKata - Execution Trace Capture
+
+Records which lines of a learner's code ran and how its variables changed,
+for the snake visualization. Uses ``sys.monitoring`` (Python 3.12+) LINE
+events enabled only on the code objects compiled from the submission, so
+test code, builtins and the rest of the process run at full speed.
+
+Events go into ``array`` buffers and stop at a hard cap; variable snapshots
+are short ``reprlib`` renderings, deduplicated against the previous snapshot
+and capped separately. On interpreters without ``sys.monitoring``
+``AVAILABLE`` is False and ``capture()`` yields None.
+"""
+
+import reprlib
+import sys
+import threading
+from array import array
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import CodeType, FrameType, FunctionType, ModuleType
+from typing import Any, NamedTuple
+
+AVAILABLE = hasattr(sys, "monitoring")
+TOOL_NAME = "hebikata-trace"
+
+MAX_EVENTS = 10_000
+MAX_SNAPSHOTS = 1_000
+MAX_VARIABLES = 12
+
+_NO_SNAPSHOT = -1
+_HIDDEN_TYPES = (FunctionType, ModuleType, type)
+
+_repr = reprlib.Repr()
+_repr.maxstring = 40
+_repr.maxother = 40
+_repr.maxlist = _repr.maxtuple = _repr.maxset = _repr.maxdict = 6
+_repr.maxlevel = 2
+
+Snapshot = tuple[tuple[str, str], ...]
+
+
+class TraceEvent(NamedTuple):
+    """One executed line, decoded from an ExecutionTrace."""
+
+    function: str
+    line: int
+    variables: dict[str, str] | None
+
+
+@dataclass
+class ExecutionTrace:
+    """
+    Compact record of the lines executed by one submission.
+
+    Event ``i`` ran line ``lines[i]`` of ``functions[code_index[i]]``. The
+    locals just before that line ran are ``snapshots[snapshot_index[i]]``,
+    or unknown when the index is -1 (the snapshot cap was reached).
+    """
+
+    functions: list[str] = field(default_factory=list)
+    code_index: array = field(default_factory=lambda: array("H"))
+    lines: array = field(default_factory=lambda: array("I"))
+    snapshot_index: array = field(default_factory=lambda: array("i"))
+    snapshots: list[Snapshot] = field(default_factory=list)
+    truncated: bool = False
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def events(self) -> Iterator[TraceEvent]:
+        """Decode events lazily, in execution order."""
+        for fn, line, snap in zip(
+            self.code_index, self.lines, self.snapshot_index, strict=True
+        ):
+            variables = dict(self.snapshots[snap]) if snap != _NO_SNAPSHOT else None
+            yield TraceEvent(self.functions[fn], line, variables)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready form: parallel event columns plus the snapshot table."""
+        return {
+            "functions": list(self.functions),
+            "code_index": self.code_index.tolist(),
+            "lines": self.lines.tolist(),
+            "snapshot_index": self.snapshot_index.tolist(),
+            "snapshots": [dict(s) for s in self.snapshots],
+            "truncated": self.truncated,
+        }
+
+
+def _code_objects(code: CodeType) -> list[CodeType]:
+    """``code`` and every function, class body and lambda nested inside it."""
+    found = [code]
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            found.extend(_code_objects(const))
+    return found
+
+
+def _snapshot(frame: FrameType) -> Snapshot:
+    items = []
+    for name, value in frame.f_locals.items():
+        if name.startswith("__") or isinstance(value, _HIDDEN_TYPES):
+            continue
+        try:
+            text = _repr.repr(value)
+        except Exception:
+            text = f"<{type(value).__name__}>"
+        items.append((name, text))
+        if len(items) == MAX_VARIABLES:
+            break
+    return tuple(items)
+
+
+class _Recorder:
+    def __init__(self, code: CodeType, max_events: int) -> None:
+        self.codes = _code_objects(code)
+        self.positions = {c: i for i, c in enumerate(self.codes)}
+        self.max_events = max_events
+        self.trace = ExecutionTrace(functions=[c.co_qualname for c in self.codes])
+        self.in_repr = False
+
+    def on_line(self, code: CodeType, line: int, frame: FrameType) -> Any:
+        trace = self.trace
+        if self.in_repr:
+            # A learner-defined __repr__ running inside _snapshot().
+            return None
+        if len(trace.lines) >= self.max_events:
+            trace.truncated = True
+            self.stop()
+            return sys.monitoring.DISABLE
+
+        snap = _NO_SNAPSHOT
+        if len(trace.snapshots) < MAX_SNAPSHOTS:
+            self.in_repr = True
+            try:
+                current = _snapshot(frame)
+            finally:
+                self.in_repr = False
+            if not trace.snapshots or trace.snapshots[-1] != current:
+                trace.snapshots.append(current)
+            snap = len(trace.snapshots) - 1
+
+        trace.code_index.append(self.positions[code])
+        trace.lines.append(line)
+        trace.snapshot_index.append(snap)
+        return None
+
+    def start(self, tool: int) -> None:
+        for c in self.codes:
+            sys.monitoring.set_local_events(tool, c, sys.monitoring.events.LINE)
+
+    def stop(self) -> None:
+        for c in self.codes:
+            sys.monitoring.set_local_events(_tool_id, c, 0)
+
+
+# Code object -> recorder. Code objects are unique per compile() call, so
+# concurrent sessions never share an entry and reads need no lock.
+_active: dict[CodeType, _Recorder] = {}
+_lock = threading.Lock()
+_tool_id: int = -1
+
+
+def _on_line(code: CodeType, line: int) -> Any:
+    recorder = _active.get(code)
+    if recorder is None:
+        return sys.monitoring.DISABLE
+    return recorder.on_line(code, line, sys._getframe(1))
+
+
+def _claim_tool() -> int:
+    """Register the LINE callback under a free tool id, once per process."""
+    global _tool_id
+    with _lock:
+        if _tool_id >= 0:
+            return _tool_id
+        for tool in range(6):
+            if sys.monitoring.get_tool(tool) is None:
+                sys.monitoring.use_tool_id(tool, TOOL_NAME)
+                sys.monitoring.register_callback(
+                    tool, sys.monitoring.events.LINE, _on_line
+                )
+                _tool_id = tool
+                break
+        return _tool_id
+
+
+@contextmanager
+def capture(
+    code: CodeType, max_events: int = MAX_EVENTS
+) -> Iterator[ExecutionTrace | None]:
+    """
+    Trace every line executed in ``code`` and its nested functions.
+
+    Args:
+        code: Module code object compiled from the learner's submission.
+        max_events: Line events to keep before tracing switches itself off.
+
+    Yields:
+        The ExecutionTrace being filled in, or None when ``sys.monitoring``
+        is unavailable or every tool id is taken by other tools.
+    """
+    if not AVAILABLE or _claim_tool() < 0:
+        yield None
+        return
+
+    recorder = _Recorder(code, max_events)
+    for c in recorder.codes:
+        _active[c] = recorder
+    recorder.start(_tool_id)
+    try:
+        yield recorder.trace
+    finally:
+        recorder.stop()
+        for c in recorder.codes:
+            _active.pop(c, None)
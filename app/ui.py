@@ -5,40 +5,179 @@ Streamlit UI: brand-themed visual design, exercise display,
 code editor, progress panel, navigation, and action buttons.
 """
 
+import hmac
+import inspect
+import os
+import time
+from functools import lru_cache
+from html import escape
 from pathlib import Path
+from typing import Any
 
 import streamlit as st
 from code_editor import code_editor
 
-from app.engine import execute_code_with_tests
+from app import (
+    effects,
+    grading,
+    journal,
+    memory,
+    metrics,
+    profiler,
+    ratelimit,
+    telemetry,
+)
+from app.analytics import ClassroomSummary, get_analytics
+from app.data_loader import (
+    available_packs,
+    compiled_tests,
+    load_exercises,
+    load_reference_solution,
+)
+from app.leaderboard import (
+    GLOBAL_BOARD,
+    TOP_K,
+    Entry,
+    classroom_board,
+    get_leaderboard,
+)
+from app.performance import is_performance_kata
+from app.profiler import profiled
+from app.review import DAY_SECONDS
 from app.session import (
     MASTERY_THRESHOLD,
     POINTS_PER_SUCCESS,
     advance_hint,
+    evict_session_state,
     get_current_exercise,
     get_current_hint_level,
     initialize_session_state,
     next_exercise,
     previous_exercise,
+    record_review,
     reset_all_progress,
     reset_exercise_code,
+    review_exercise,
     save_progress,
+    update_draft,
 )
+from app.style import StyleIssue, check_style
 
 _CSS_PATH = Path(__file__).parent / "static" / "theme.css"
 
+# Streamlit releases whose expanders report their open state let error
+# details be formatted only once the learner opens them.
+_EXPANDER_REPORTS_OPEN = "on_change" in inspect.signature(st.expander).parameters
+
+# Upper bound on memoized HTML fragments. Each entry is a few hundred bytes,
+# so this keeps the caches small while covering every live session's state.
+_RENDER_CACHE_SIZE = 256
+
+# Style findings listed in the PEP8 panel.
+_STYLE_NOTES_SHOWN = 5
 
-def _theme_css() -> str:
+
+@lru_cache(maxsize=1)
+def _theme_style_block() -> str:
+    """Read theme.css once per process and wrap it in a ``<style>`` tag."""
     if _CSS_PATH.is_file():
-        return _CSS_PATH.read_text(encoding="utf-8")
+        return f"<style>{_CSS_PATH.read_text(encoding='utf-8')}</style>"
     return ""
 
 
+@lru_cache(maxsize=_RENDER_CACHE_SIZE)
+def _stats_bar_html(
+    lives: int, score: int, current_idx: int, total: int, successes: int
+) -> str:
+    cells = (
+        ("LIVES", str(lives)),
+        ("SCORE", str(score)),
+        ("EXERCISE", f"{current_idx + 1}/{total}"),
+        ("PROGRESS", f"{successes}/{MASTERY_THRESHOLD}"),
+    )
+    return (
+        '<div class="stats-bar">'
+        + "".join(
+            f'<div class="stats-cell">'
+            f'<span class="sig-value">{value}</span>'
+            f'<span class="sig-label">{label}</span>'
+            f"</div>"
+            for label, value in cells
+        )
+        + "</div>"
+    )
+
+
+def _exercise_outline(exercises: list[dict]) -> tuple[tuple[int, str], ...]:
+    """Reduce exercises to the hashable (chapter, theme) pairs the panel needs."""
+    return tuple(
+        (ex["metadata"]["chapter"], ex["metadata"]["theme"].title()) for ex in exercises
+    )
+
+
+@lru_cache(maxsize=_RENDER_CACHE_SIZE)
+def _progress_panel_html(
+    outline: tuple[tuple[int, str], ...],
+    successes: tuple[int, ...],
+    current_idx: int,
+) -> tuple[tuple[str, str], ...]:
+    """
+    Build the progress panel as one HTML block per chapter.
+
+    Returns:
+        Tuple of ``(tab_label, html)`` pairs ordered by chapter number.
+    """
+    chapters: dict[int, list[str]] = {}
+    for idx, ((chapter, theme_name), success_count) in enumerate(
+        zip(outline, successes, strict=True)
+    ):
+        is_current = idx == current_idx
+        dot_class = (
+            "mastered"
+            if success_count >= MASTERY_THRESHOLD
+            else "in-progress" if success_count > 0 else "not-started"
+        )
+        current_class = " current" if is_current else ""
+        chapters.setdefault(chapter, []).append(
+            f'<div class="progress-item{current_class}">'
+            f'<span class="dot {dot_class}"></span>'
+            f"{'👉 ' if is_current else ''}"
+            f"{theme_name} &middot; {success_count}/{MASTERY_THRESHOLD}"
+            f"</div>"
+        )
+
+    return tuple(
+        (f"Ch {chapter}", "".join(rows)) for chapter, rows in sorted(chapters.items())
+    )
+
+
+@lru_cache(maxsize=_RENDER_CACHE_SIZE)
+def _leaderboard_html(entries: tuple[Entry, ...], learner_id: str) -> str:
+    if not entries:
+        return '<div class="leaderboard-empty">No scores yet.</div>'
+    return "".join(
+        f'<div class="leaderboard-row{" you" if entry.learner_id == learner_id else ""}">'
+        f'<span class="leaderboard-rank">{position}</span>'
+        f'<span class="leaderboard-name">{entry.name}</span>'
+        f'<span class="leaderboard-score">{entry.score}</span>'
+        f"</div>"
+        for position, entry in enumerate(entries, start=1)
+    )
+
+
+metrics.REGISTRY.callback_counter(
+    "hebikata_render_cache_hits",
+    "Memoized stats bar and progress panel renders served from cache.",
+    lambda: _stats_bar_html.cache_info().hits + _progress_panel_html.cache_info().hits,
+)
+
+
 # ═══════════════════════════════════════════════════════════════
 # RENDER
 # ═══════════════════════════════════════════════════════════════
 
 
+@profiled
 def _render_header() -> None:
     st.markdown(
         '<div class="main-logo">'
@@ -52,29 +191,20 @@ def _render_header() -> None:
     )
 
 
+@profiled
 def _render_stats_bar() -> None:
     current_idx = st.session_state.current_exercise_idx
-    successes = st.session_state.successes[current_idx]
-    total = len(st.session_state.exercises)
-
-    cells = [
-        ("LIVES", str(st.session_state.lives)),
-        ("SCORE", str(st.session_state.score)),
-        ("EXERCISE", f"{current_idx + 1}/{total}"),
-        ("PROGRESS", f"{successes}/{MASTERY_THRESHOLD}"),
-    ]
-    html = '<div class="stats-bar">'
-    for label, value in cells:
-        html += (
-            f'<div class="stats-cell">'
-            f'<span class="sig-value">{value}</span>'
-            f'<span class="sig-label">{label}</span>'
-            f"</div>"
-        )
-    html += "</div>"
+    html = _stats_bar_html(
+        st.session_state.lives,
+        st.session_state.score,
+        current_idx,
+        len(st.session_state.exercises),
+        st.session_state.successes[current_idx],
+    )
     st.markdown(html, unsafe_allow_html=True)
 
 
+@profiled
 def _render_exercise_prompt() -> None:
     current_exercise = get_current_exercise()
     current_idx = st.session_state.current_exercise_idx
@@ -85,6 +215,8 @@ def _render_exercise_prompt() -> None:
     badges = f'<span class="chapter-badge">Ch {chapter}</span>'
     if is_boss:
         badges += '<span class="boss-badge">Boss</span>'
+    if is_performance_kata(current_exercise):
+        badges += '<span class="perf-badge">Speed</span>'
 
     st.markdown(
         f'<div class="section-title">{badges} {theme} &mdash; Exercise {current_idx + 1}</div>',
@@ -96,6 +228,7 @@ def _render_exercise_prompt() -> None:
     )
 
 
+@profiled
 def _render_code_editor() -> None:
     st.markdown('<div class="section-title">Your Code</div>', unsafe_allow_html=True)
 
@@ -111,6 +244,12 @@ def _render_code_editor() -> None:
         }
     ]
 
+    window = _typing_window()
+    opened = st.session_state.get("typing_window_opened")
+    if opened is None or opened[0] != window:
+        # The browser starts counting afresh too (see track_typing()).
+        st.session_state.typing_window_opened = (window, time.monotonic())
+    telemetry.track_typing(window)
     response = code_editor(
         st.session_state.user_code,
         lang="python",
@@ -122,26 +261,96 @@ def _render_code_editor() -> None:
         response_mode="debounce",
     )
 
-    if response is not None and response.get("text") is not None:
-        st.session_state.user_code = response["text"]
-
-    if response is not None and response.get("type") == "submit":
+    # Until the browser sends an event the editor returns its default value
+    # (empty id and text), which must not replace the learner's code.
+    if (
+        response is not None
+        and response.get("id")
+        and response.get("text") is not None
+        and response["text"] != st.session_state.user_code
+    ):
+        update_draft(response["text"])
+
+    # The editor keeps returning its last event on later reruns; only a new
+    # submit (new event id) runs the tests.
+    if (
+        response is not None
+        and response.get("type") == "submit"
+        and response.get("id") != st.session_state.get("editor_submit_id")
+    ):
+        st.session_state.editor_submit_id = response.get("id")
         _run_tests()
 
 
+def _typing_window() -> str:
+    """Telemetry window: the current exercise until its next success."""
+    idx = st.session_state.current_exercise_idx
+    return f"{st.session_state.exercises[idx]['id']}:{st.session_state.successes[idx]}"
+
+
+def _typing_window_seconds(window: str) -> float:
+    """Server-side time since ``window`` was opened; 0 if it was not."""
+    opened = st.session_state.get("typing_window_opened")
+    if opened is None or opened[0] != window:
+        return 0.0
+    return time.monotonic() - opened[1]
+
+
+@profiled
 def _run_tests() -> None:
+    throttle = ratelimit.acquire_run()
+    if throttle is not None:
+        # Not graded: no attempt, life or journal entry, and the last result
+        # stays on screen under the notice.
+        st.session_state.throttle_notice = ratelimit.throttle_message(throttle)
+        return
+
     current_exercise = get_current_exercise()
     current_idx = st.session_state.current_exercise_idx
 
     st.session_state.attempts[current_idx] += 1
 
-    result = execute_code_with_tests(
-        st.session_state.user_code, current_exercise["validation"]["tests"]
+    reference = (
+        load_reference_solution(current_exercise["id"], st.session_state.pack)
+        if is_performance_kata(current_exercise)
+        else None
+    )
+    tests = compiled_tests(current_exercise["validation"]["tests"])
+    start = time.perf_counter()
+    with metrics.ENGINE_SECONDS.time():
+        result = grading.grade(
+            st.session_state.user_code, current_exercise, reference, tests
+        )
+    journal.record_submission(
+        st.session_state.pack,
+        current_exercise["id"],
+        st.session_state.user_code,
+        result,
+        time.perf_counter() - start,
     )
+    metrics.SUBMISSIONS.labels("pass" if result["success"] else "fail").inc()
+    performance = result.get("performance")
+    window = _typing_window()
+    typing = telemetry.typing_stats(
+        st.session_state.get(telemetry.TELEMETRY_KEY), window
+    )
+    pace = None
 
     if result["success"]:
         st.session_state.successes[current_idx] += 1
         st.session_state.score += POINTS_PER_SUCCESS
+        if performance:
+            st.session_state.score += performance["bonus"]
+        if typing is not None:
+            pace = {
+                "keystrokes": typing.keystrokes,
+                "pauses": typing.pauses,
+                "active_seconds": typing.active_seconds,
+                "bonus": telemetry.pace_bonus(
+                    typing, current_exercise, _typing_window_seconds(window)
+                ),
+            }
+            st.session_state.score += pace["bonus"]
     else:
         st.session_state.lives -= 1
 
@@ -155,33 +364,84 @@ def _run_tests() -> None:
         "message": result["message"],
         "error": result.get("error"),
         "mastery": mastery,
+        "performance": performance,
+        "pace": pace,
     }
+    st.session_state.style_notes = (
+        current_idx,
+        check_style(st.session_state.user_code),
+    )
+    st.session_state.effect_event = effects.effect_event(
+        result,
+        sum(s >= MASTERY_THRESHOLD for s in st.session_state.successes),
+        len(st.session_state.exercises),
+        mastery,
+    )
 
+    record_review(result["success"])
     save_progress()
 
 
+@profiled
 def _render_test_result() -> None:
+    notice = st.session_state.pop("throttle_notice", None)
+    if notice:
+        st.warning(notice, icon="⏳")
+
     result = st.session_state.get("last_result")
     if result is None:
         return
 
     if result["success"]:
         st.success(result["message"])
+        _render_performance(result.get("performance"))
+        _render_pace(result.get("pace"))
         if result["mastery"]:
-            st.balloons()
             st.markdown(
                 '<div class="mastery-text">Exercise Complete — kata mastered!</div>',
                 unsafe_allow_html=True,
             )
+        st.session_state.last_result = None
     else:
+        # Failures stay on screen until the next run, navigation or reset,
+        # so opening "Error Details" (which reruns) does not hide them.
         st.error(result["message"])
+        _render_performance(result.get("performance"))
         if result["error"]:
-            with st.expander("Error Details"):
-                st.code(result["error"])
+            _render_error_details(result["error"])
 
-    st.session_state.last_result = None
+
+def _render_error_details(error: object) -> None:
+    if not _EXPANDER_REPORTS_OPEN:
+        with st.expander("Error Details"):
+            st.code(str(error))
+        return
+    with st.expander("Error Details", key="error_details", on_change="rerun") as panel:
+        if panel.open:
+            st.code(str(error))
 
 
+def _render_pace(pace: dict[str, Any] | None) -> None:
+    if not pace:
+        return
+    minutes, seconds = divmod(round(pace["active_seconds"]), 60)
+    st.caption(
+        f"⌨ {pace['keystrokes']} keystrokes · {minutes}:{seconds:02d} on task · "
+        f"{pace['pauses']} pauses · pace bonus +{pace['bonus']}"
+    )
+
+
+def _render_performance(performance: dict[str, Any] | None) -> None:
+    if not performance:
+        return
+    st.caption(
+        f"⏱ Yours: {performance['user_seconds'] * 1e3:.3f} ms · "
+        f"reference: {performance['reference_seconds'] * 1e3:.3f} ms · "
+        f"budget {performance['budget']:g}× · speed bonus +{performance['bonus']}"
+    )
+
+
+@profiled
 def _render_action_buttons() -> None:
     current_idx = st.session_state.current_exercise_idx
     total = len(st.session_state.exercises)
@@ -216,9 +476,10 @@ def _render_action_buttons() -> None:
         _render_hint_popover()
 
     with act3:
-        st.button("🔄 Reset", use_container_width=True, on_click=reset_exercise_code)
+        st.button("🔄 Reset", use_container_width=True, on_click=_reset_code)
 
 
+@profiled
 def _render_hint_popover() -> None:
     current_idx = st.session_state.current_exercise_idx
     current_level = get_current_hint_level()
@@ -245,46 +506,125 @@ def _render_hint_popover() -> None:
             st.caption("All hints revealed.")
 
 
+@profiled
 def _render_progress_panel() -> None:
-    chapters: dict[int, list] = {}
-    for idx, exercise in enumerate(st.session_state.exercises):
-        chapter = exercise["metadata"]["chapter"]
-        chapters.setdefault(chapter, []).append((idx, exercise))
+    if "exercise_outline" not in st.session_state:
+        st.session_state.exercise_outline = _exercise_outline(
+            st.session_state.exercises
+        )
+
+    panels = _progress_panel_html(
+        st.session_state.exercise_outline,
+        tuple(st.session_state.successes),
+        st.session_state.current_exercise_idx,
+    )
+
+    tabs = st.tabs([label for label, _html in panels])
+    for tab, (_label, html) in zip(tabs, panels, strict=True):
+        with tab:
+            st.markdown(html, unsafe_allow_html=True)
+
+
+@profiled
+def _render_review() -> None:
+    st.markdown('<div class="section-title">Review</div>', unsafe_allow_html=True)
+    head = st.session_state.review.peek()
+    if head is None:
+        st.caption("Solve a kata to schedule its first review.")
+        return
+    due, due_idx = head
+    wait = due - time.time()
+    if wait > 0:
+        st.caption(f"Next review in {_format_wait(wait)}.")
+        return
+    theme = st.session_state.exercises[due_idx]["metadata"]["theme"].title()
+    st.button(
+        f"🔁 Practice {theme}",
+        use_container_width=True,
+        on_click=_navigate_review,
+    )
 
-    tab_labels = [f"Ch {ch}" for ch in sorted(chapters)]
-    tabs = st.tabs(tab_labels)
 
-    for tab, (_ch, items) in zip(tabs, sorted(chapters.items()), strict=False):
+def _format_wait(seconds: float) -> str:
+    if seconds < 3_600:
+        return f"{max(1, round(seconds / 60))} min"
+    if seconds < DAY_SECONDS:
+        return f"{round(seconds / 3_600)} h"
+    return f"{round(seconds / DAY_SECONDS)} d"
+
+
+@profiled
+def _render_leaderboard() -> None:
+    st.markdown('<div class="section-title">Leaderboard</div>', unsafe_allow_html=True)
+    boards = [("Global", GLOBAL_BOARD)]
+    if st.session_state.classroom:
+        boards.append(
+            (
+                f"Class {st.session_state.classroom}",
+                classroom_board(st.session_state.classroom),
+            )
+        )
+
+    leaderboard = get_leaderboard()
+    learner_id = st.session_state.learner_id
+    tabs = st.tabs([label for label, _board in boards])
+    for tab, (_label, board) in zip(tabs, boards, strict=True):
         with tab:
-            for idx, exercise in items:
-                success_count = st.session_state.successes[idx]
-                is_current = idx == st.session_state.current_exercise_idx
-
-                dot_class = (
-                    "mastered"
-                    if success_count >= MASTERY_THRESHOLD
-                    else "in-progress" if success_count > 0 else "not-started"
-                )
-                current_class = " current" if is_current else ""
-                theme_name = exercise["metadata"]["theme"].title()
-
-                st.markdown(
-                    f'<div class="progress-item{current_class}">'
-                    f'<span class="dot {dot_class}"></span>'
-                    f"{'👉 ' if is_current else ''}"
-                    f"{theme_name} &middot; {success_count}/{MASTERY_THRESHOLD}"
-                    f"</div>",
-                    unsafe_allow_html=True,
-                )
+            html = _leaderboard_html(leaderboard.top(board, TOP_K), learner_id)
+            st.markdown(html, unsafe_allow_html=True)
+            rank = leaderboard.rank(board, learner_id)
+            if rank is None:
+                st.caption("Solve a kata to join the board.")
+            else:
+                st.caption(f"You: #{rank[0]} of {rank[1]}")
+
+
+@lru_cache(maxsize=_RENDER_CACHE_SIZE)
+def _style_notes_html(issues: tuple[StyleIssue, ...]) -> str:
+    """Findings from the last run of this exercise, most relevant first."""
+    if not issues:
+        return '<div class="style-clean">✓ No style issues in your last run</div>'
+    rows = "".join(
+        f'<div class="style-issue"><span class="style-line">L{i.line}</span> '
+        f'{escape(i.message)} <span class="style-code">{i.code}</span></div>'
+        for i in issues[:_STYLE_NOTES_SHOWN]
+    )
+    hidden = len(issues) - _STYLE_NOTES_SHOWN
+    if hidden > 0:
+        rows += f'<div class="style-more">+{hidden} more</div>'
+    return rows
 
 
+@profiled
 def _render_pep_tip() -> None:
     current_exercise = get_current_exercise()
     tip = current_exercise.get("pep_tip", "Keep your code clean and readable!")
     st.markdown('<div class="section-title">PEP8</div>', unsafe_allow_html=True)
+    notes = st.session_state.get("style_notes")
+    if notes is not None and notes[0] == st.session_state.current_exercise_idx:
+        st.markdown(_style_notes_html(notes[1]), unsafe_allow_html=True)
     st.markdown(f'<div class="pep-tip-box">{tip}</div>', unsafe_allow_html=True)
 
 
+def _render_profiler_panel(samples: list[profiler.Sample]) -> None:
+    total_ns = sum(s.duration_ns for s in samples if s.depth == 0) or 1
+    rows = "".join(
+        f'<div class="profile-row" style="padding-left: {s.depth * 0.6}rem">'
+        f'<span class="profile-bar" '
+        f'style="width: {100 * s.duration_ns / total_ns:.1f}%"></span>'
+        f'<span class="profile-label">{s.name.lstrip("_")} '
+        f"&middot; {s.duration_ns / 1e6:.2f} ms</span>"
+        f"</div>"
+        for s in samples
+    )
+    with st.sidebar:
+        st.markdown(
+            '<div class="section-title">Rerun Profile</div>', unsafe_allow_html=True
+        )
+        st.caption(f"{len(samples)} samples · {total_ns / 1e6:.2f} ms total")
+        st.markdown(rows, unsafe_allow_html=True)
+
+
 # ═══════════════════════════════════════════════════════════════
 # DIALOGS
 # ═══════════════════════════════════════════════════════════════
@@ -311,31 +651,77 @@ def _reset_dialog() -> None:
 
 
 def _navigate_previous() -> None:
+    st.session_state.last_result = None
     previous_exercise()
     save_progress()
 
 
 def _navigate_next() -> None:
+    st.session_state.last_result = None
     next_exercise()
     save_progress()
 
 
+def _navigate_review() -> None:
+    st.session_state.last_result = None
+    if review_exercise():
+        save_progress()
+
+
+def _reset_code() -> None:
+    st.session_state.last_result = None
+    reset_exercise_code()
+
+
+def _resume_session() -> None:
+    del st.session_state["evicted"]
+
+
+def _render_paused() -> None:
+    st.info(
+        "This session was paused after a while without activity. "
+        "Your progress is saved in this browser."
+    )
+    st.button("▶ Resume", type="primary", on_click=_resume_session)
+
+
 # ═══════════════════════════════════════════════════════════════
 # MAIN
 # ═══════════════════════════════════════════════════════════════
 
 
 def render_app() -> None:
-    initialize_session_state()
+    metrics.start_exporters()
+
+    try:
+        with profiler.span("render_app"):
+            _render_page()
+    finally:
+        # Whichever way the rerun ends, the next one starts a fresh collection.
+        samples = profiler.collect_samples() if profiler.ENABLED else []
+    if samples:
+        _render_profiler_panel(samples)
+
+
+def _render_page() -> None:
+    st.html(_theme_style_block())
+    _render_header()
+
+    if not st.session_state.get("evicted"):
+        if not initialize_session_state():
+            st.caption("Loading your progress…")
+            return
+        if memory.track_session(st.session_state, shared=(st.session_state.exercises,)):
+            evict_session_state()
+    if st.session_state.get("evicted"):
+        _render_paused()
+        return
 
     if "last_result" not in st.session_state:
         st.session_state.last_result = None
     if "show_reset_dialog" not in st.session_state:
         st.session_state.show_reset_dialog = False
 
-    st.html(f"<style>{_theme_css()}</style>")
-
-    _render_header()
     _render_stats_bar()
 
     left, right = st.columns([2, 1])
@@ -348,6 +734,9 @@ def render_app() -> None:
 
     with right:
         _render_progress_panel()
+        _render_review()
+        st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
+        _render_leaderboard()
         st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
         _render_pep_tip()
         st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
@@ -364,3 +753,138 @@ def render_app() -> None:
         "</div>",
         unsafe_allow_html=True,
     )
+    # Rendered on every run, so a playing animation is never unmounted.
+    effects.play_effects(st.session_state.get("effect_event"))
+
+
+# ═══════════════════════════════════════════════════════════════
+# TEACHER DASHBOARD
+# ═══════════════════════════════════════════════════════════════
+
+
+TEACHER_KEY_ENV = "HEBIKATA_TEACHER_KEY"
+
+
+def _teacher_key_ok(given: str) -> bool:
+    """Whether ``given`` is the configured teacher key; False if none is set."""
+    expected = os.environ.get(TEACHER_KEY_ENV, "")
+    return bool(expected) and hmac.compare_digest(
+        given.encode("utf-8"), expected.encode("utf-8")
+    )
+
+
+def _render_teacher_gate() -> bool:
+    """Ask for the teacher key; True once this session has given it."""
+    if not os.environ.get(TEACHER_KEY_ENV):
+        st.info(
+            "The teacher dashboard is off. Start the app with "
+            f"`{TEACHER_KEY_ENV}` set to a key you share with teachers."
+        )
+        return False
+    given = st.session_state.get("teacher_key") or st.query_params.get("key", "")
+    if _teacher_key_ok(given):
+        return True
+    st.text_input("Teacher key", type="password", key="teacher_key")
+    if given:
+        st.error("That key is not valid.")
+    return False
+
+
+def _exercise_table(
+    exercises: list[dict], summary: ClassroomSummary
+) -> dict[str, list[Any]]:
+    """The summary's columns for ``exercises``, in their order."""
+    column = {exercise_id: i for i, exercise_id in enumerate(summary.exercise_ids)}
+
+    def pick(values: list[Any], missing: Any) -> list[Any]:
+        return [
+            values[column[ex["id"]]] if ex["id"] in column else missing
+            for ex in exercises
+        ]
+
+    return {
+        "Exercise": [ex["id"] for ex in exercises],
+        "Theme": [ex["metadata"]["theme"].title() for ex in exercises],
+        "Attempts": pick(summary.attempts, 0),
+        "Failure rate": [100 * r for r in pick(summary.failure_rate, 0.0)],
+        "Attempts to mastery": pick(summary.median_attempts_to_mastery, None),
+        "Hint usage": [100 * r for r in pick(summary.hint_usage, 0.0)],
+    }
+
+
+def render_teacher_dashboard() -> None:
+    """Classroom analytics page (app/pages/teacher.py)."""
+    st.html(_theme_style_block())
+    _render_header()
+    if not _render_teacher_gate():
+        return
+
+    packs = list(available_packs())
+    requested_pack = st.query_params.get("pack")
+    pack = (
+        st.selectbox(
+            "Content pack",
+            packs,
+            index=packs.index(requested_pack) if requested_pack in packs else 0,
+        )
+        if len(packs) > 1
+        else packs[0]
+    )
+    store = get_analytics(pack, MASTERY_THRESHOLD)
+    classrooms = store.classrooms()
+    options = ["All learners", *classrooms]
+    requested = st.query_params.get("class")
+    choice = st.selectbox(
+        "Classroom",
+        options,
+        index=options.index(requested) if requested in classrooms else 0,
+    )
+    summary = store.summary(None if choice == "All learners" else choice)
+    if store.rejected:
+        st.warning(
+            f"{store.rejected} progress save(s) did not match their exercise "
+            "list and are not counted."
+        )
+    if not summary.learners:
+        st.info("No learner progress yet. Analytics fill in as learners save.")
+        return
+
+    # Columns of exercises since removed from the pack are left out.
+    table = _exercise_table(load_exercises(pack), summary)
+    total_attempts = sum(table["Attempts"])
+    failed = sum(
+        a * r / 100
+        for a, r in zip(table["Attempts"], table["Failure rate"], strict=True)
+    )
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Learners", summary.learners)
+    c2.metric("Attempts", total_attempts)
+    c3.metric("Failure rate", f"{100 * failed / max(total_attempts, 1):.0f}%")
+
+    st.markdown('<div class="section-title">Exercises</div>', unsafe_allow_html=True)
+    st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Failure rate": st.column_config.NumberColumn(format="%.0f%%"),
+            "Attempts to mastery": st.column_config.NumberColumn(
+                help=f"Median attempts to reach {MASTERY_THRESHOLD} successes",
+                format="%.1f",
+            ),
+            "Hint usage": st.column_config.NumberColumn(
+                help="Learners who opened a hint, of those who tried",
+                format="%.0f%%",
+            ),
+        },
+    )
+
+    st.markdown('<div class="section-title">Scores</div>', unsafe_allow_html=True)
+    st.bar_chart(
+        {
+            "Score": [low for low, _count in summary.score_histogram],
+            "Learners": [count for _low, count in summary.score_histogram],
+        },
+        x="Score",
+        y="Learners",
+    )
@@ -0,0 +1,178 @@
+"""
+HebiKata - Grading Backend Comparison
+
+Grades one batch of submissions through each way the app can run learner
+code and reports start-up time, throughput and latency per backend:
+
+- ``inprocess``: grade_locally() on a thread pool, all sharing one GIL
+- ``processes``: a spawned process pool, as the grading service runs it
+- ``subinterpreters``: a SubinterpreterPool (app/subinterp.py), one GIL
+  per interpreter on Python 3.12+
+
+The batch is every reference solution of a curriculum (``--data``), or
+with ``--workload cpu`` a CPU-bound kata sized by ``--work``, where the
+cost of sharing a GIL shows most. Every submission is queued at once, so
+latency includes waiting for a worker.
+
+Usage:
+    python -m benchmarks.backends --workers 4
+    python -m benchmarks.backends --workload curriculum --repeat 20 \\
+        --backend inprocess,subinterpreters
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.data_loader import read_exercises
+from app.grading import decode_result, encode_result, grade_locally
+from app.subinterp import SubinterpreterPool, available
+from benchmarks.stats import format_seconds, summarize
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+BACKENDS = ("inprocess", "processes", "subinterpreters")
+
+_GRADING_KEYS = ("id", "type", "validation", "performance")
+
+_PRIMES = """\
+def count_primes(limit):
+    count = 0
+    for n in range(2, limit):
+        if all(n % d for d in range(2, int(n ** 0.5) + 1)):
+            count += 1
+    return count
+"""
+
+# (user_code, exercise, reference_code)
+Job = tuple[str, dict[str, Any], str | None]
+# submit(job) -> future of an encoded grading result
+Submit = Callable[[Job], "Future[dict[str, Any]]"]
+
+
+def curriculum_jobs(data: Path = DATA_DIR) -> list[Job]:
+    """Every exercise with its reference solution as the submission."""
+    jobs = []
+    for exercise in read_exercises(data):
+        path = data / "solutions" / f"{exercise['id']}.py"
+        if not path.is_file():
+            continue
+        solution = path.read_text(encoding="utf-8")
+        view = {k: exercise[k] for k in _GRADING_KEYS if k in exercise}
+        reference = solution if exercise.get("type") == "performance" else None
+        jobs.append((solution, view, reference))
+    return jobs
+
+
+def cpu_jobs(work: int) -> list[Job]:
+    """A prime-counting kata; ``work`` is the limit it searches up to."""
+    namespace: dict[str, Any] = {}
+    exec(_PRIMES, namespace)
+    expected = namespace["count_primes"](work)
+    tests = f"def test_primes():\n    assert count_primes({work}) == {expected}\n"
+    return [(_PRIMES, {"id": "cpu_kata", "validation": {"tests": tests}}, None)]
+
+
+@dataclass
+class BackendReport:
+    startup_seconds: float = 0.0
+    seconds: list[float] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    failures: int = 0
+
+    @property
+    def throughput(self) -> float:
+        return len(self.seconds) / self.wall_seconds if self.wall_seconds else 0.0
+
+
+def _grade(job: Job) -> dict[str, Any]:
+    return encode_result(grade_locally(*job))
+
+
+def _noop() -> None:
+    pass
+
+
+def _start(backend: str, workers: int) -> tuple[Submit, Callable[[], None]]:
+    """Start a backend; returns its submit function and its shutdown."""
+    if backend == "inprocess":
+        threads = ThreadPoolExecutor(max_workers=workers)
+        return (lambda job: threads.submit(_grade, job)), threads.shutdown
+    if backend == "processes":
+        processes = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        for future in [processes.submit(_noop) for _ in range(workers)]:
+            future.result()
+        return (lambda job: processes.submit(_grade, job)), processes.shutdown
+    if backend == "subinterpreters":
+        pool = SubinterpreterPool(workers)
+        return (lambda job: pool.submit(*job)), pool.close
+    raise ValueError(f"Unknown backend: {backend!r}")
+
+
+def run_backend(backend: str, jobs: list[Job], workers: int) -> BackendReport:
+    """Grade ``jobs`` on a fresh ``backend`` with ``workers`` workers."""
+    report = BackendReport()
+    start = time.perf_counter()
+    submit, shutdown = _start(backend, workers)
+    report.startup_seconds = time.perf_counter() - start
+    try:
+        start = time.perf_counter()
+        futures = [submit(job) for job in jobs]
+        for future in futures:
+            future.add_done_callback(
+                lambda _: report.seconds.append(time.perf_counter() - start)
+            )
+        for future in futures:
+            if not decode_result(future.result())["success"]:
+                report.failures += 1
+        report.wall_seconds = time.perf_counter() - start
+    finally:
+        shutdown()
+    return report
+
+
+def _print_report(backend: str, report: BackendReport) -> None:
+    print(f"\nbackend={backend}  submissions={len(report.seconds)}")
+    print(f"  start-up        {format_seconds(report.startup_seconds)}")
+    print(f"  throughput      {report.throughput:.1f} submissions/s")
+    latency = summarize(report.seconds)
+    print(
+        "  latency         "
+        + "  ".join(f"{k}={format_seconds(latency[k])}" for k in ("p50", "p95", "max"))
+    )
+    if report.failures:
+        print(f"  failed          {report.failures} (expected all to pass)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare grading backends.")
+    parser.add_argument("--backend", default=",".join(BACKENDS), help="comma-separated")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--workload", choices=("curriculum", "cpu"), default="cpu")
+    parser.add_argument("--data", type=Path, default=DATA_DIR)
+    parser.add_argument("--work", type=int, default=20_000, help="cpu kata size")
+    parser.add_argument("--repeat", type=int, default=0, help="default: 4 × workers")
+    args = parser.parse_args()
+
+    base = cpu_jobs(args.work) if args.workload == "cpu" else curriculum_jobs(args.data)
+    jobs = base * (args.repeat or 4 * args.workers)
+    print(f"Python {sys.version.split()[0]}, {args.workers} workers, {len(jobs)} jobs")
+    for backend in (b for b in args.backend.split(",") if b):
+        if backend == "subinterpreters" and not available():
+            print(f"\nbackend={backend}  skipped (no subinterpreter support)")
+            continue
+        _print_report(backend, run_backend(backend, jobs, args.workers))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
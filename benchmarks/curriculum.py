@@ -0,0 +1,121 @@
+"""
+HebiKata - Synthetic Curriculum Generator
+
+Writes a data/-shaped tree (index.yaml, exercises/*.yaml, solutions/*.py)
+with any number of exercises so loaders, renderers and the engine can be
+measured at curriculum sizes well beyond the shipped 15 exercises.
+
+Usage:
+    python -m benchmarks.curriculum OUT_DIR --size 1500
+"""
+
+import argparse
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+THEMES = ("rpg", "hacking", "science", "crypto", "arcade")
+MAX_CHAPTERS = 10
+
+# (concept, initial_code, solution, tests) templates; ``{n}`` is the exercise
+# number so every generated exercise has distinct source and test code.
+_TEMPLATES: tuple[tuple[str, str, str, str], ...] = (
+    (
+        "variables",
+        "value_{n} = 0\n",
+        "value_{n} = {n}\n",
+        "def test_value():\n    assert value_{n} == {n}, 'Expected {n}'\n",
+    ),
+    (
+        "control-flow",
+        "level = {n}\nif level > {n}:\n    status = 'high'\nelse:\n    status = 'high'\n",
+        "level = {n}\nif level > {n}:\n    status = 'high'\nelse:\n    status = 'low'\n",
+        "def test_status():\n    assert status == 'low', f'Got {{status}}'\n",
+    ),
+    (
+        "functions",
+        "def scale(x):\n    return x\n",
+        "def scale(x):\n    return x * {n}\n",
+        "def test_scale():\n"
+        "    assert scale(2) == {double}, 'scale(2) is wrong'\n"
+        "    assert scale(0) == 0, 'scale(0) is wrong'\n",
+    ),
+)
+
+
+def _exercise(idx: int, size: int) -> tuple[str, dict[str, Any], str]:
+    concept, initial, solution, tests = _TEMPLATES[idx % len(_TEMPLATES)]
+    n = idx + 1
+    chapter = 1 + idx * min(MAX_CHAPTERS, size) // size
+    theme = THEMES[idx % len(THEMES)]
+    ref = f"syn_{n:05d}"
+    fmt = {"n": n, "double": 2 * n}
+    exercise = {
+        "id": ref,
+        "metadata": {
+            "chapter": chapter,
+            "concept": concept,
+            "subconcept": "synthetic",
+            "difficulty": "beginner",
+            "theme": theme,
+            "prerequisites": [f"syn_{n - 1:05d}"] if idx else [],
+            "tags": [concept, "synthetic"],
+        },
+        "content": {
+            "prompt": f"Synthetic {concept} exercise #{n}. Fix the code!\n",
+            "initial_code": initial.format(**fmt),
+        },
+        "validation": {"tests": tests.format(**fmt)},
+        "hints": [
+            {"level": "basic", "text": f"Hint 1 for #{n}"},
+            {"level": "detailed", "text": f"Hint 2 for #{n}"},
+            {"level": "solution", "text": f"Hint 3 for #{n}"},
+        ],
+        "pep_tip": "Keep your code clean and readable!",
+        "boss": idx % 5 == 4,
+    }
+    return ref, exercise, solution.format(**fmt)
+
+
+def generate_curriculum(root: Path, size: int) -> list[str]:
+    """
+    Write a synthetic curriculum of ``size`` exercises under ``root``.
+
+    Args:
+        root: Output directory; created if missing. Existing files with the
+            same names are overwritten.
+        size: Number of exercises to generate.
+
+    Returns:
+        The generated exercise refs in index order.
+    """
+    (root / "exercises").mkdir(parents=True, exist_ok=True)
+    (root / "solutions").mkdir(parents=True, exist_ok=True)
+
+    refs: list[str] = []
+    for idx in range(size):
+        ref, exercise, solution = _exercise(idx, size)
+        with open(root / "exercises" / f"{ref}.yaml", "w", encoding="utf-8") as f:
+            yaml.safe_dump(exercise, f, sort_keys=False, allow_unicode=True)
+        (root / "solutions" / f"{ref}.py").write_text(solution, encoding="utf-8")
+        refs.append(ref)
+
+    with open(root / "index.yaml", "w", encoding="utf-8") as f:
+        yaml.safe_dump({"exercises": [{"ref": r} for r in refs]}, f, sort_keys=False)
+    return refs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic HebiKata curriculum."
+    )
+    parser.add_argument("out", type=Path, help="output directory")
+    parser.add_argument("--size", type=int, default=150, help="number of exercises")
+    args = parser.parse_args()
+    refs = generate_curriculum(args.out, args.size)
+    print(f"Generated {len(refs)} exercises in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+HebiKata - Concurrent Session Load Test
+
+Drives simulated learners through ``app/main.py`` with Streamlit's
+``AppTest`` harness, one thread per learner, and reports how rerun latency,
+engine wait time and per-session memory change as concurrency goes up.
+
+The localStorage bridge (streamlit-js-eval) is replaced with an in-memory,
+per-learner store, so no browser is involved.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 1,4,16 --steps 20
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from streamlit.runtime import Runtime
+from streamlit.testing.v1 import AppTest
+
+import app.grading
+from app.memory import deep_sizeof
+from app.ratelimit import RateLimiter
+from benchmarks.stats import format_seconds, summarize
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app" / "main.py"
+SOLUTIONS_DIR = APP_PATH.parent.parent / "data" / "solutions"
+
+# (action, weight) pairs for each simulated learner step.
+ACTIONS: tuple[tuple[str, int], ...] = (
+    ("solve", 50),
+    ("fail", 15),
+    ("hint", 10),
+    ("next", 15),
+    ("previous", 10),
+)
+
+
+@dataclass
+class LoadSample:
+    """Measurements collected across all learners at one concurrency level."""
+
+    rerun_seconds: list[float] = field(default_factory=list)
+    engine_wait_seconds: list[float] = field(default_factory=list)
+    session_bytes: list[int] = field(default_factory=list)
+    errors: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class _LocalStorageStub(threading.local):
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+
+@contextmanager
+def _stubbed_environment(sample: LoadSample) -> Iterator[None]:
+    storage = _LocalStorageStub()
+    real_grade = app.grading.grade
+
+    def read_local_storage(key: str) -> str | None:
+        return storage.values.get(key)
+
+    def set_local_storage(key: str, value: str, component_key: str | None = None):
+        storage.values[key] = value
+
+    def timed_engine(*args: Any, **kwargs: Any) -> dict[str, Any]:
+        # Wall time minus this thread's CPU time is time spent waiting,
+        # mostly on the GIL held by other sessions' engine runs.
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            return real_grade(*args, **kwargs)
+        finally:
+            waited = (time.perf_counter() - wall) - (time.thread_time() - cpu)
+            with sample.lock:
+                sample.engine_wait_seconds.append(max(0.0, waited))
+
+    # AppTest installs a mock Runtime singleton for the duration of each run
+    # and clears it afterwards, which breaks runs still in flight on other
+    # threads. Keep handing out the last installed mock instead.
+    pinned: list[Runtime] = []
+
+    def runtime_instance(cls: type[Runtime]) -> Runtime:
+        if cls._instance is not None:
+            pinned[:] = [cls._instance]
+        return pinned[0]
+
+    def runtime_exists(cls: type[Runtime]) -> bool:
+        return cls._instance is not None or bool(pinned)
+
+    with (
+        patch.object(Runtime, "instance", classmethod(runtime_instance)),
+        patch.object(Runtime, "exists", classmethod(runtime_exists)),
+        patch("app.session.read_local_storage", read_local_storage),
+        patch("app.session.set_local_storage", set_local_storage),
+        patch("app.grading.grade", timed_engine),
+        # Simulated learners never pause; load the engine, not the limiter.
+        patch("app.ratelimit._limiter", RateLimiter(0, 1)),
+    ):
+        yield
+
+
+def _click(at: AppTest, label: str) -> Callable[[], AppTest]:
+    """Return a rerun that clicks ``label``, or a plain rerun if it is disabled."""
+    for button in at.button:
+        if button.label == label and not button.disabled:
+            return button.click().run
+    return at.run
+
+
+def _solution_for(at: AppTest) -> str:
+    state = at.session_state
+    exercise = state["exercises"][state["current_exercise_idx"]]
+    return (SOLUTIONS_DIR / f"{exercise['id']}.py").read_text(encoding="utf-8")
+
+
+def _learner(seed: int, steps: int, sample: LoadSample) -> None:
+    rng = random.Random(seed)
+    names = [name for name, _w in ACTIONS]
+    weights = [w for _n, w in ACTIONS]
+    at = AppTest.from_file(str(APP_PATH), default_timeout=60)
+
+    def timed(run: Callable[[], AppTest]) -> None:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        with sample.lock:
+            sample.rerun_seconds.append(elapsed)
+            sample.errors += len(at.exception)
+
+    timed(at.run)
+    for _ in range(steps):
+        action = rng.choices(names, weights)[0]
+        if action == "solve":
+            at.session_state["user_code"] = _solution_for(at)
+            timed(_click(at, "🧪 Run Tests"))
+        elif action == "fail":
+            at.session_state["user_code"] = "pass"
+            timed(_click(at, "🧪 Run Tests"))
+        elif action == "hint":
+            timed(_click(at, "Reveal Next Hint"))
+        elif action == "next":
+            timed(_click(at, "Next ➡"))
+        else:
+            timed(_click(at, "⬅ Prev"))
+
+    state_bytes = deep_sizeof(at.session_state.to_dict())
+    with sample.lock:
+        sample.session_bytes.append(state_bytes)
+
+
+def run_level(
+    concurrency: int, steps: int, seed: int, trace_memory: bool
+) -> tuple[LoadSample, int | None]:
+    """
+    Run ``concurrency`` learners in parallel for ``steps`` actions each.
+
+    Returns:
+        The collected sample and, with ``trace_memory``, the peak traced
+        allocation per learner (tracemalloc slows reruns noticeably, so it
+        is opt-in).
+    """
+    sample = LoadSample()
+    if trace_memory:
+        tracemalloc.start()
+    with _stubbed_environment(sample), ThreadPoolExecutor(concurrency) as pool:
+        futures = [
+            pool.submit(_learner, seed + i, steps, sample) for i in range(concurrency)
+        ]
+        for future in futures:
+            future.result()
+    if not trace_memory:
+        return sample, None
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sample, peak // concurrency
+
+
+def _report(concurrency: int, sample: LoadSample, peak_per_learner: int | None) -> None:
+    reruns = summarize(sample.rerun_seconds)
+    print(f"\nconcurrency={concurrency}  reruns={reruns['count']:.0f}")
+    print(
+        "  rerun latency   "
+        + "  ".join(
+            f"{k}={format_seconds(reruns[k])}" for k in ("p50", "p95", "p99", "max")
+        )
+    )
+    if sample.engine_wait_seconds:
+        wait = summarize(sample.engine_wait_seconds)
+        print(
+            "  engine wait     "
+            + "  ".join(f"{k}={format_seconds(wait[k])}" for k in ("p50", "p95", "max"))
+        )
+    mean_state = sum(sample.session_bytes) / len(sample.session_bytes)
+    print(f"  session state   {mean_state / 1024:.1f} KiB/session (deep size)")
+    if peak_per_learner is not None:
+        print(f"  peak traced     {peak_per_learner / 1024:.1f} KiB/learner")
+    if sample.errors:
+        print(f"  app exceptions  {sample.errors}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the HebiKata app.")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated")
+    parser.add_argument("--steps", type=int, default=20, help="actions per learner")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="also report tracemalloc peaks"
+    )
+    args = parser.parse_args()
+
+    # One untimed learner pays the one-off import and component setup cost.
+    run_level(1, 1, args.seed, trace_memory=False)
+    for concurrency in (int(c) for c in args.concurrency.split(",") if c):
+        sample, peak = run_level(concurrency, args.steps, args.seed, args.trace_memory)
+        _report(concurrency, sample, peak)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
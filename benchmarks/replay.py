@@ -0,0 +1,219 @@
+"""
+HebiKata - Journal Replay
+
+Pushes recorded submissions (see app/journal.py) through an engine
+configuration and reports throughput, grading latency and how many
+outcomes differ from what was recorded, so engine changes are measured
+against real learner workloads. Each record is graded against the content
+pack it was recorded in; records from before the journal stored packs
+belong to the core pack.
+
+Backends:
+
+- ``local``: app.grading.grade_locally(), as the app grades without a service
+- ``traced``: execute_code_with_tests(..., trace=True)
+- ``service``: a running grading service (``--url``)
+- ``subinterpreters``: a SubinterpreterPool (app/subinterp.py) with one
+  interpreter per ``--concurrency``
+
+Usage:
+    python -m benchmarks.replay /var/lib/hebikata/journal --backend local
+    python -m benchmarks.replay journal/ --backend service \\
+        --url http://127.0.0.1:8765 --concurrency 8
+"""
+
+import argparse
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.data_loader import DEFAULT_PACK, available_packs, read_exercises
+from app.engine import execute_code_with_tests
+from app.grading import decode_result, grade_locally
+from app.grading_client import GradingClient
+from app.journal import read_journal
+from app.subinterp import SubinterpreterPool
+from benchmarks.stats import format_seconds, summarize
+
+# grade(user_code, exercise, reference_code) -> grading result
+Grader = Callable[[str, dict[str, Any], str | None], dict[str, Any]]
+
+
+def _traced(
+    user_code: str, exercise: dict[str, Any], reference_code: str | None
+) -> dict[str, Any]:
+    validation = exercise["validation"]
+    return execute_code_with_tests(
+        user_code,
+        validation["tests"],
+        trace=True,
+        imports=validation.get("imports"),
+        modules=validation.get("modules"),
+        fixtures=validation.get("fixtures"),
+    )
+
+
+def make_grader(backend: str, url: str | None = None, workers: int = 1) -> Grader:
+    """Grading function for a ``--backend`` name."""
+    if backend == "local":
+        return grade_locally
+    if backend == "traced":
+        return _traced
+    if backend == "service":
+        if not url:
+            raise ValueError("the service backend needs --url")
+        client = GradingClient(url)
+
+        def remote(
+            user_code: str, exercise: dict[str, Any], reference_code: str | None
+        ) -> dict[str, Any]:
+            request = {
+                "user_code": user_code,
+                "exercise": exercise,
+                "reference_code": reference_code,
+            }
+            return decode_result(client.grade(request))
+
+        return remote
+    if backend == "subinterpreters":
+        pool = SubinterpreterPool(workers)
+
+        def isolated(
+            user_code: str, exercise: dict[str, Any], reference_code: str | None
+        ) -> dict[str, Any]:
+            return decode_result(
+                pool.submit(user_code, exercise, reference_code).result()
+            )
+
+        return isolated
+    raise ValueError(f"Unknown backend: {backend!r}")
+
+
+@dataclass
+class ReplayReport:
+    seconds: list[float] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    mismatches: int = 0
+    skipped: int = 0
+
+    @property
+    def throughput(self) -> float:
+        return len(self.seconds) / self.wall_seconds if self.wall_seconds else 0.0
+
+
+def replay(
+    records: Iterable[dict[str, Any]],
+    grader: Grader,
+    packs: Mapping[str, Path] | None = None,
+    concurrency: int = 1,
+) -> ReplayReport:
+    """
+    Grade every journaled submission with ``grader``.
+
+    Args:
+        packs: Content pack directories by name; default: the installed
+            packs (app.data_loader.available_packs()).
+
+    Records for packs or exercises that are not there are counted as skipped.
+    """
+    packs = available_packs() if packs is None else packs
+    exercises: dict[str, dict[str, dict[str, Any]]] = {}
+    references: dict[tuple[str, str], str | None] = {}
+
+    def find(pack: str, exercise_id: str) -> dict[str, Any] | None:
+        if pack not in exercises:
+            path = packs.get(pack)
+            exercises[pack] = (
+                {ex["id"]: ex for ex in read_exercises(path)} if path else {}
+            )
+        return exercises[pack].get(exercise_id)
+
+    def reference_for(pack: str, exercise: dict[str, Any]) -> str | None:
+        if exercise.get("type") != "performance":
+            return None
+        key = (pack, exercise["id"])
+        if key not in references:
+            path = packs[pack] / "solutions" / f"{exercise['id']}.py"
+            references[key] = path.read_text(encoding="utf-8")
+        return references[key]
+
+    jobs = []
+    report = ReplayReport()
+    for record in records:
+        pack = record.get("pack", DEFAULT_PACK)
+        exercise = find(pack, record["exercise"])
+        if exercise is None:
+            report.skipped += 1
+            continue
+        jobs.append((record, exercise, reference_for(pack, exercise)))
+
+    lock = threading.Lock()
+
+    def run(job: tuple[dict[str, Any], dict[str, Any], str | None]) -> None:
+        record, exercise, reference = job
+        start = time.perf_counter()
+        result = grader(record["code"], exercise, reference)
+        elapsed = time.perf_counter() - start
+        with lock:
+            report.seconds.append(elapsed)
+            if result["success"] != record["success"]:
+                report.mismatches += 1
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(run, jobs))
+    else:
+        for job in jobs:
+            run(job)
+    report.wall_seconds = time.perf_counter() - start
+    return report
+
+
+def _print_report(backend: str, report: ReplayReport) -> None:
+    print(f"\nbackend={backend}  submissions={len(report.seconds)}")
+    if not report.seconds:
+        print("  nothing replayed")
+        return
+    latency = summarize(report.seconds)
+    print(f"  throughput      {report.throughput:.1f} submissions/s")
+    print(
+        "  grading latency "
+        + "  ".join(
+            f"{k}={format_seconds(latency[k])}" for k in ("p50", "p95", "p99", "max")
+        )
+    )
+    print(f"  outcome changes {report.mismatches}")
+    if report.skipped:
+        print(f"  skipped         {report.skipped} (pack or exercise not installed)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay a submission journal.")
+    parser.add_argument("journal", nargs="+", type=Path, help="segments or dirs")
+    parser.add_argument("--backend", default="local", help="comma-separated")
+    parser.add_argument("--url", help="grading service URL for --backend service")
+    parser.add_argument("--data", type=Path, help="core pack directory override")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=0, help="replay the first N")
+    args = parser.parse_args()
+
+    records = list(read_journal(args.journal))
+    if args.limit:
+        records = records[: args.limit]
+    packs = available_packs()
+    if args.data:
+        packs[DEFAULT_PACK] = args.data
+    for backend in (b for b in args.backend.split(",") if b):
+        grader = make_grader(backend, args.url, args.concurrency)
+        _print_report(backend, replay(records, grader, packs, args.concurrency))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+HebiKata - Benchmark Statistics Helpers
+
+Small, dependency-free helpers shared by the benchmark and load-test tools.
+"""
+
+import math
+from collections.abc import Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    Return the ``pct`` percentile of ``values`` using linear interpolation.
+
+    Args:
+        values: Samples in any order; must not be empty.
+        pct: Percentile in the range 0-100.
+    """
+    if not values:
+        raise ValueError("percentile() of empty sequence")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lo, hi = math.floor(rank), math.ceil(rank)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+def summarize(values: Sequence[float]) -> dict[str, float]:
+    """Return count, min, p50, p95, p99 and max of ``values``."""
+    return {
+        "count": len(values),
+        "min": min(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def format_seconds(seconds: float) -> str:
+    """Format a duration with a unit suited to its magnitude."""
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} µs"
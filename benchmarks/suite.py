@@ -0,0 +1,236 @@
+"""
+HebiKata - Benchmark Suite
+
+Times the engine, the exercise loader, progress serialization and the
+memoized render helpers at several curriculum sizes, and compares the
+results against saved baselines so regressions fail the run.
+
+Usage:
+    python -m benchmarks.suite                     # compare against baseline
+    python -m benchmarks.suite --save-baseline     # record a new baseline
+    python -m benchmarks.suite --scales 1,10 --filter engine
+
+Scales are multiples of the shipped 15-exercise curriculum; each scale gets
+a synthetic curriculum from ``benchmarks.curriculum``. Baselines are
+machine-specific: record them on the machine that runs the comparison.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import tempfile
+import timeit
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app import style
+from app.data_loader import read_exercises
+from app.engine import execute_code_with_tests
+from app.review import ReviewQueue
+from app.session import DEFAULT_LIVES, progress_snapshot
+from app.ui import _exercise_outline, _progress_panel_html, _stats_bar_html
+from benchmarks.curriculum import generate_curriculum
+from benchmarks.stats import format_seconds
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+BASE_CURRICULUM_SIZE = 15
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_TOLERANCE = 0.30
+
+Benchmark = tuple[str, Callable[[], object]]
+
+_TRIVIAL_CODE = "mana = 100"
+_TRIVIAL_TESTS = "def test_mana():\n    assert mana == 100"
+_HEAVY_CODE = (
+    "def checksum(n):\n"
+    "    total = 0\n"
+    "    for i in range(n):\n"
+    "        total = (total + i * i) % 1000003\n"
+    "    return total\n"
+    "result = checksum(200_000)\n"
+)
+_HEAVY_TESTS = "def test_checksum():\n    assert result == checksum(200_000)"
+_FAILING_TESTS = "def test_mana():\n    assert mana == 50, 'Expected 50 mana'"
+_RECURSION_CODE = "def dive(n):\n    return dive(n + 1)\n"
+_RECURSION_TESTS = "def test_dive():\n    dive(0)"
+# A submission-sized file: forty small functions.
+_STYLE_SOURCE = "\n\n".join(
+    f"def step_{i}(total, x):\n    if x == None:\n        return total\n"
+    f"    return total+x*{i}\n"
+    for i in range(40)
+)
+
+
+def engine_benchmarks() -> Iterator[Benchmark]:
+    yield "engine.trivial", lambda: execute_code_with_tests(
+        _TRIVIAL_CODE, _TRIVIAL_TESTS
+    )
+    yield "engine.heavy", lambda: execute_code_with_tests(_HEAVY_CODE, _HEAVY_TESTS)
+    yield "engine.heavy_traced", lambda: execute_code_with_tests(
+        _HEAVY_CODE, _HEAVY_TESTS, trace=True
+    )
+    yield "engine.failing", lambda: execute_code_with_tests(
+        _TRIVIAL_CODE, _FAILING_TESTS
+    )
+    yield "engine.recursion_error", lambda: execute_code_with_tests(
+        _RECURSION_CODE, _RECURSION_TESTS
+    )
+
+    def style_cold() -> object:
+        style.cache_clear()
+        return style.check_style(_STYLE_SOURCE)
+
+    edits = itertools.count()
+
+    yield "style.check_cold", style_cold
+    # A new trailing statement per run: only that statement is checked again.
+    yield "style.check_edited", lambda: style.check_style(
+        f"{_STYLE_SOURCE}\n\nresult = {next(edits)}\n"
+    )
+
+
+def scaled_benchmarks(data: Path, size: int) -> Iterator[Benchmark]:
+    exercises = read_exercises(data)
+    outline = _exercise_outline(exercises)
+    successes = tuple(i % 4 for i in range(size))
+    schedule = [[i, 2.5, 6.0, 2, 1_700_000_000.0 + i] for i in range(0, size, 2)]
+    state = SimpleNamespace(
+        learner_id="0" * 32,
+        exercises=exercises,
+        successes=list(successes),
+        attempts=[3] * size,
+        score=50 * size,
+        lives=DEFAULT_LIVES,
+        current_exercise_idx=size // 2,
+        hint_levels=[-1] * size,
+        review=ReviewQueue.from_list(schedule),
+    )
+    review = ReviewQueue.from_list(schedule)
+    reviewed = itertools.count()
+
+    def reschedule() -> object:
+        review.record(next(reviewed) % size, 4, now=1_700_000_000.0)
+        return review.next_due(now=1_700_000_000.0)
+
+    def serialize() -> object:
+        return json.loads(json.dumps(progress_snapshot()))
+
+    render_panel = _progress_panel_html.__wrapped__  # type: ignore[attr-defined]
+    render_stats = _stats_bar_html.__wrapped__  # type: ignore[attr-defined]
+
+    yield f"loader.read_exercises[{size}]", lambda: read_exercises(data)
+    # The generator stays suspended inside the patch while the caller times
+    # this benchmark, so the lookup cost of patching is not measured.
+    with patch("app.session.st.session_state", state, create=True):
+        yield f"session.serialize_progress[{size}]", serialize
+    yield f"review.reschedule[{size}]", reschedule
+    yield f"ui.progress_panel_uncached[{size}]", lambda: render_panel(
+        outline, successes, size // 2
+    )
+    yield f"ui.progress_panel_cached[{size}]", lambda: _progress_panel_html(
+        outline, successes, size // 2
+    )
+    yield f"ui.stats_bar_uncached[{size}]", lambda: render_stats(
+        DEFAULT_LIVES, 50 * size, size // 2, size, 1
+    )
+
+
+def time_benchmark(func: Callable[[], object], repeat: int) -> float:
+    """Return the best per-call time in seconds over ``repeat`` timed batches."""
+    timer = timeit.Timer(func)
+    number, _elapsed = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(scales: tuple[int, ...], name_filter: str, repeat: int) -> dict[str, float]:
+    results: dict[str, float] = {}
+
+    def measure(benchmarks: Iterator[Benchmark]) -> None:
+        for name, func in benchmarks:
+            if name_filter not in name:
+                continue
+            results[name] = time_benchmark(func, repeat)
+            print(f"  {name:<42} {format_seconds(results[name]):>12}")
+
+    measure(engine_benchmarks())
+    with tempfile.TemporaryDirectory(prefix="hebikata-bench-") as tmp:
+        for scale in scales:
+            size = BASE_CURRICULUM_SIZE * scale
+            data = Path(tmp) / f"x{scale}"
+            generate_curriculum(data, size)
+            measure(scaled_benchmarks(data, size))
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> list[str]:
+    """
+    Compare results with a baseline.
+
+    Returns:
+        Names of benchmarks slower than ``baseline * (1 + tolerance)``.
+        Benchmarks missing from either side are ignored.
+    """
+    return [
+        name
+        for name, seconds in results.items()
+        if name in baseline and seconds > baseline[name] * (1 + tolerance)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the HebiKata benchmarks.")
+    parser.add_argument(
+        "--scales",
+        default=",".join(map(str, DEFAULT_SCALES)),
+        help="comma-separated multiples of the 15-exercise curriculum",
+    )
+    parser.add_argument("--filter", default="", help="only run matching names")
+    parser.add_argument("--repeat", type=int, default=5, help="timed batches")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="write results as baseline"
+    )
+    args = parser.parse_args()
+
+    scales = tuple(int(s) for s in args.scales.split(",") if s)
+    results = run(scales, args.filter, args.repeat)
+
+    if args.save_baseline:
+        baseline = (
+            json.loads(args.baseline.read_text(encoding="utf-8"))
+            if args.baseline.is_file()
+            else {}
+        )
+        baseline.update({name: float(f"{t:.4g}") for name, t in results.items()})
+        args.baseline.write_text(
+            json.dumps(dict(sorted(baseline.items())), indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    if not args.baseline.is_file():
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline, args.tolerance)
+    for name in regressions:
+        print(
+            f"REGRESSION {name}: {format_seconds(results[name])} "
+            f"vs baseline {format_seconds(baseline[name])}"
+        )
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.tolerance:.0%} of baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
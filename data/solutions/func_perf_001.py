@@ -0,0 +1,5 @@
+def count_unique(enemy_ids):
+    seen = set()
+    for enemy_id in enemy_ids:
+        seen.add(enemy_id)
+    return len(seen)
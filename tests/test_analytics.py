@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from app import analytics
+from app.analytics import SCORE_BUCKET, AnalyticsStore
+
+
+def _snapshot(attempts, successes, hint_levels, score=0, ids=None):
+    return {
+        "exercise_ids": ids or [f"e{i}" for i in range(len(successes))],
+        "attempts": attempts,
+        "successes": successes,
+        "hint_levels": hint_levels,
+        "score": score,
+    }
+
+
+@pytest.fixture(params=["numpy", "python"])
+def store(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(analytics, "np", None)
+    return AnalyticsStore(mastery_threshold=3)
+
+
+class TestIngest:
+    def test_rejects_lists_that_do_not_match_the_ids(self, store):
+        assert store.ingest("a", None, _snapshot([1, 0], [1, 0], [-1, -1]))
+        assert not store.ingest("b", None, _snapshot([1], [1], [-1], ids=["e0", "e1"]))
+        assert not store.ingest(
+            "c", None, {**_snapshot([1], [1], [-1]), "exercise_ids": None}
+        )
+        assert len(store) == 1
+        assert store.rejected == 2
+
+    def test_columns_follow_exercise_ids_across_content_changes(self, store):
+        store.ingest("a", None, _snapshot([4, 2], [3, 1], [-1, 0], ids=["x", "y"]))
+        # The pack gained "z" before "y" and lost "x".
+        store.ingest("b", None, _snapshot([1, 5], [0, 3], [0, -1], ids=["z", "y"]))
+        summary = store.summary()
+        assert summary.exercise_ids == ["x", "y", "z"]
+        assert summary.attempts == [4, 7, 1]
+        assert summary.median_attempts_to_mastery == [4.0, 5.0, None]
+        store.ingest("a", None, _snapshot([1, 2], [0, 1], [-1, 0], ids=["z", "y"]))
+        assert store.summary().attempts == [0, 7, 2]
+
+    def test_reingest_replaces_row(self, store):
+        store.ingest("a", None, _snapshot([1, 0], [0, 0], [-1, -1]))
+        store.ingest("a", None, _snapshot([4, 0], [3, 0], [-1, -1], score=150))
+        summary = store.summary()
+        assert summary.learners == 1
+        assert summary.attempts == [4, 0]
+        assert summary.median_attempts_to_mastery == [4.0, None]
+
+    def test_attempts_to_mastery_is_kept_after_mastery(self, store):
+        store.ingest("a", None, _snapshot([3], [3], [-1]))
+        store.ingest("a", None, _snapshot([7], [6], [-1]))
+        assert store.summary().median_attempts_to_mastery == [3.0]
+
+
+class TestSummary:
+    def test_aggregates(self, store):
+        store.ingest("a", "py101", _snapshot([4, 2], [3, 0], [0, -1], score=150))
+        store.ingest("b", "py101", _snapshot([6, 0], [3, 0], [-1, -1], score=160))
+        store.ingest("c", None, _snapshot([2, 0], [1, 0], [2, -1], score=40))
+        summary = store.summary()
+        assert summary.learners == 3
+        assert summary.attempts == [12, 2]
+        assert summary.failure_rate == pytest.approx([5 / 12, 1.0])
+        assert summary.median_attempts_to_mastery == [5.0, None]
+        assert summary.hint_usage == pytest.approx([2 / 3, 0.0])
+        assert summary.score_histogram == [(0, 1), (150, 2)]
+
+    def test_classroom_filter(self, store):
+        store.ingest("a", "py101", _snapshot([4], [3], [-1], score=150))
+        store.ingest("b", None, _snapshot([1], [0], [-1]))
+        assert store.classrooms() == ["py101"]
+        assert store.summary("py101").learners == 1
+        assert store.summary("py101").failure_rate == pytest.approx([0.25])
+        assert store.summary("nope").learners == 0
+
+    def test_summary_is_cached_until_ingest(self, store):
+        store.ingest("a", None, _snapshot([1], [1], [-1]))
+        first = store.summary()
+        assert store.summary() is first
+        store.ingest("b", None, _snapshot([1], [1], [-1]))
+        assert store.summary() is not first
+
+    def test_empty_store(self, store):
+        assert store.summary().learners == 0
+
+
+class TestBackendsAgree:
+    def test_numpy_matches_python(self, monkeypatch):
+        if analytics.np is None:
+            pytest.skip("numpy not installed")
+        rng = random.Random(3)
+        store = AnalyticsStore(mastery_threshold=3)
+        for learner in range(200):
+            successes = [rng.randrange(5) for _ in range(12)]
+            store.ingest(
+                f"l{learner}",
+                rng.choice([None, "a", "b"]),
+                _snapshot(
+                    [s + rng.randrange(4) for s in successes],
+                    successes,
+                    [rng.randrange(-1, 3) for _ in range(12)],
+                    score=rng.randrange(0, 20) * SCORE_BUCKET,
+                ),
+            )
+        vectorized = store.summary("a")
+        monkeypatch.setattr(analytics, "np", None)
+        store._cache.clear()
+        assert store.summary("a") == vectorized
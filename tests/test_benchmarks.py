@@ -0,0 +1,88 @@
+import itertools
+import json
+
+from app.data_loader import read_exercises
+from app.engine import execute_code_with_tests
+from benchmarks.backends import cpu_jobs, curriculum_jobs, run_backend
+from benchmarks.curriculum import MAX_CHAPTERS, generate_curriculum
+from benchmarks.replay import make_grader, replay
+from benchmarks.stats import percentile
+from benchmarks.suite import (
+    BASE_CURRICULUM_SIZE,
+    BASELINE_PATH,
+    compare,
+    engine_benchmarks,
+    scaled_benchmarks,
+)
+
+
+class TestCurriculumGenerator:
+    def test_generated_curriculum_loads_in_order(self, tmp_path):
+        refs = generate_curriculum(tmp_path, 30)
+        exercises = read_exercises(tmp_path)
+        assert [ex["id"] for ex in exercises] == refs
+        chapters = {ex["metadata"]["chapter"] for ex in exercises}
+        assert chapters == set(range(1, MAX_CHAPTERS + 1))
+
+    def test_generated_solutions_pass_and_initial_code_fails(self, tmp_path):
+        generate_curriculum(tmp_path, 6)
+        for ex in read_exercises(tmp_path):
+            tests = ex["validation"]["tests"]
+            solution = (tmp_path / "solutions" / f"{ex['id']}.py").read_text(
+                encoding="utf-8"
+            )
+            assert execute_code_with_tests(solution, tests)["success"] is True
+            initial = ex["content"]["initial_code"]
+            assert execute_code_with_tests(initial, tests)["success"] is False
+
+
+class TestSuite:
+    def test_every_benchmark_runs_at_scale_1(self, tmp_path):
+        generate_curriculum(tmp_path, BASE_CURRICULUM_SIZE)
+        baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+        for name, func in itertools.chain(
+            engine_benchmarks(), scaled_benchmarks(tmp_path, BASE_CURRICULUM_SIZE)
+        ):
+            func()
+            assert name in baseline
+
+
+class TestBaselineComparison:
+    def test_flags_only_results_beyond_tolerance(self):
+        baseline = {"a": 1.0, "b": 1.0, "c": 1.0}
+        results = {"a": 1.2, "b": 1.5, "new": 9.0}
+        assert compare(results, baseline, tolerance=0.3) == ["b"]
+
+    def test_percentile_interpolates(self):
+        assert percentile([1, 2, 3, 4], 50) == 2.5
+        assert percentile([5], 99) == 5
+
+
+class TestJournalReplay:
+    def test_replays_recorded_submissions(self, tmp_path):
+        generate_curriculum(tmp_path, 3)
+        exercise = read_exercises(tmp_path)[0]
+        solution = (tmp_path / "solutions" / f"{exercise['id']}.py").read_text(
+            encoding="utf-8"
+        )
+        records = [
+            {"exercise": exercise["id"], "code": solution, "success": True},
+            {"pack": "extra", "exercise": exercise["id"], "code": "", "success": True},
+            {"exercise": "missing_001", "code": "", "success": False},
+            {"pack": "gone", "exercise": exercise["id"], "code": "", "success": True},
+        ]
+        packs = {"core": tmp_path, "extra": tmp_path}
+        report = replay(records, make_grader("local"), packs, concurrency=2)
+        assert len(report.seconds) == 2
+        assert report.mismatches == 1
+        assert report.skipped == 2
+        assert report.throughput > 0
+
+
+class TestBackendComparison:
+    def test_jobs_pass_on_the_in_process_backend(self, tmp_path):
+        generate_curriculum(tmp_path, 3)
+        jobs = curriculum_jobs(tmp_path) + cpu_jobs(100)
+        report = run_backend("inprocess", jobs, workers=2)
+        assert len(report.seconds) == 4
+        assert report.failures == 0
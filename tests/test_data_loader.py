@@ -0,0 +1,147 @@
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import pytest
+
+from app import data_loader, metrics
+from app.data_loader import PackCache, available_packs, load_pack
+
+_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+_TESTS = "def test_mana():\n    assert mana == 100\n"
+
+
+def _write_pack(root: Path, name: str, refs: list[str]) -> Path:
+    pack = root / name
+    (pack / "exercises").mkdir(parents=True)
+    (pack / "solutions").mkdir()
+    (pack / "index.yaml").write_text(
+        "exercises:\n" + "".join(f"  - ref: {ref}\n" for ref in refs),
+        encoding="utf-8",
+    )
+    for ref in refs:
+        (pack / "exercises" / f"{ref}.yaml").write_text(
+            f"id: {ref}\nvalidation:\n  tests: |\n"
+            + "".join(f"    {line}\n" for line in _TESTS.splitlines()),
+            encoding="utf-8",
+        )
+        (pack / "solutions" / f"{ref}.py").write_text("mana = 100\n")
+    return pack
+
+
+class TestAvailablePacks:
+    def test_core_is_always_first(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(data_loader.PACKS_DIR_ENV, str(tmp_path / "missing"))
+        assert list(available_packs()) == ["core"]
+        assert available_packs()["core"] == _DATA_DIR
+
+    def test_lists_pack_directories_with_an_index(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(data_loader.PACKS_DIR_ENV, str(tmp_path))
+        _write_pack(tmp_path, "advanced", ["a_001"])
+        (tmp_path / "no_index").mkdir()
+        _write_pack(tmp_path, "bad name", ["b_001"])
+        assert list(available_packs()) == ["core", "advanced"]
+
+    def test_unknown_pack_raises(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(data_loader.PACKS_DIR_ENV, str(tmp_path))
+        with pytest.raises(KeyError):
+            load_pack("nope")
+
+
+class TestPackCache:
+    def test_loads_exercises_solutions_and_tests(self, tmp_path):
+        pack = _write_pack(tmp_path, "p", ["a_001", "a_002"])
+        content = PackCache().get(pack)
+        assert [ex["id"] for ex in content.exercises] == ["a_001", "a_002"]
+        assert content.solutions["a_001"] == "mana = 100\n"
+        namespace = {"mana": 100}
+        exec(content.compiled_tests[_TESTS], namespace)
+        namespace["test_mana"]()
+
+    def test_hit_reuses_content(self, tmp_path):
+        pack = _write_pack(tmp_path, "p", ["a_001"])
+        cache = PackCache()
+        loads = metrics.EXERCISE_LOADS.value()
+        assert cache.get(pack) is cache.get(pack)
+        assert metrics.EXERCISE_LOADS.value() == loads + 1
+
+    def test_identical_packs_share_an_entry(self, tmp_path):
+        first = _write_pack(tmp_path, "p", ["a_001"])
+        second = tmp_path / "copy"
+        shutil.copytree(first, second)
+        cache = PackCache()
+        assert cache.get(first) is cache.get(second)
+        assert len(cache) == 1
+
+    def test_edited_pack_is_reloaded(self, tmp_path):
+        pack = _write_pack(tmp_path, "p", ["a_001"])
+        cache = PackCache()
+        before = cache.get(pack)
+        solution = pack / "solutions" / "a_001.py"
+        solution.write_text("mana = 99\n")
+        stat = solution.stat()
+        os.utime(solution, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        after = cache.get(pack)
+        assert after is not before
+        assert after.content_hash != before.content_hash
+        assert after.solutions["a_001"] == "mana = 99\n"
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        packs = [_write_pack(tmp_path, f"p{i}", [f"a_00{i}"]) for i in range(3)]
+        cache = PackCache(max_packs=2)
+        evictions = metrics.PACK_EVICTIONS.value()
+        first = cache.get(packs[0])
+        cache.get(packs[1])
+        cache.get(packs[0])  # p1 is now the least recently used
+        cache.get(packs[2])
+        assert len(cache) == 2
+        assert metrics.PACK_EVICTIONS.value() == evictions + 1
+        assert cache.get(packs[0]) is first
+
+    def test_compiled_tests_lookup(self, tmp_path):
+        cache = PackCache()
+        assert cache.compiled_tests(_TESTS) is None
+        content = cache.get(_write_pack(tmp_path, "p", ["a_001"]))
+        assert cache.compiled_tests(_TESTS) is content.compiled_tests[_TESTS]
+
+    def test_slow_load_does_not_block_other_packs(self, tmp_path, monkeypatch):
+        slow, fast = (_write_pack(tmp_path, name, ["a_001"]) for name in "sf")
+        (fast / "solutions" / "a_001.py").write_text("mana = 99\n")
+        cache = PackCache()
+        cache.get(fast)
+        started, release = threading.Event(), threading.Event()
+        real_load = data_loader._load_pack
+
+        def blocking_load(path, content_hash):
+            started.set()
+            release.wait(5)
+            return real_load(path, content_hash)
+
+        monkeypatch.setattr(data_loader, "_load_pack", blocking_load)
+        loader = threading.Thread(target=cache.get, args=(slow,))
+        loader.start()
+        try:
+            assert started.wait(5)
+            assert cache.get(fast).solutions["a_001"] == "mana = 99\n"
+        finally:
+            release.set()
+            loader.join()
+        assert len(cache) == 2
+
+
+class TestCorePack:
+    def test_core_pack_matches_data_dir(self, exercise_refs):
+        exercises = data_loader.load_exercises()
+        assert [ex["id"] for ex in exercises] == exercise_refs
+        assert data_loader.load_exercises() is exercises
+
+    def test_every_core_test_is_precompiled(self, exercises):
+        data_loader.load_exercises()
+        for ex in exercises:
+            assert data_loader.compiled_tests(ex["validation"]["tests"]) is not None
+
+    def test_missing_reference_solution(self):
+        with pytest.raises(FileNotFoundError):
+            data_loader.load_reference_solution("no_such_exercise")
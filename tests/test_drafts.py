@@ -0,0 +1,64 @@
+from app.drafts import DraftStore, decode, encode
+
+
+class TestEncoding:
+    def test_round_trip(self):
+        code = "print('hi')\nx = \"\\\\\"  # ✨\n"
+        data = encode(code)
+        assert decode(data) == code
+        assert not set(data) & set("'\"\\\n")
+
+
+class TestDraftStore:
+    def test_put_and_get(self):
+        store = DraftStore()
+        store.put("ex_1", "x = 2", "x = 1")
+        assert store.get("ex_1") == "x = 2"
+        assert store.get("ex_2") is None
+        assert store.dirty
+
+    def test_initial_code_discards_draft(self):
+        store = DraftStore()
+        store.put("ex_1", "x = 2", "x = 1")
+        store.put("ex_1", "x = 1", "x = 1")
+        assert "ex_1" not in store
+
+    def test_round_trips_through_storage(self):
+        store = DraftStore()
+        store.put("ex_1", "x = 2", "x = 1", now=10)
+        store.put("ex_2", "y = 3", "y = 1", now=20)
+        restored = DraftStore.loads(store.dumps())
+        assert restored.get("ex_1") == "x = 2"
+        assert restored.get("ex_2") == "y = 3"
+        assert not restored.dirty
+
+    def test_evicts_oldest_over_budget(self):
+        store = DraftStore(budget_chars=200)
+        for i in range(10):
+            store.put(f"ex_{i}", f"value = {i}", "", now=i)
+        assert 0 < len(store) < 10
+        assert "ex_9" in store and "ex_0" not in store
+        assert len(store.dumps()) <= 200
+
+    def test_edit_refreshes_recency(self):
+        two = DraftStore()
+        two.put("ex_0", "a = 10", "", now=2)
+        two.put("ex_2", "c = 2", "", now=3)
+        store = DraftStore(budget_chars=len(two.dumps()))
+        store.put("ex_0", "a = 0", "", now=0)
+        store.put("ex_1", "b = 1", "", now=1)
+        store.put("ex_0", "a = 10", "", now=2)
+        store.put("ex_2", "c = 2", "", now=3)
+        assert "ex_0" in store and "ex_1" not in store
+
+    def test_oversized_draft_is_not_kept(self):
+        store = DraftStore(budget_chars=64)
+        store.put("ex_1", "import os\n" * 1000 + "".join(map(str, range(500))), "")
+        assert "ex_1" not in store
+
+    def test_loads_tolerates_corrupt_input(self):
+        assert len(DraftStore.loads("{bad")) == 0
+        assert len(DraftStore.loads("[1, 2]")) == 0
+        good = encode("x = 1")
+        store = DraftStore.loads(f'{{"a": [1, "!!"], "b": [2, "{good}"], "c": 3}}')
+        assert store.get("b") == "x = 1" and len(store) == 1
@@ -0,0 +1,26 @@
+from array import array
+
+from app.effects import MAX_TRACE_POINTS, effect_event
+from app.tracing import ExecutionTrace
+
+
+class TestEffectEvent:
+    def test_outcome_kinds(self):
+        assert effect_event({"success": True}, 1, 10, False)["kind"] == "pass"
+        assert effect_event({"success": True}, 1, 10, True)["kind"] == "mastery"
+        assert effect_event({"success": False}, 1, 10, False)["kind"] == "fail"
+
+    def test_payload_is_compact(self):
+        event = effect_event({"success": True, "message": "x" * 1000}, 3, 16, False)
+        assert set(event) == {"id", "kind", "progress", "trace"}
+        assert event["progress"] == [3, 16]
+        assert event["trace"] is None
+
+    def test_each_event_has_a_new_id(self):
+        first = effect_event({"success": True}, 0, 1, False)
+        assert first["id"] != effect_event({"success": True}, 0, 1, False)["id"]
+
+    def test_trace_lines_are_capped(self):
+        trace = ExecutionTrace(lines=array("I", range(1, 1000)))
+        event = effect_event({"success": True, "trace": trace}, 0, 1, False)
+        assert event["trace"] == list(range(1, MAX_TRACE_POINTS + 1))
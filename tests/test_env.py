@@ -0,0 +1,36 @@
+import pytest
+
+from app.env import env_flag, env_float, env_int
+
+_NAME = "HEBIKATA_TEST_SETTING"
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [(None, 2.5), ("", 2.5), ("  ", 2.5), ("x", 2.5), ("nan", 2.5), ("4", 4.0)],
+)
+def test_float_falls_back_to_default(monkeypatch, raw, expected):
+    if raw is None:
+        monkeypatch.delenv(_NAME, raising=False)
+    else:
+        monkeypatch.setenv(_NAME, raw)
+    assert env_float(_NAME, 2.5) == expected
+
+
+def test_minimum_clamps_values_not_defaults(monkeypatch):
+    monkeypatch.setenv(_NAME, "-3")
+    assert env_float(_NAME, 2.5, minimum=1.0) == 1.0
+    assert env_int(_NAME, 4, minimum=0) == 0
+    monkeypatch.setenv(_NAME, "")
+    assert env_int(_NAME, -1, minimum=0) == -1
+
+
+def test_int_rejects_fractions(monkeypatch):
+    monkeypatch.setenv(_NAME, "2.5")
+    assert env_int(_NAME, 4) == 4
+
+
+@pytest.mark.parametrize(("raw", "expected"), [("1", True), ("On", True), ("0", False)])
+def test_flag(monkeypatch, raw, expected):
+    monkeypatch.setenv(_NAME, raw)
+    assert env_flag(_NAME) is expected
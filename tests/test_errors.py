@@ -0,0 +1,53 @@
+import sys
+
+from app.engine import execute_code_with_tests
+from app.errors import MAX_FRAMES, MAX_SUMMARY_CHARS, ErrorReport
+
+
+def _report(user_code: str, test_code: str) -> ErrorReport:
+    result = execute_code_with_tests(user_code, test_code)
+    assert result["success"] is False
+    assert isinstance(result["error"], ErrorReport)
+    return result["error"]
+
+
+class TestErrorReport:
+    def test_engine_frames_are_hidden(self):
+        report = _report("x = 1 / 0", "def test_x():\n    pass")
+        text = str(report)
+        assert "engine.py" not in text
+        assert text.startswith("Traceback (most recent call last):")
+        assert text.endswith("ZeroDivisionError: division by zero\n")
+
+    def test_recursion_is_collapsed_and_capped(self):
+        report = _report(
+            "def dive(n):\n    return dive(n + 1)\n", "def test_dive():\n    dive(0)"
+        )
+        assert report.exc_type == "RecursionError"
+        assert len(report.frames) <= MAX_FRAMES
+        text = str(report)
+        assert "Previous line repeated" in text
+        assert text.count("\n") < 30
+
+    def test_mutual_recursion_is_capped(self):
+        report = _report(
+            "def ping(n):\n    return pong(n)\ndef pong(n):\n    return ping(n)\n",
+            "def test_ping():\n    ping(0)",
+        )
+        assert len(report.frames) == MAX_FRAMES
+        assert report.omitted > sys.getrecursionlimit() // 2
+        assert f"[... {report.omitted} more frames ...]" in str(report)
+
+    def test_long_messages_are_truncated(self):
+        report = _report("raise ValueError('x' * 100_000)", "def test_x():\n    pass")
+        assert len(report.summary) < MAX_SUMMARY_CHARS + 50
+        assert "(truncated)" in report.summary
+
+    def test_syntax_error_has_no_frames(self):
+        report = _report("mana = ", "def test_mana():\n    pass")
+        assert report.frames == ()
+        assert str(report).startswith('  File "<string>", line 1')
+
+    def test_report_holds_no_traceback_objects(self):
+        report = _report("x = 1 / 0", "def test_x():\n    pass")
+        assert all(isinstance(v, str | int) for f in report.frames for v in f)
@@ -45,7 +45,7 @@ class TestFailedExecution:
             "mana = ", "def test_mana():\n    assert mana == 100"
         )
         assert result["success"] is False
-        assert "SyntaxError" in result.get("error", "")
+        assert "SyntaxError" in str(result["error"])
 
 
 class TestEdgeCases:
@@ -64,3 +64,29 @@ class TestEdgeCases:
             "def test_a():\n    assert x == 1\ndef test_b():\n    assert x == 2",
         )
         assert result["success"] is False
+
+
+class TestImports:
+    def test_allowed_stdlib_import(self):
+        result = execute_code_with_tests(
+            "from math import isqrt\nroot = isqrt(81)",
+            "def test_root():\n    assert root == 9",
+        )
+        assert result["success"] is True
+
+    def test_disallowed_import_is_reported(self):
+        result = execute_code_with_tests("import os", "def test_a():\n    pass")
+        assert result["message"] == "❌ Error: ImportError"
+        assert "'os' is not allowed" in str(result["error"])
+        assert "imports.py" not in str(result["error"])
+
+    def test_dataclass_definition(self):
+        result = execute_code_with_tests(
+            "from dataclasses import dataclass\n"
+            "@dataclass\n"
+            "class Hero:\n"
+            "    name: str\n"
+            "    hp: int = 10",
+            "def test_hero():\n    assert Hero('Ryu').hp == 10",
+        )
+        assert result["success"] is True
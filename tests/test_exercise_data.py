@@ -1,3 +1,5 @@
+from app.imports import SAFE_MODULES
+
 REQUIRED_TOP_KEYS = {
     "id",
     "metadata",
@@ -18,6 +20,7 @@ REQUIRED_METADATA_KEYS = {
 }
 REQUIRED_CONTENT_KEYS = {"prompt", "initial_code"}
 REQUIRED_VALIDATION_KEYS = {"tests"}
+REQUIRED_PERFORMANCE_KEYS = {"entrypoint", "input", "size", "budget"}
 
 
 class TestExerciseData:
@@ -44,6 +47,21 @@ class TestExerciseData:
             missing = REQUIRED_VALIDATION_KEYS - set(validation.keys())
             assert not missing, f"{ex['id']} missing validation keys: {missing}"
 
+    def test_validation_imports_are_safe_modules(self, exercises):
+        for ex in exercises:
+            imports = ex["validation"].get("imports", [])
+            unknown = set(imports) - SAFE_MODULES
+            assert not unknown, f"{ex['id']} imports unvetted modules: {unknown}"
+
+    def test_validation_modules_map_names_to_source(self, exercises):
+        for ex in exercises:
+            modules = ex["validation"].get("modules", {})
+            assert isinstance(modules, dict), f"{ex['id']} modules must be a mapping"
+            for name, source in modules.items():
+                assert name.isidentifier() and isinstance(
+                    source, str
+                ), f"{ex['id']} has an invalid helper module {name!r}"
+
     def test_hints_is_nonempty_list(self, exercises):
         for ex in exercises:
             hints = ex.get("hints", [])
@@ -80,3 +98,19 @@ class TestExerciseData:
             assert all(
                 isinstance(t, str) for t in tags
             ), f"{ex['id']} tags must be strings"
+
+    def test_type_is_valid(self, exercises):
+        for ex in exercises:
+            assert ex.get("type", "standard") in {
+                "standard",
+                "performance",
+            }, f"{ex['id']} invalid type"
+
+    def test_performance_katas_have_performance_block(self, exercises):
+        for ex in exercises:
+            if ex.get("type") != "performance":
+                continue
+            block = ex.get("performance", {})
+            missing = REQUIRED_PERFORMANCE_KEYS - set(block.keys())
+            assert not missing, f"{ex['id']} missing performance keys: {missing}"
+            assert block["budget"] > 1, f"{ex['id']} budget must exceed 1"
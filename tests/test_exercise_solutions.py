@@ -8,9 +8,14 @@ class TestExerciseSolutions:
         for ref in exercise_refs:
             exercise = exercise_dict[ref]
             solution_code = solutions[ref]
-            test_code = exercise["validation"]["tests"]
+            validation = exercise["validation"]
 
-            result = execute_code_with_tests(solution_code, test_code)
+            result = execute_code_with_tests(
+                solution_code,
+                validation["tests"],
+                imports=validation.get("imports"),
+                modules=validation.get("modules"),
+            )
             assert result["success"] is True, (
                 f"{ref} solution failed its own tests:\n"
                 f"  Solution: {solution_code.strip()}\n"
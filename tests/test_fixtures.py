@@ -0,0 +1,163 @@
+import array
+import contextlib
+import json
+import os
+import subprocess
+import sys
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import pytest
+
+from app import fixtures
+from app.data_loader import read_exercises
+from app.engine import execute_code_with_tests
+from app.fixtures import fixture_views, resolve_fixtures
+
+_SPECTRUM = array.array("d", [0.5, 1.5, 2.5, 3.5])
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+_ATTACH = """
+import json, sys
+from app.fixtures import fixture_views
+print(bytes(fixture_views(json.loads(sys.argv[1]))["words"]).decode())
+"""
+
+
+def _unlink(key: str) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        shared_memory.SharedMemory(f"hk_{key}").unlink()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_segments():
+    fixtures._views.clear()
+    fixtures._view_keys.clear()
+    yield
+    for key in list(fixtures._views):
+        _unlink(key)
+    fixtures._views.clear()
+    fixtures._view_keys.clear()
+
+
+@pytest.fixture
+def pack(tmp_path):
+    (tmp_path / "fixtures").mkdir()
+    (tmp_path / "fixtures" / "spectrum.f64").write_bytes(_SPECTRUM.tobytes())
+    (tmp_path / "fixtures" / "words.txt").write_bytes(b"kata\nsensei\n")
+    return tmp_path
+
+
+class TestResolve:
+    def test_shorthand_and_format(self, pack):
+        resolved = resolve_fixtures(
+            pack,
+            {"words": "words.txt", "spectrum": {"file": "spectrum.f64", "format": "d"}},
+        )
+        assert resolved["words"]["format"] == "B"
+        assert resolved["spectrum"]["size"] == 32
+        assert resolved["words"]["key"] != resolved["spectrum"]["key"]
+
+    @pytest.mark.parametrize(
+        "declared",
+        [
+            {"class": "words.txt"},
+            {"not-a-name": "words.txt"},
+            {"words": {"file": "words.txt", "format": "s"}},
+            {"words": "../outside.txt"},
+            {"words": {"file": "words.txt", "format": "d"}},  # 12 bytes
+        ],
+    )
+    def test_invalid_declarations(self, pack, declared):
+        (pack / "outside.txt").write_text("x")
+        with pytest.raises(ValueError):
+            resolve_fixtures(pack, declared)
+
+    def test_missing_file(self, pack):
+        with pytest.raises(FileNotFoundError):
+            resolve_fixtures(pack, {"words": "missing.txt"})
+
+
+class TestViews:
+    def test_views_are_read_only_and_typed(self, pack):
+        resolved = resolve_fixtures(
+            pack, {"spectrum": {"file": "spectrum.f64", "format": "d"}}
+        )
+        spectrum = fixture_views(resolved)["spectrum"]
+        assert spectrum.readonly
+        assert spectrum.tolist() == _SPECTRUM.tolist()
+        with pytest.raises(TypeError):
+            spectrum[0] = 9.0
+
+    def test_runs_share_one_mapping(self, pack):
+        resolved = resolve_fixtures(pack, {"words": "words.txt"})
+        first = fixture_views(resolved)["words"]
+        second = fixture_views(resolved)["words"]
+        assert first is not second
+        assert first.obj is second.obj
+        first.release()
+        assert bytes(second) == b"kata\nsensei\n"
+
+    def test_edited_fixture_replaces_old_mapping(self, pack):
+        first = resolve_fixtures(pack, {"words": "words.txt"})
+        old = fixture_views(first)["words"]
+        words = pack / "fixtures" / "words.txt"
+        words.write_bytes(b"kata\nsensei\ndojo\n")
+        os.utime(words, ns=(0, 0))
+        second = resolve_fixtures(pack, {"words": "words.txt"})
+        assert bytes(fixture_views(second)["words"]).endswith(b"dojo\n")
+        assert list(fixtures._views) == [second["words"]["key"]]
+        assert bytes(old) == b"kata\nsensei\n"
+        _unlink(first["words"]["key"])
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX segment lifetime")
+    def test_attaching_process_leaves_segment_in_place(self, pack):
+        resolved = resolve_fixtures(pack, {"words": "words.txt"})
+        fixture_views(resolved)
+        done = subprocess.run(
+            [sys.executable, "-c", _ATTACH, json.dumps(resolved)],
+            cwd=_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert done.stdout == "kata\nsensei\n\n"
+        assert "leaked" not in done.stderr
+        segment = shared_memory.SharedMemory(f"hk_{resolved['words']['key']}")
+        segment.close()
+
+    def test_falls_back_to_mapping_the_file(self, pack, monkeypatch):
+        def unavailable(*args, **kwargs):
+            raise OSError("no /dev/shm")
+
+        monkeypatch.setattr(fixtures.shared_memory, "SharedMemory", unavailable)
+        resolved = resolve_fixtures(pack, {"words": "words.txt"})
+        words = fixture_views(resolved)["words"]
+        assert words.readonly
+        assert bytes(words) == b"kata\nsensei\n"
+
+    def test_empty_file(self, pack):
+        (pack / "fixtures" / "empty.bin").write_bytes(b"")
+        resolved = resolve_fixtures(pack, {"empty": "empty.bin"})
+        assert len(fixture_views(resolved)["empty"]) == 0
+
+
+def test_exercises_see_fixtures_as_globals(pack):
+    (pack / "exercises").mkdir()
+    (pack / "index.yaml").write_text("exercises:\n  - ref: a_001\n")
+    (pack / "exercises" / "a_001.yaml").write_text(
+        "id: a_001\n"
+        "validation:\n"
+        "  tests: |\n"
+        "    def test_peak():\n"
+        "        assert peak == 3.5\n"
+        "  fixtures:\n"
+        "    spectrum: {file: spectrum.f64, format: d}\n"
+    )
+    (exercise,) = read_exercises(pack)
+    validation = exercise["validation"]
+    result = execute_code_with_tests(
+        "peak = max(spectrum)", validation["tests"], fixtures=validation["fixtures"]
+    )
+    assert result["success"], result
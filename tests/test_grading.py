@@ -0,0 +1,175 @@
+import http.client
+import http.server
+import json
+import threading
+
+import pytest
+
+from app import grading, grading_client, subinterp
+from app.errors import ErrorReport
+from app.grading_client import GraderUnavailableError, GradingClient
+from app.grading_service import GradingServer
+
+_EXERCISE = {
+    "id": "demo",
+    "validation": {"tests": "def test_mana():\n    assert mana == 100, 'Need 100'"},
+    "hints": ["not sent to the service"],
+}
+
+
+@pytest.fixture(scope="module")
+def service():
+    server = GradingServer(("127.0.0.1", 0), workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestCodec:
+    def test_error_report_round_trips_through_json(self):
+        result = grading.grade_locally("mana = 1 / 0", _EXERCISE)
+        wire = json.loads(json.dumps(grading.encode_result(result)))
+        decoded = grading.decode_result(wire)
+        assert isinstance(decoded["error"], ErrorReport)
+        assert str(decoded["error"]) == str(result["error"])
+
+    def test_plain_results_pass_through(self):
+        result = grading.grade_locally("mana = 100", _EXERCISE)
+        assert grading.decode_result(grading.encode_result(result)) == result
+
+
+class TestGradingService:
+    def test_grades_remotely_and_reuses_connections(self, service):
+        client = GradingClient(service, pool_size=1)
+        passed = client.grade({"user_code": "mana = 100", "exercise": _EXERCISE})
+        conn = client._idle.queue[0]
+        failed = client.grade({"user_code": "mana = 5", "exercise": _EXERCISE})
+        assert passed["success"] is True
+        assert failed["success"] is False and "Need 100" in failed["message"]
+        assert client._idle.queue == [conn]
+
+    def test_exceptions_come_back_as_reports(self, service):
+        client = GradingClient(service)
+        data = client.grade({"user_code": "mana = 1 / 0", "exercise": _EXERCISE})
+        report = grading.decode_result(data)["error"]
+        assert report.exc_type == "ZeroDivisionError"
+
+    def test_bad_request_and_health(self, service):
+        host, port = service.removeprefix("http://").split(":")
+        conn = http.client.HTTPConnection(host, int(port))
+        conn.request("POST", "/grade", b"{}")
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 400
+        conn.request("GET", "/healthz")
+        assert json.loads(conn.getresponse().read())["status"] == "ok"
+        conn.close()
+
+    def test_grade_uses_service_from_env(self, service, monkeypatch):
+        monkeypatch.setenv(grading.GRADER_URL_ENV, service)
+        sent = []
+        real = GradingClient.grade
+
+        def spy(self, request):
+            sent.append(request)
+            return real(self, request)
+
+        monkeypatch.setattr(GradingClient, "grade", spy)
+        result = grading.grade("mana = 100", _EXERCISE)
+        assert result["success"] is True
+        assert "hints" not in sent[0]["exercise"]
+
+
+class TestServiceFailures:
+    @pytest.fixture
+    def server(self):
+        server = GradingServer(("127.0.0.1", 0), workers=1, job_timeout=0.2)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def test_slow_job_fails_without_marking_the_service_down(self, server):
+        client = GradingClient(f"http://127.0.0.1:{server.server_port}")
+        slow = "for _ in range(30_000_000):\n    pass\nmana = 100"
+        data = client.grade({"user_code": slow, "exercise": _EXERCISE})
+        assert data["success"] is False
+        assert "Timed out" in data["message"]
+        assert client._down_until == 0.0
+
+    def test_endless_job_frees_its_worker(self, server):
+        stuck = server.pool
+        result = server.grade("while True:\n    pass", _EXERCISE, None)
+        assert "Timed out" in result["message"]
+        assert server.pool is not stuck
+        assert server.grade("mana = 100", _EXERCISE, None)["success"] is True
+
+    def test_dead_worker_pool_is_replaced(self, server):
+        broken = server.pool
+        for process in list(broken._processes.values()):
+            process.kill()
+            process.join()
+        result = server.grade("mana = 100", _EXERCISE, None)
+        assert result["success"] is True
+        assert server.pool is not broken
+
+
+class TestFallback:
+    def test_unreachable_service_marks_client_down(self, monkeypatch):
+        client = GradingClient("http://127.0.0.1:9")
+        with pytest.raises(GraderUnavailableError):
+            client.grade({"user_code": "", "exercise": _EXERCISE})
+        monkeypatch.setattr(
+            grading_client.http.client, "HTTPConnection", None, raising=True
+        )
+        # Marked down: fails fast without opening a connection.
+        with pytest.raises(GraderUnavailableError, match="marked down"):
+            client.grade({"user_code": "", "exercise": _EXERCISE})
+
+    def test_grade_falls_back_to_local(self, monkeypatch):
+        monkeypatch.setenv(grading.GRADER_URL_ENV, "http://127.0.0.1:9")
+        result = grading.grade("mana = 100", _EXERCISE)
+        assert result["success"] is True
+
+    def test_malformed_subinterpreter_count_grades_locally(self, monkeypatch):
+        monkeypatch.delenv(grading.GRADER_URL_ENV, raising=False)
+        monkeypatch.setenv(subinterp.SUBINTERPRETERS_ENV, "four")
+        monkeypatch.setattr(subinterp, "_pool", None)
+        monkeypatch.setattr(subinterp, "_pool_checked", False)
+        assert subinterp.get_pool() is None
+        assert grading.grade("mana = 100", _EXERCISE)["success"] is True
+
+    def test_unusable_url_grades_locally(self, monkeypatch, caplog):
+        monkeypatch.setenv(grading.GRADER_URL_ENV, "https://grader.example")
+        assert grading.grade("mana = 100", _EXERCISE)["success"] is True
+        assert "Unsupported grading service URL" in caplog.text
+
+    def test_malformed_response_marks_client_down(self):
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):  # noqa: N802
+                self.rfile.read(int(self.headers["Content-Length"]))
+                self.send_response(200)
+                self.send_header("Content-Length", "13")
+                self.end_headers()
+                self.wfile.write(b"<html></html>")
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = GradingClient(f"http://127.0.0.1:{server.server_port}")
+            with pytest.raises(GraderUnavailableError, match="malformed"):
+                client.grade({"user_code": "", "exercise": _EXERCISE})
+            assert client._down_until > 0.0
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_rejects_non_http_urls(self):
+        with pytest.raises(ValueError):
+            GradingClient("https://grader.example")
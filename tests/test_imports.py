@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from app.engine import execute_code_with_tests, new_namespace
+from app.imports import SAFE_MODULES, Importer, ReadOnlyModule
+
+
+class TestImporter:
+    def test_safe_modules_are_importable(self):
+        importer = Importer()
+        for name in SAFE_MODULES:
+            assert isinstance(importer(name), ReadOnlyModule)
+
+    def test_allowlist_narrows_safe_modules(self):
+        importer = Importer(["math", "os"])
+        assert importer("math").sqrt(4) == 2
+        for name in ("os", "random"):
+            with pytest.raises(ImportError):
+                importer(name)
+
+    def test_relative_imports_are_rejected(self):
+        with pytest.raises(ImportError):
+            Importer()("math", level=1)
+
+    def test_repeated_imports_share_a_module(self):
+        importer = Importer()
+        assert importer("math") is importer("math")
+
+    def test_reexported_unsafe_modules_are_hidden(self):
+        importer = Importer()
+        with pytest.raises(AttributeError):
+            importer("dataclasses").sys  # noqa: B018
+        with pytest.raises(AttributeError):
+            importer("random")._os  # noqa: B018
+
+
+class TestReadOnlyModule:
+    def test_attributes_cannot_change(self):
+        math = Importer()("math")
+        with pytest.raises(AttributeError, match="read-only"):
+            math.pi = 3
+        with pytest.raises(AttributeError, match="read-only"):
+            del math.pi
+        assert Importer()("math").pi > 3.14
+
+    def test_unexported_submodules_are_not_importable(self):
+        importer = Importer()
+        for name, attr in (
+            ("collections", "abc"),
+            ("json", "decoder"),
+            ("re", "_parser"),
+        ):
+            with pytest.raises(ImportError, match="cannot import name"):
+                importer(name, fromlist=(attr,))
+        namespace = new_namespace()
+        exec("from json import dumps", namespace)
+        assert namespace["dumps"]({}) == "{}"
+
+    def test_exported_classes_are_frozen(self):
+        json = Importer()("json")
+        with pytest.raises(TypeError, match="immutable"):
+            json.JSONEncoder.encode = lambda self, o: "{}"
+        namespace = new_namespace()
+        exec(
+            "import json\n"
+            "class Compact(json.JSONEncoder):\n"
+            "    item_separator = ','\n"
+            "Compact.key_separator = ':'\n"
+            "value = Compact().encode({'a': [1, 2]})",
+            namespace,
+        )
+        assert namespace["value"] == '{"a":[1,2]}'
+        assert Importer()("json").dumps({"a": [1, 2]}) == '{"a": [1, 2]}'
+
+    def test_function_attributes_stay_in_the_run(self):
+        namespace = new_namespace()
+        exec(
+            "import json\njson.dumps.__kwdefaults__['indent'] = 4\n"
+            "json.dumps.calls = 0",
+            namespace,
+        )
+        dumps = Importer()("json").dumps
+        assert dumps([1]) == "[1]"
+        assert not hasattr(dumps, "calls")
+
+    def test_star_import(self):
+        namespace = new_namespace()
+        exec("from math import *\nvalue = floor(2.5)", namespace)
+        assert namespace["value"] == 2
+
+
+class TestPerRunState:
+    def test_random_seed_is_private_to_a_run(self):
+        before = random.getstate()
+        namespace = new_namespace()
+        exec("import random\nrandom.seed(42)\nvalue = random.random()", namespace)
+        assert namespace["value"] == random.Random(42).random()
+        assert random.getstate() == before
+
+    def test_helper_modules(self):
+        result = execute_code_with_tests(
+            "from geometry import area\n",
+            "def test_area():\n    assert area(2, 3) == 6",
+            modules={"geometry": "def area(w, h):\n    return w * h\n"},
+        )
+        assert result["success"] is True
+
+    def test_helper_modules_run_in_the_sandbox(self):
+        result = execute_code_with_tests(
+            "import helper",
+            "def test_a():\n    pass",
+            modules={"helper": "import os\n"},
+        )
+        assert result["message"] == "❌ Error: ImportError"
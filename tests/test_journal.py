@@ -0,0 +1,155 @@
+import gzip
+import subprocess
+import sys
+from unittest.mock import patch
+
+from app import journal
+from app.errors import ErrorReport
+from app.journal import (
+    JournalWriter,
+    compact,
+    read_journal,
+    recover_segments,
+    segments,
+)
+
+
+def _records(n: int, start: int = 0) -> list[dict]:
+    return [{"exercise": "var_rpg_001", "code": f"x = {i}"} for i in range(start, n)]
+
+
+class TestJournalWriter:
+    def test_close_publishes_segment(self, tmp_path):
+        writer = JournalWriter(tmp_path)
+        for record in _records(3):
+            writer.append(record)
+        assert segments(tmp_path) == []
+        writer.close()
+        assert list(read_journal([tmp_path])) == _records(3)
+
+    def test_rotates_at_segment_size(self, tmp_path):
+        writer = JournalWriter(tmp_path, segment_bytes=100)
+        for record in _records(10):
+            writer.append(record)
+        writer.close()
+        assert len(segments(tmp_path)) > 1
+        assert list(read_journal([tmp_path])) == _records(10)
+
+    def test_truncated_segment_keeps_readable_records(self, tmp_path):
+        writer = JournalWriter(tmp_path)
+        for record in _records(20_000):
+            writer.append(record)
+        writer.close()
+        (segment,) = segments(tmp_path)
+        data = segment.read_bytes()
+        segment.write_bytes(data[: len(data) // 2])
+        kept = list(read_journal([segment]))
+        assert 0 < len(kept) < 20_000
+        assert kept == _records(20_000)[: len(kept)]
+
+
+class TestRecovery:
+    def test_orphaned_segment_is_finished_on_startup(self, tmp_path):
+        writer = JournalWriter(tmp_path)
+        for record in _records(20_000):
+            writer.append(record)
+        writer._file.flush()
+        # The process that wrote it crashed partway through a write.
+        dead = subprocess.run(
+            [sys.executable, "-c", "import os; print(os.getpid())"],
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        data = writer._path.read_bytes()
+        orphan = tmp_path / f"journal-1-{dead}.jsonl.gz.part"
+        orphan.write_bytes(data[: len(data) // 2])
+
+        JournalWriter(tmp_path)
+        assert not orphan.exists()
+        (segment,) = segments(tmp_path)
+        kept = list(read_journal([segment]))
+        assert 0 < len(kept) < 20_000
+        assert kept == _records(20_000)[: len(kept)]
+
+    def test_segments_being_written_are_left_alone(self, tmp_path):
+        writer = JournalWriter(tmp_path)
+        writer.append(_records(1)[0])
+        assert recover_segments(tmp_path) == []
+        writer.close()
+        assert list(read_journal([tmp_path])) == _records(1)
+
+
+class TestCompaction:
+    def test_merges_segments_in_order(self, tmp_path):
+        writer = JournalWriter(tmp_path, segment_bytes=100)
+        for record in _records(20):
+            writer.append(record)
+        writer.close()
+        merged = compact(tmp_path)
+        assert segments(tmp_path) == [merged]
+        assert list(read_journal([tmp_path])) == _records(20)
+        assert compact(tmp_path) is None
+
+    def test_drops_oldest_segments_over_budget(self, tmp_path):
+        writer = JournalWriter(tmp_path, segment_bytes=1_000)
+        for record in _records(2_000):
+            writer.append(record)
+        writer.close()
+        newest = segments(tmp_path)[-1]
+        newest_records = list(read_journal([newest]))
+        total = sum(p.stat().st_size for p in segments(tmp_path))
+        compact(tmp_path, retain_bytes=total // 2)
+        kept = list(read_journal([tmp_path]))
+        assert 0 < len(kept) < 2_000
+        assert kept == _records(2_000)[-len(kept) :]
+        assert kept[-len(newest_records) :] == newest_records
+
+    def test_keeps_newest_segment_over_budget(self, tmp_path):
+        writer = JournalWriter(tmp_path, segment_bytes=100)
+        for record in _records(10):
+            writer.append(record)
+        writer.close()
+        newest = list(read_journal([segments(tmp_path)[-1]]))
+        compact(tmp_path, retain_bytes=1)
+        assert list(read_journal([tmp_path])) == newest
+
+    def test_compacted_segment_is_recompacted_in_place(self, tmp_path):
+        writer = JournalWriter(tmp_path, segment_bytes=100)
+        for record in _records(10):
+            writer.append(record)
+        writer.close()
+        compact(tmp_path)
+        writer = JournalWriter(tmp_path)
+        for record in _records(15, start=10):
+            writer.append(record)
+        writer.close()
+        compact(tmp_path)
+        assert len(segments(tmp_path)) == 1
+        assert list(read_journal([tmp_path])) == _records(15)
+
+
+class TestRecordSubmission:
+    def test_disabled_without_directory(self, monkeypatch):
+        monkeypatch.delenv(journal.JOURNAL_DIR_ENV, raising=False)
+        with patch.object(journal, "_writer", None):
+            journal.record_submission("core", "ex", "x = 1", {"success": True}, 0.1)
+            assert journal._writer is None
+
+    def test_records_submission(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(journal.JOURNAL_DIR_ENV, str(tmp_path))
+        error = ErrorReport("NameError", "NameError: x\n")
+        with patch.object(journal, "_writer", None):
+            journal.record_submission(
+                "core",
+                "var_rpg_001",
+                "print(x)",
+                {"success": False, "error": error},
+                0.25,
+            )
+            journal._writer.close()
+        (record,) = read_journal([tmp_path])
+        assert (record["pack"], record["exercise"]) == ("core", "var_rpg_001")
+        assert record["error"] == "NameError"
+        assert record["seconds"] == 0.25
+        with gzip.open(segments(tmp_path)[0], "rt") as f:
+            assert f.read().count("\n") == 1
@@ -0,0 +1,162 @@
+import bisect
+import random
+import sqlite3
+
+import pytest
+
+from app.leaderboard import (
+    GLOBAL_BOARD,
+    TOP_K,
+    Entry,
+    IndexableSkiplist,
+    Leaderboard,
+    classroom_board,
+    display_name,
+)
+
+
+class TestIndexableSkiplist:
+    def test_matches_sorted_list(self):
+        rng = random.Random(7)
+        skiplist = IndexableSkiplist(seed=7)
+        reference: list[int] = []
+        for _ in range(2_000):
+            if reference and rng.random() < 0.4:
+                key = rng.choice(reference)
+                assert skiplist.remove(key) == bisect.bisect_left(reference, key)
+                reference.remove(key)
+            else:
+                key = rng.randrange(10**6)
+                if key in reference:
+                    continue
+                bisect.insort(reference, key)
+                assert skiplist.insert(key) == bisect.bisect_left(reference, key)
+        assert list(skiplist) == reference
+        assert len(skiplist) == len(reference)
+        for i in rng.sample(range(len(reference)), 50):
+            assert skiplist[i] == reference[i]
+            assert skiplist.index(reference[i]) == i
+        assert skiplist.head(5) == reference[:5]
+
+    def test_missing_key_raises(self):
+        skiplist = IndexableSkiplist()
+        skiplist.insert(1)
+        with pytest.raises(KeyError):
+            skiplist.remove(2)
+        with pytest.raises(KeyError):
+            skiplist.index(0)
+        with pytest.raises(IndexError):
+            skiplist[1]
+
+
+class TestLeaderboard:
+    def test_top_orders_by_score(self):
+        board = Leaderboard()
+        board.submit("a", "A", 100, [GLOBAL_BOARD])
+        board.submit("b", "B", 300, [GLOBAL_BOARD])
+        board.submit("c", "C", 200, [GLOBAL_BOARD])
+        assert [e.learner_id for e in board.top(GLOBAL_BOARD)] == ["b", "c", "a"]
+        assert board.top(GLOBAL_BOARD, 1) == (Entry("b", "B", 300),)
+
+    def test_ties_go_to_first_to_reach_score(self):
+        board = Leaderboard()
+        board.submit("late", "L", 100, [GLOBAL_BOARD])
+        board.submit("early", "E", 200, [GLOBAL_BOARD])
+        board.submit("late", "L", 200, [GLOBAL_BOARD])
+        assert board.rank(GLOBAL_BOARD, "early") == (1, 2)
+        assert board.rank(GLOBAL_BOARD, "late") == (2, 2)
+
+    def test_rank_of_unknown_learner(self):
+        board = Leaderboard()
+        assert board.rank(GLOBAL_BOARD, "nobody") is None
+        assert board.top("empty") == ()
+
+    def test_top_is_cached_until_it_changes(self):
+        board = Leaderboard()
+        for i in range(TOP_K + 5):
+            board.submit(f"l{i}", f"L{i}", 1_000 - i, [GLOBAL_BOARD])
+        top = board.top(GLOBAL_BOARD)
+        # A change below the top k keeps the cached tuple.
+        board.submit("l14", "L14", 1, [GLOBAL_BOARD])
+        assert board.top(GLOBAL_BOARD) is top
+        board.submit("l14", "L14", 5_000, [GLOBAL_BOARD])
+        assert board.top(GLOBAL_BOARD)[0].learner_id == "l14"
+
+    def test_classroom_boards_are_separate(self):
+        board = Leaderboard()
+        room = classroom_board("py101")
+        board.submit("a", "A", 100, [GLOBAL_BOARD, room])
+        board.submit("b", "B", 200, [GLOBAL_BOARD])
+        assert board.rank(room, "a") == (1, 1)
+        assert board.rank(GLOBAL_BOARD, "a") == (2, 2)
+
+    def test_remove_drops_learner_everywhere(self):
+        board = Leaderboard()
+        room = classroom_board("py101")
+        board.submit("a", "A", 100, [GLOBAL_BOARD, room])
+        board.submit("b", "B", 50, [GLOBAL_BOARD])
+        board.remove("a")
+        assert board.rank(GLOBAL_BOARD, "a") is None
+        assert board.rank(room, "a") is None
+        assert board.rank(GLOBAL_BOARD, "b") == (1, 1)
+
+    def test_scores_are_shared_through_database_file(self, tmp_path):
+        path = str(tmp_path / "leaderboard.db")
+        first, second = Leaderboard(path), Leaderboard(path)
+        try:
+            first.submit("a", "A", 100, [GLOBAL_BOARD])
+            assert second.rank(GLOBAL_BOARD, "a") == (1, 1)
+            second.submit("b", "B", 200, [GLOBAL_BOARD])
+            assert first.rank(GLOBAL_BOARD, "a") == (2, 2)
+        finally:
+            first.close()
+            second.close()
+        reopened = Leaderboard(path)
+        assert [e.learner_id for e in reopened.top(GLOBAL_BOARD)] == ["b", "a"]
+        reopened.close()
+
+    def test_other_processes_changes_are_applied_as_deltas(self, tmp_path):
+        path = str(tmp_path / "leaderboard.db")
+        first, second = Leaderboard(path), Leaderboard(path)
+        try:
+            first.submit("a", "A", 100, [GLOBAL_BOARD])
+            first.submit("b", "B", 50, [GLOBAL_BOARD])
+            assert second.rank(GLOBAL_BOARD, "b") == (2, 2)
+            board = second._boards[GLOBAL_BOARD]
+            first.remove("a")
+            first.submit("c", "C", 10, [GLOBAL_BOARD])
+            assert second.rank(GLOBAL_BOARD, "a") is None
+            assert second.rank(GLOBAL_BOARD, "c") == (2, 2)
+            assert second._boards[GLOBAL_BOARD] is board
+            first.submit("a", "A", 5, [GLOBAL_BOARD])
+            assert second.rank(GLOBAL_BOARD, "a") == (3, 3)
+        finally:
+            first.close()
+            second.close()
+
+    def test_opens_databases_without_sequence_columns(self, tmp_path):
+        path = str(tmp_path / "leaderboard.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE scores (board TEXT NOT NULL, learner_id TEXT NOT NULL,"
+            " name TEXT NOT NULL, score INTEGER NOT NULL, reached_at REAL NOT NULL,"
+            " PRIMARY KEY (board, learner_id))"
+        )
+        conn.execute("INSERT INTO scores VALUES ('global', 'a', 'A', 100, 0.0)")
+        conn.commit()
+        conn.close()
+        board = Leaderboard(path)
+        board.submit("b", "B", 200, [GLOBAL_BOARD])
+        assert [e.learner_id for e in board.top(GLOBAL_BOARD)] == ["b", "a"]
+        board.close()
+
+
+class TestDisplayName:
+    def test_is_stable(self):
+        learner_id = "3f2a9c0d" * 4
+        assert display_name(learner_id) == display_name(learner_id)
+        assert display_name(learner_id) != display_name("0" * 32)
+
+    @pytest.mark.parametrize("learner_id", ["", "not-hex!", "zz"])
+    def test_accepts_any_id(self, learner_id):
+        assert len(display_name(learner_id).split()) == 3
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.drafts import DraftStore
+from app.memory import (
+    ACCOUNT_SECONDS,
+    MIN_IDLE_SECONDS,
+    SWEEP_SECONDS,
+    SessionTracker,
+    _request_rerun,
+    deep_sizeof,
+    session_bytes,
+)
+
+
+class TestSizes:
+    def test_counts_nested_containers_once(self):
+        shared = ["x" * 1000]
+        alone = deep_sizeof(shared)
+        assert alone > 1000
+        assert deep_sizeof([shared, shared]) < 2 * alone
+
+    def test_counts_object_attributes(self):
+        drafts = DraftStore()
+        empty = deep_sizeof(drafts)
+        drafts.put("ex", "x = 1\n" * 200, "", now=0)
+        assert deep_sizeof(drafts) > empty
+
+    def test_shared_objects_are_excluded(self):
+        exercises = [{"id": "ex", "prompt": "p" * 5000}]
+        state = {"exercises": exercises, "user_code": "x = 1"}
+        assert session_bytes(state, (exercises,)) + 5000 < session_bytes(state)
+
+
+class TestSessionTracker:
+    def test_measures_each_session_once_per_interval(self):
+        tracker = SessionTracker(ttl=0, budget_bytes=0)
+        assert tracker.touch("a", 0.0) == (True, None)
+        tracker.record_size("a", 100, 0.0)
+        assert tracker.touch("a", 1.0) == (False, None)
+        assert tracker.touch("a", ACCOUNT_SECONDS) == (True, None)
+        assert tracker.total_bytes == 100
+
+    def test_idle_sessions_are_evicted_once(self):
+        tracker = SessionTracker(ttl=600, budget_bytes=0)
+        tracker.touch("idle", 0.0)
+        tracker.touch("active", 500.0)
+        assert tracker.sweep(601.0) == [("idle", "idle")]
+        assert tracker.touch("idle", 602.0) == (True, "idle")
+        assert tracker.sweep(602.0 + SWEEP_SECONDS) == []
+
+    def test_sweeps_are_rate_limited(self):
+        tracker = SessionTracker(ttl=10, budget_bytes=0)
+        tracker.sweep(0.0)
+        tracker.touch("a", 0.0)
+        assert tracker.sweep(SWEEP_SECONDS / 2) == []
+        assert tracker.sweep(SWEEP_SECONDS) == [("a", "idle")]
+
+    def test_budget_evicts_least_recently_active(self):
+        tracker = SessionTracker(ttl=0, budget_bytes=250)
+        for session_id, seen in [("old", 10.0), ("older", 0.0), ("recent", 1000.0)]:
+            tracker.touch(session_id, seen)
+            tracker.record_size(session_id, 100, seen)
+        # Dropping "older" alone brings the total under the budget.
+        now = 1000.0 + MIN_IDLE_SECONDS / 2
+        assert tracker.sweep(now) == [("older", "budget")]
+
+    def test_forget(self):
+        tracker = SessionTracker(ttl=0, budget_bytes=0)
+        tracker.touch("a", 0.0)
+        tracker.forget("a")
+        tracker.forget("missing")
+        assert len(tracker) == 0
+
+
+class TestRequestRerun:
+    def test_changed_runtime_internals_skip_the_session(self):
+        with (
+            patch("app.memory.Runtime.exists", return_value=True),
+            patch("app.memory.Runtime.instance", return_value=SimpleNamespace()),
+        ):
+            assert not _request_rerun("session")
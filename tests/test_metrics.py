@@ -0,0 +1,98 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app import metrics
+from app.metrics import Registry, write_metrics_file
+
+
+class TestCounter:
+    def test_increments_from_many_threads_are_not_lost(self):
+        counter = Registry().counter("hits", "Hits.")
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert counter.value() == 8000
+        # Finished threads are folded into the retired total on read.
+        assert counter.value() == 8000
+
+    def test_cells_of_finished_threads_are_folded_without_reads(self):
+        counter = Registry().counter("reruns", "Reruns.")
+        for _ in range(50):
+            thread = threading.Thread(target=counter.inc)
+            thread.start()
+            thread.join()
+        assert len(counter._children[()]._cells._cells) <= 1
+        assert counter.value() == 50
+
+    def test_labelled_children_are_independent(self):
+        counter = Registry().counter("subs", "Submissions.", ["outcome"])
+        counter.labels("pass").inc()
+        counter.labels("pass").inc()
+        counter.labels("fail").inc()
+        assert counter.labels("pass").value() == 2
+        assert counter.labels("fail").value() == 1
+
+    def test_wrong_label_count_raises(self):
+        counter = Registry().counter("subs", "Submissions.", ["outcome"])
+        with pytest.raises(ValueError):
+            counter.labels("pass", "extra")
+
+
+class TestExposition:
+    def test_renders_prometheus_text(self):
+        registry = Registry()
+        registry.counter("hebikata_runs", "Runs.", ["outcome"]).labels("pass").inc(3)
+        hist = registry.histogram("hebikata_latency_seconds", "Latency.")
+        hist.observe(0.002)
+        hist.observe(20)
+        registry.gauge("hebikata_live", "Live.", lambda: 4)
+        registry.callback_counter("hebikata_hits", "Hits.", lambda: 7)
+
+        text = registry.render()
+        assert "# TYPE hebikata_runs counter" in text
+        assert 'hebikata_runs_total{outcome="pass"} 3' in text
+        assert 'hebikata_latency_seconds_bucket{le="0.001"} 0' in text
+        assert 'hebikata_latency_seconds_bucket{le="0.0025"} 1' in text
+        assert 'hebikata_latency_seconds_bucket{le="+Inf"} 2' in text
+        assert "hebikata_latency_seconds_count 2" in text
+        assert "hebikata_live 4" in text
+        assert "# TYPE hebikata_hits counter" in text
+        assert "hebikata_hits_total 7" in text
+
+    def test_failing_gauge_callback_is_skipped(self):
+        registry = Registry()
+        registry.gauge("broken", "Broken.", lambda: 1 / 0)
+        assert "\nbroken " not in registry.render()
+
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        registry.counter("c", "C.", ["name"]).labels('a"b').inc()
+        assert 'c_total{name="a\\"b"} 1' in registry.render()
+
+    def test_write_metrics_file(self, tmp_path):
+        path = tmp_path / "hebikata.prom"
+        write_metrics_file(str(path))
+        assert "hebikata_submissions" in path.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize(
+    ("raw", "interval"),
+    [("soon", metrics.DEFAULT_METRICS_INTERVAL), ("0", metrics.MIN_METRICS_INTERVAL)],
+)
+def test_file_exporter_interval_is_sane(tmp_path, monkeypatch, raw, interval):
+    monkeypatch.setenv(metrics.METRICS_FILE_ENV, str(tmp_path / "hebikata.prom"))
+    monkeypatch.setenv(metrics.METRICS_INTERVAL_ENV, raw)
+    monkeypatch.delenv(metrics.METRICS_PORT_ENV, raising=False)
+    monkeypatch.setattr(metrics, "_exporter_started", False)
+    with patch.object(metrics.threading, "Thread") as thread:
+        metrics.start_exporters()
+    assert thread.call_args.kwargs["args"][1] == interval
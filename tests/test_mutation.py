@@ -0,0 +1,95 @@
+from app.mutation import (
+    KILLED,
+    SURVIVED,
+    TIMEOUT,
+    content_key,
+    grade_mutant,
+    mutants,
+    run,
+)
+
+_REFERENCE = (
+    "lives = 2\n"
+    "if lives == 0:\n"
+    "    state = 'over'\n"
+    "else:\n"
+    "    state = 'playing'\n"
+)
+_WEAK_TESTS = "def test_state():\n    assert state in ('over', 'playing')"
+_STRONG_TESTS = "def test_state():\n    assert lives == 2 and state == 'playing'"
+
+
+def _exercise(tests: str) -> dict:
+    return {"id": "ex", "validation": {"tests": tests}}
+
+
+class TestMutants:
+    def test_operators(self):
+        descriptions = {m.description for m in mutants(_REFERENCE)}
+        assert descriptions == {
+            "2 -> 3",
+            "0 -> 1",
+            "'==' -> '!='",
+            "'over' -> ''",
+            "'playing' -> ''",
+            "swapped if/else branches",
+        }
+
+    def test_if_without_else_is_negated(self):
+        (mutant,) = mutants("if ready:\n    go()\n")
+        assert mutant.description == "negated if condition"
+        assert mutant.source == "if not ready:\n    go()"
+
+    def test_docstrings_and_fstring_literals_are_kept(self):
+        source = 'def f(x):\n    """Doc."""\n    return f"n={x}"\n'
+        assert mutants(source) == []
+
+    def test_mutants_are_ordered_by_line(self):
+        lines = [m.line for m in mutants(_REFERENCE)]
+        assert lines == sorted(lines)
+
+
+class TestGrading:
+    def test_outcomes(self):
+        tests = "def test_x():\n    assert x == 1"
+        assert grade_mutant("x = 1", tests, None, None, None, 5.0) == SURVIVED
+        assert grade_mutant("x = 2", tests, None, None, None, 5.0) == KILLED
+
+    def test_endless_mutant_times_out(self):
+        source = "n = 5\nwhile n != 0:\n    n -= 2\n"
+        tests = "def test_n():\n    assert n == 0"
+        assert grade_mutant(source, tests, None, None, None, 0.2) == TIMEOUT
+
+
+class TestRun:
+    def _data(self, tmp_path):
+        (tmp_path / "solutions").mkdir()
+        (tmp_path / "solutions" / "ex.py").write_text(_REFERENCE, encoding="utf-8")
+        return tmp_path
+
+    def test_weak_tests_leave_survivors(self, tmp_path):
+        data = self._data(tmp_path)
+        (weak,) = run([_exercise(_WEAK_TESTS)], data)
+        (strong,) = run([_exercise(_STRONG_TESTS)], data)
+        assert weak.total == strong.total == 6
+        assert (2, "swapped if/else branches") in weak.survivors
+        # Only the branch the tests never reach is left unchecked.
+        assert strong.survivors == [(2, "0 -> 1"), (3, "'over' -> ''")]
+        assert weak.score < strong.score
+
+    def test_results_are_cached_by_content(self, tmp_path):
+        data = self._data(tmp_path)
+        cache: dict = {}
+        (first,) = run([_exercise(_WEAK_TESTS)], data, cache)
+        (again,) = run([_exercise(_WEAK_TESTS)], data, cache)
+        assert list(cache) == [content_key(_REFERENCE, {"tests": _WEAK_TESTS})]
+        assert not first.cached and again.cached
+        assert again.survivors == first.survivors
+
+        (changed,) = run([_exercise(_STRONG_TESTS)], data, cache)
+        assert not changed.cached and len(cache) == 2
+
+    def test_failing_reference_is_reported(self, tmp_path):
+        data = self._data(tmp_path)
+        (report,) = run([_exercise("def test_x():\n    assert False")], data)
+        assert report.error is not None and report.total == 0
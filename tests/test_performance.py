@@ -0,0 +1,106 @@
+import pytest
+
+from app.performance import (
+    PERFORMANCE_BONUS,
+    PerformanceSpec,
+    grade_performance,
+    is_performance_kata,
+    speed_bonus,
+    time_against_reference,
+)
+
+_SPEC = PerformanceSpec(
+    entrypoint="total",
+    input_code="def make_input(size):\n    return (list(range(size)),)",
+    size=2000,
+    budget=3,
+    repeats=3,
+)
+_EXERCISE = {
+    "validation": {"tests": "def test_total():\n    assert total([1, 2]) == 3"},
+    "performance": {
+        "entrypoint": "total",
+        "input": _SPEC.input_code,
+        "size": _SPEC.size,
+        "budget": _SPEC.budget,
+        "repeats": _SPEC.repeats,
+    },
+}
+_REFERENCE = "def total(xs):\n    return sum(xs)\n"
+_QUADRATIC = (
+    "def total(xs):\n"
+    "    result = 0\n"
+    "    for i in range(len(xs)):\n"
+    "        result += sum(xs[: i + 1]) - sum(xs[:i])\n"
+    "    return result\n"
+)
+
+
+class TestSpeedBonus:
+    def test_full_bonus_at_or_below_reference(self):
+        assert speed_bonus(0.5, 3) == PERFORMANCE_BONUS
+        assert speed_bonus(1.0, 3) == PERFORMANCE_BONUS
+
+    def test_bonus_falls_linearly_to_budget(self):
+        assert speed_bonus(2.0, 3) == round(PERFORMANCE_BONUS / 2)
+        assert speed_bonus(3.0, 3) == 0
+        assert speed_bonus(10.0, 3) == 0
+
+
+class TestSpec:
+    def test_from_exercise_applies_defaults(self):
+        spec = PerformanceSpec.from_exercise(_EXERCISE)
+        assert spec.entrypoint == "total"
+        assert spec.budget == 3.0
+        assert spec.warmup == 1
+
+    def test_type_flag(self):
+        assert is_performance_kata({"type": "performance"})
+        assert not is_performance_kata({})
+
+
+class TestTiming:
+    def test_identical_functions_have_ratio_near_one(self):
+        def func(xs: list[int]) -> int:
+            return sum(xs)
+
+        timing = time_against_reference(func, func, (list(range(1000)),), _SPEC)
+        assert 0.5 < timing.ratio < 2.0
+
+
+class TestGradePerformance:
+    def test_reference_speed_passes_with_bonus(self):
+        result = grade_performance(_REFERENCE, _EXERCISE, _REFERENCE)
+        assert result["success"] is True
+        assert result["performance"]["bonus"] > 0
+
+    def test_slow_but_correct_code_fails_the_budget(self):
+        result = grade_performance(_QUADRATIC, _EXERCISE, _REFERENCE)
+        assert result["success"] is False
+        assert "Too slow" in result["message"]
+        assert result["performance"]["bonus"] == 0
+
+    def test_failing_tests_skip_timing(self):
+        result = grade_performance("def total(xs):\n    return 0", _EXERCISE, "")
+        assert result["success"] is False
+        assert "performance" not in result
+
+    def test_missing_entrypoint_is_an_error(self):
+        exercise = {**_EXERCISE, "performance": {**_EXERCISE["performance"]}}
+        exercise["performance"]["entrypoint"] = "missing"
+        result = grade_performance(_REFERENCE, exercise, _REFERENCE)
+        assert result["success"] is False
+        assert "NameError" in result["message"]
+
+
+class TestShippedKatas:
+    def test_initial_code_is_correct_but_over_budget(self, exercises, solutions):
+        katas = [ex for ex in exercises if is_performance_kata(ex)]
+        if not katas:
+            pytest.skip("no performance katas in the curriculum")
+        for ex in katas:
+            result = grade_performance(
+                ex["content"]["initial_code"], ex, solutions[ex["id"]]
+            )
+            assert "performance" in result, f"{ex['id']} initial code fails tests"
+            assert result["success"] is False, f"{ex['id']} initial code is fast"
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from app import profiler
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(profiler, "ENABLED", True)
+    profiler.collect_samples()
+    yield
+    profiler.collect_samples()
+
+
+class TestProfiler:
+    def test_disabled_returns_function_unchanged(self, monkeypatch):
+        monkeypatch.setattr(profiler, "ENABLED", False)
+
+        def func() -> int:
+            return 1
+
+        assert profiler.profiled(func) is func
+
+    def test_nested_spans_are_ordered_top_down(self, enabled):
+        @profiler.profiled
+        def inner() -> int:
+            return 2
+
+        with profiler.span("outer"):
+            assert inner() == 2
+
+        samples = profiler.collect_samples()
+        assert [(s.name, s.depth) for s in samples] == [
+            ("outer", 0),
+            ("TestProfiler.test_nested_spans_are_ordered_top_down.<locals>.inner", 1),
+        ]
+        assert samples[0].duration_ns >= samples[1].duration_ns
+
+    def test_collect_resets_samples(self, enabled):
+        with profiler.span("once"):
+            pass
+        assert len(profiler.collect_samples()) == 1
+        assert profiler.collect_samples() == []
+
+    def test_depth_restored_after_exception(self, enabled):
+        with pytest.raises(ValueError), profiler.span("boom"):
+            raise ValueError
+        with profiler.span("after"):
+            pass
+        assert [s.depth for s in profiler.collect_samples()] == [0, 0]
+
+    def test_samples_written_to_file(self, enabled, monkeypatch, tmp_path):
+        out = tmp_path / "profile.jsonl"
+        monkeypatch.setenv(profiler.PROFILE_FILE_ENV, str(out))
+        with profiler.span("rerun"):
+            pass
+        profiler.collect_samples()
+        record = json.loads(out.read_text(encoding="utf-8"))
+        assert record["samples"][0]["name"] == "rerun"
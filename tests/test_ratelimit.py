@@ -0,0 +1,71 @@
+import pytest
+
+from app import ratelimit
+from app.ratelimit import RateLimiter, Throttle, TokenBucket, throttle_message
+
+
+class TestTokenBucket:
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=0.5, burst=2, now=0.0)
+        for _ in range(2):
+            assert bucket.wait_time(0.0) == 0.0
+            bucket.take()
+        assert bucket.wait_time(0.0) == pytest.approx(2.0)
+        assert bucket.wait_time(1.0) == pytest.approx(1.0)
+        assert bucket.wait_time(2.0) == 0.0
+
+    def test_refill_is_capped_at_burst(self):
+        bucket = TokenBucket(rate=1.0, burst=3, now=0.0)
+        bucket.wait_time(1000.0)
+        assert bucket.tokens == 3
+
+
+class TestRateLimiter:
+    def test_session_bucket(self):
+        limiter = RateLimiter(session_rate=60, session_burst=2)
+        bucket = limiter.new_session_bucket(now=0.0)
+        assert limiter.acquire(bucket, None, now=0.0) is None
+        assert limiter.acquire(bucket, None, now=0.0) is None
+        throttle = limiter.acquire(bucket, None, now=0.0)
+        assert throttle == Throttle("session", pytest.approx(1.0))
+
+    def test_zero_rate_disables_session_bucket(self):
+        limiter = RateLimiter(session_rate=0, session_burst=1)
+        assert limiter.new_session_bucket() is None
+        assert all(limiter.acquire(None, "10.0.0.1") is None for _ in range(100))
+
+    def test_client_bucket_is_shared_across_sessions(self):
+        limiter = RateLimiter(session_rate=0, session_burst=1, client_rate=6)
+        assert limiter.acquire(None, "10.0.0.1", now=0.0) is None
+        assert limiter.acquire(None, "10.0.0.1", now=0.0).scope == "client"
+        assert limiter.acquire(None, "10.0.0.2", now=0.0) is None
+        # Connections without an address (localhost) are not limited per client.
+        assert limiter.acquire(None, None, now=0.0) is None
+
+    def test_throttled_run_takes_no_tokens(self):
+        limiter = RateLimiter(session_rate=60, session_burst=5, global_rate=6)
+        bucket = limiter.new_session_bucket(now=0.0)
+        limiter.acquire(bucket, None, now=0.0)
+        throttle = limiter.acquire(bucket, None, now=0.0)
+        assert throttle.scope == "global"
+        assert bucket.tokens == 4
+
+    def test_least_recent_clients_are_dropped(self):
+        limiter = RateLimiter(0, 1, client_rate=6, max_clients=2)
+        for client in ("a", "b", "a", "c"):
+            limiter.acquire(None, client, now=0.0)
+        assert list(limiter._clients) == ["a", "c"]
+
+
+def test_malformed_rates_fall_back_to_defaults(monkeypatch):
+    monkeypatch.setattr(ratelimit, "_limiter", None)
+    monkeypatch.setenv(ratelimit.SESSION_RATE_ENV, "twelve")
+    monkeypatch.setenv(ratelimit.GLOBAL_RATE_ENV, "")
+    limiter = ratelimit.get_limiter()
+    assert limiter.session_rate == ratelimit.DEFAULT_SESSION_RUNS_PER_MIN / 60
+    assert limiter.new_session_bucket() is not None
+
+
+def test_message_rounds_wait_up_to_a_second():
+    assert "1 s" in throttle_message(Throttle("session", 0.2))
+    assert "busy" in throttle_message(Throttle("global", 12.4))
@@ -0,0 +1,114 @@
+import pytest
+
+from app.review import (
+    DAY_SECONDS,
+    DEFAULT_EASE,
+    MIN_EASE,
+    MIN_REVIEW_GAP_SECONDS,
+    RELEARN_SECONDS,
+    ReviewCard,
+    ReviewQueue,
+    recall_quality,
+)
+
+
+class TestRecallQuality:
+    def test_clean_solve_is_perfect(self):
+        assert recall_quality(True, 0) == 5
+
+    def test_hints_cost_a_point_each(self):
+        assert recall_quality(True, 1) == 4
+        assert recall_quality(True, 3) == 3
+
+    def test_failure_is_below_passing(self):
+        assert recall_quality(False, 0) == 1
+
+
+class TestReviewCard:
+    def test_sm2_interval_progression(self):
+        card = ReviewCard()
+        intervals = []
+        for _ in range(4):
+            card.review(5, now=0.0)
+            intervals.append(card.interval_days)
+        assert intervals[:2] == [1.0, 6.0]
+        assert intervals[2] == pytest.approx(6.0 * 2.7)
+        assert card.due == intervals[-1] * DAY_SECONDS
+
+    def test_failure_resets_and_relearns_soon(self):
+        card = ReviewCard()
+        card.review(5, now=0.0)
+        card.review(5, now=0.0)
+        card.review(1, now=100.0)
+        assert card.repetitions == 0
+        assert card.due == 100.0 + RELEARN_SECONDS
+        assert card.ease < DEFAULT_EASE + 0.2
+
+    def test_ease_has_a_floor(self):
+        card = ReviewCard()
+        for _ in range(10):
+            card.review(0, now=0.0)
+        assert card.ease == MIN_EASE
+
+
+class TestReviewQueue:
+    def test_next_due_is_earliest(self):
+        queue = ReviewQueue()
+        queue.record(0, 5, now=0.0)  # due after a day
+        queue.record(1, 1, now=0.0)  # due after RELEARN_SECONDS
+        assert queue.next_due(now=0.0) is None
+        assert queue.next_due(now=RELEARN_SECONDS) == 1
+        assert queue.peek() == (RELEARN_SECONDS, 1)
+
+    def test_rescheduling_supersedes_old_entry(self):
+        queue = ReviewQueue()
+        queue.record(0, 1, now=0.0)
+        queue.record(0, 5, now=0.0)
+        assert queue.next_due(now=RELEARN_SECONDS) is None
+        assert queue.peek() == (DAY_SECONDS, 0)
+
+    def test_stale_entries_are_compacted(self):
+        queue = ReviewQueue()
+        for i in range(1_000):
+            queue.record(i % 3, 4, now=float(i))
+        assert len(queue) == 3
+        assert len(queue._heap) <= 2 * 3 + 16 + 1
+
+    def test_round_trips_through_list(self):
+        queue = ReviewQueue()
+        queue.record(4, 5, now=0.0)
+        queue.record(7, 2, now=0.0)
+        restored = ReviewQueue.from_list(queue.to_list())
+        assert restored.to_list() == queue.to_list()
+        assert restored.peek() == queue.peek()
+        assert 7 in restored and 3 not in restored
+
+    def test_reads_rows_saved_without_review_time(self):
+        restored = ReviewQueue.from_list([[3, 2.5, 1.0, 1, 50.0]])
+        assert restored.card(3).reviewed is None
+        assert restored.wants_review(3, now=50.0)
+
+    def test_only_due_cards_want_review(self):
+        queue = ReviewQueue()
+        assert queue.wants_review(0, now=0.0)
+        queue.record(0, 5, now=0.0)
+        assert not queue.wants_review(0, now=60.0)
+        assert queue.wants_review(0, now=DAY_SECONDS)
+
+    def test_failed_card_is_relearned_once_due(self):
+        queue = ReviewQueue()
+        queue.record(0, 5, now=0.0)
+        queue.record(0, 1, now=DAY_SECONDS)
+        assert not queue.wants_review(0, now=DAY_SECONDS + 60.0)
+        assert queue.next_due(now=DAY_SECONDS + RELEARN_SECONDS) == 0
+        assert queue.wants_review(0, now=DAY_SECONDS + RELEARN_SECONDS)
+        card = queue.record(0, 5, now=DAY_SECONDS + RELEARN_SECONDS)
+        assert card.repetitions == 1
+        assert not queue.wants_review(0, now=DAY_SECONDS + RELEARN_SECONDS + 60.0)
+
+    def test_review_gap_counts_a_run_before_it_is_due(self):
+        queue = ReviewQueue()
+        for day in range(3):
+            queue.record(0, 5, now=day * DAY_SECONDS)
+        assert queue.card(0).due > 3 * DAY_SECONDS
+        assert queue.wants_review(0, now=2 * DAY_SECONDS + MIN_REVIEW_GAP_SECONDS)
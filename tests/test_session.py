@@ -2,20 +2,32 @@ import json
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import pytest
+
+from app.drafts import DraftStore
+from app.review import DAY_SECONDS, ReviewQueue
 from app.session import (
     DEFAULT_LIVES,
     HINT_PENALTY,
     MASTERY_THRESHOLD,
     POINTS_PER_SUCCESS,
     STORAGE_KEY,
+    StoragePendingError,
     advance_hint,
     get_current_exercise,
     get_current_hint_level,
+    initialize_session_state,
     load_progress,
+    migrate_progress,
     next_exercise,
     previous_exercise,
+    publish_score,
+    record_review,
     reset_exercise_code,
+    review_exercise,
+    save_drafts,
     save_progress,
+    update_draft,
 )
 
 
@@ -42,7 +54,14 @@ def _to_session_state(exercises: list[dict]) -> SimpleNamespace:
         lives=DEFAULT_LIVES,
         current_exercise_idx=0,
         hint_levels=[-1] * num,
+        review=ReviewQueue(),
+        drafts=DraftStore(),
+        drafts_saved_at=0.0,
         user_code=exercises[0]["content"]["initial_code"],
+        learner_id="0123abcd" * 4,
+        classroom=None,
+        pack="core",
+        published_score=None,
     )
 
 
@@ -57,18 +76,29 @@ def _patch_session_state(state: SimpleNamespace):
 
 class TestProgressPersistence:
     def test_load_progress_returns_none_for_empty_store(self):
-        with patch("app.session.get_local_storage", return_value=None):
+        with patch("app.session.read_local_storage", return_value=None):
             assert load_progress() is None
 
     def test_load_progress_returns_parsed_state(self):
         data = '{"score": 150, "lives": 2}'
-        with patch("app.session.get_local_storage", return_value=data):
+        with patch("app.session.read_local_storage", return_value=data):
             result = load_progress()
             assert result == {"score": 150, "lives": 2}
 
     def test_load_progress_ignores_corrupted_json(self):
-        with patch("app.session.get_local_storage", return_value="{bad"):
+        with patch("app.session.read_local_storage", return_value="{bad"):
+            assert load_progress() is None
+
+    def test_unanswered_read_is_not_an_empty_store(self):
+        with (
+            patch("app.session.streamlit_js_eval", return_value=None),
+            pytest.raises(StoragePendingError),
+        ):
+            load_progress()
+        with patch("app.session.streamlit_js_eval", return_value="null"):
             assert load_progress() is None
+        with patch("app.session.streamlit_js_eval", return_value='"{\\"lives\\": 2}"'):
+            assert load_progress() == {"lives": 2}
 
     def test_save_progress_calls_set_local_storage(self):
         mock_set = MagicMock()
@@ -87,6 +117,73 @@ class TestProgressPersistence:
         assert parsed["lives"] == DEFAULT_LIVES
         assert parsed["successes"] == [0, 0]
 
+    def test_saved_progress_lists_exercise_ids(self):
+        state = _to_session_state([_make_exercise(0), _make_exercise(1)])
+        with (
+            _patch_session_state(state),
+            patch("app.session.set_local_storage") as mock_set,
+            patch("app.session.get_analytics"),
+            patch("app.session.publish_score"),
+        ):
+            save_progress()
+        saved = json.loads(mock_set.call_args_list[0].args[1])
+        assert saved["exercise_ids"] == ["ex_000", "ex_001"]
+
+    def test_each_pack_has_its_own_storage_key(self):
+        mock_set = MagicMock()
+        state = _to_session_state([_make_exercise(0)])
+        state.pack = "advanced"
+        with (
+            patch("app.session.set_local_storage", mock_set),
+            _patch_session_state(state),
+        ):
+            save_progress()
+        assert mock_set.call_args[0][0] == f"{STORAGE_KEY}:advanced"
+        with patch("app.session.read_local_storage", return_value=None) as mock_read:
+            load_progress("advanced")
+        mock_read.assert_called_once_with(f"{STORAGE_KEY}:advanced")
+
+
+# ---------------------------------------------------------------------------
+# leaderboard publishing
+# ---------------------------------------------------------------------------
+
+
+class TestPublishScore:
+    def _publish(self, state: SimpleNamespace) -> MagicMock:
+        board = MagicMock()
+        with (
+            patch("app.session.get_leaderboard", return_value=board),
+            _patch_session_state(state),
+        ):
+            publish_score()
+        return board
+
+    def test_zero_score_is_not_published(self):
+        state = _to_session_state([_make_exercise(0)])
+        self._publish(state).submit.assert_not_called()
+
+    def test_publishes_to_global_board(self):
+        state = _to_session_state([_make_exercise(0)])
+        state.score = 150
+        board = self._publish(state)
+        board.submit.assert_called_once()
+        learner_id, _name, score, boards = board.submit.call_args[0]
+        assert (learner_id, score, boards) == (state.learner_id, 150, ["global"])
+        assert state.published_score == 150
+
+    def test_unchanged_score_is_not_republished(self):
+        state = _to_session_state([_make_exercise(0)])
+        state.score = state.published_score = 150
+        self._publish(state).submit.assert_not_called()
+
+    def test_classroom_board_is_included(self):
+        state = _to_session_state([_make_exercise(0)])
+        state.score = 50
+        state.classroom = "py101"
+        board = self._publish(state)
+        assert board.submit.call_args[0][3] == ["global", "class:py101"]
+
 
 # ---------------------------------------------------------------------------
 # navigation
@@ -134,6 +231,46 @@ class TestNavigation:
             reset_exercise_code()
         assert state.user_code == "code 0"
 
+    def test_navigation_keeps_drafts(self):
+        exercises = [_make_exercise(i) for i in range(3)]
+        state = _to_session_state(exercises)
+        state.user_code = "work in progress"
+        mock_set = MagicMock()
+        with (
+            patch("app.session.set_local_storage", mock_set),
+            _patch_session_state(state),
+        ):
+            next_exercise()
+            assert state.user_code == "code 1"
+            previous_exercise()
+        assert state.user_code == "work in progress"
+        key, blob = mock_set.call_args[0]
+        assert key == f"{STORAGE_KEY}:drafts"
+        assert DraftStore.loads(blob).get("ex_000") == "work in progress"
+
+    def test_reset_exercise_code_discards_draft(self):
+        exercises = [_make_exercise(0), _make_exercise(1)]
+        state = _to_session_state(exercises)
+        state.drafts.put("ex_000", "modified", "code 0")
+        with patch("app.session.set_local_storage"), _patch_session_state(state):
+            reset_exercise_code()
+        assert "ex_000" not in state.drafts
+
+    def test_draft_writes_are_debounced(self):
+        state = _to_session_state([_make_exercise(0)])
+        mock_set = MagicMock()
+        with (
+            patch("app.session.set_local_storage", mock_set),
+            patch("app.session.time.monotonic", return_value=100.0),
+            _patch_session_state(state),
+        ):
+            update_draft("a = 1")
+            update_draft("a = 2")
+            assert mock_set.call_count == 1
+            save_drafts(force=True)
+        assert mock_set.call_count == 2
+        assert DraftStore.loads(mock_set.call_args[0][1]).get("ex_000") == "a = 2"
+
     def test_get_current_exercise(self):
         exercises = [_make_exercise(0), _make_exercise(1)]
         state = _to_session_state(exercises)
@@ -229,6 +366,145 @@ class TestHints:
             assert get_current_hint_level() == 0
 
 
+class _SessionState(dict):
+    """Dict with attribute access, like st.session_state."""
+
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+class TestInitialize:
+    def _initialize(self, stored: dict) -> tuple[bool, _SessionState]:
+        def read(key: str) -> str | None:
+            if key not in stored:
+                raise StoragePendingError(key)
+            return stored[key]
+
+        state = _SessionState()
+        with (
+            patch("app.session.st.session_state", state, create=True),
+            patch("app.session.st.query_params", {}, create=True),
+            patch("app.session.load_exercises", return_value=[_make_exercise(0)]),
+            patch("app.session.read_local_storage", side_effect=read),
+            patch("app.session.set_local_storage") as mock_set,
+        ):
+            initialized = initialize_session_state()
+        mock_set.assert_not_called()
+        return initialized, state
+
+    def test_waits_for_stored_drafts(self):
+        initialized, state = self._initialize({STORAGE_KEY: None})
+        assert not initialized
+        assert "drafts" not in state and "successes" not in state
+
+    def test_restores_drafts_once_read(self):
+        drafts = DraftStore()
+        drafts.put("ex_000", "x = 1", "code 0")
+        stored = {STORAGE_KEY: None, f"{STORAGE_KEY}:drafts": drafts.dumps()}
+        initialized, state = self._initialize(stored)
+        assert initialized
+        assert state.user_code == "x = 1"
+
+
+# ---------------------------------------------------------------------------
+# migrating saved progress
+# ---------------------------------------------------------------------------
+
+
+class TestMigrateProgress:
+    def test_progress_follows_exercise_ids(self):
+        queue = ReviewQueue()
+        queue.record(0, 5, now=0.0)
+        saved = {
+            "exercise_ids": ["a", "gone", "b"],
+            "successes": [3, 1, 2],
+            "attempts": [4, 1, 2],
+            "hint_levels": [0, -1, 1],
+            "current_exercise_idx": 2,
+            "review": queue.to_list(),
+        }
+        migrated = migrate_progress(saved, ["b", "new", "a"])
+        assert migrated["successes"] == [2, 0, 3]
+        assert migrated["attempts"] == [2, 0, 4]
+        assert migrated["hint_levels"] == [1, -1, 0]
+        assert migrated["current_exercise_idx"] == 0
+        assert migrated["review"].card(2).repetitions == 1
+        assert 0 not in migrated["review"]
+
+    def test_saves_without_ids_cover_the_first_exercises(self):
+        saved = {"successes": [3, 1], "attempts": [3, 2], "current_exercise_idx": 1}
+        migrated = migrate_progress(saved, ["a", "b", "perf"])
+        assert migrated["successes"] == [3, 1, 0]
+        assert migrated["hint_levels"] == [-1, -1, -1]
+        assert migrated["current_exercise_idx"] == 1
+
+    def test_unmatched_saves_are_rejected(self):
+        assert migrate_progress({"successes": [1, 2, 3]}, ["a", "b"]) is None
+        assert migrate_progress({"successes": [1], "attempts": []}, ["a"]) is None
+        assert migrate_progress({}, ["a"]) is None
+
+
+# ---------------------------------------------------------------------------
+# review scheduling
+# ---------------------------------------------------------------------------
+
+
+class TestReview:
+    def test_record_review_schedules_current_exercise(self):
+        state = _to_session_state([_make_exercise(0), _make_exercise(1)])
+        state.current_exercise_idx = 1
+        with _patch_session_state(state):
+            record_review(success=True)
+        assert state.review.card(1).repetitions == 1
+
+    def test_hints_lower_recall_quality(self):
+        clean = _to_session_state([_make_exercise(0)])
+        hinted = _to_session_state([_make_exercise(0)])
+        hinted.hint_levels[0] = 1
+        for state in (clean, hinted):
+            with _patch_session_state(state):
+                record_review(success=True)
+        assert hinted.review.card(0).ease < clean.review.card(0).ease
+
+    def test_retries_do_not_count_as_reviews(self):
+        state = _to_session_state([_make_exercise(0)])
+        with _patch_session_state(state):
+            record_review(success=False)
+            for success in (False, False, True, True, True):
+                record_review(success=success)
+        once = ReviewQueue().record(0, 1, now=0.0)
+        card = state.review.card(0)
+        assert (card.repetitions, card.ease) == (0, once.ease)
+
+    def test_due_exercise_is_reviewed_again(self):
+        state = _to_session_state([_make_exercise(0)])
+        state.review.record(0, 5, now=0.0)
+        with (
+            _patch_session_state(state),
+            patch("app.review.time.time", return_value=DAY_SECONDS),
+        ):
+            record_review(success=True)
+        assert state.review.card(0).interval_days == 6.0
+
+    def test_review_exercise_opens_due_exercise(self):
+        state = _to_session_state([_make_exercise(i) for i in range(3)])
+        state.review.record(2, 1, now=0.0)
+        with _patch_session_state(state):
+            assert review_exercise()
+        assert state.current_exercise_idx == 2
+        assert state.user_code == "code 2"
+
+    def test_review_exercise_without_due_items(self):
+        state = _to_session_state([_make_exercise(0), _make_exercise(1)])
+        state.review.record(1, 5, now=0.0)
+        with (
+            _patch_session_state(state),
+            patch("app.review.time.time", return_value=DAY_SECONDS / 2),
+        ):
+            assert not review_exercise()
+        assert state.current_exercise_idx == 0
+
+
 # ---------------------------------------------------------------------------
 # mastery constants
 # ---------------------------------------------------------------------------
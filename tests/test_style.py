@@ -0,0 +1,96 @@
+import pytest
+
+from app import style
+from app.style import MAX_LINE_LENGTH, check_style
+
+
+def _codes(source: str) -> list[str]:
+    return [issue.code for issue in check_style(source)]
+
+
+class TestCheckStyle:
+    def test_clean_code_has_no_issues(self):
+        source = (
+            "import os\n"
+            "\n"
+            "\n"
+            "def word_count(text: str, sep: str = ' ') -> int:\n"
+            "    # split on the separator\n"
+            "    if text is None or not os.sep:\n"
+            "        return 0\n"
+            "    return len(text.split(sep))\n"
+            "\n"
+            "\n"
+            "class Counter:\n"
+            "    total = 0\n"
+        )
+        assert check_style(source) == ()
+
+    @pytest.mark.parametrize(
+        ("source", "code"),
+        [
+            ("x = 1  \n", "W291"),
+            ("x = " + "1" * MAX_LINE_LENGTH + "\n", "E501"),
+            ("x=1\n", "E225"),
+            ("f(1,2)\n", "E231"),
+            ("f( 1)\n", "E201"),
+            ("x = 1 # note\n", "E261"),
+            ("#note\n", "E265"),
+            ("x = 1; y = 2\n", "E702"),
+            ("if x == None:\n    pass\n", "E711"),
+            ("if x == True:\n    pass\n", "E712"),
+            ("if not x in y:\n    pass\n", "E713"),
+            ("try:\n    pass\nexcept:\n    pass\n", "E722"),
+            ("f = lambda: 0\n", "E731"),
+            ("l = 1\n", "E741"),
+            ("def fooBar():\n    pass\n", "N802"),
+            ("class my_thing:\n    pass\n", "N801"),
+            ("def f(a = 1):\n    pass\n", "E251"),
+            ("def f(a: int=1):\n    pass\n", "E252"),
+            ("sort(key=lambda x = 1: x)\n", "E251"),
+        ],
+    )
+    def test_reports_code(self, source, code):
+        assert code in _codes(source)
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "g = lambda x=1: x\n",
+            "f(key=lambda a, b=(1, 2): a, c=3)\n",
+            "d = {k: lambda: 0 for k in ks}\n",
+        ],
+    )
+    def test_lambda_defaults_are_keyword_equals(self, source):
+        assert {"E225", "E251", "E252"}.isdisjoint(_codes(source))
+
+    def test_blank_lines_around_definitions(self):
+        source = "import os\ndef f():\n    pass\nx = 1\n"
+        assert _codes(source) == ["E302", "E305"]
+
+    def test_issues_are_ordered_by_position(self):
+        issues = check_style("x=1\ny = 2  \nz=3\n")
+        assert [(i.line, i.code) for i in issues] == [
+            (1, "E225"),
+            (2, "W291"),
+            (3, "E225"),
+        ]
+        assert str(issues[0]) == "1:2 E225 missing whitespace around operator '='"
+
+    def test_syntax_error_keeps_line_checks(self):
+        assert _codes("def f(:\n    x = 1  \n") == ["W291"]
+
+
+class TestCaching:
+    def test_edit_rechecks_only_changed_statement(self):
+        style.cache_clear()
+        blocks = [f"def f{i}(a, b):\n    return a + b\n" for i in range(5)]
+        check_style("\n\n".join(blocks))
+        before = style._check_block.cache_info()
+
+        blocks[2] = "def f2(a, b):\n    return a+b\n"
+        check_style("\n\n".join(blocks))
+        after = style._check_block.cache_info()
+
+        assert after.misses - before.misses == 1
+        assert after.hits - before.hits == 4
@@ -0,0 +1,137 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from app import grading, metrics, subinterp
+from app.errors import ErrorReport
+from app.grading_client import GradingClient
+from app.grading_service import GradingServer
+from app.subinterp import SubinterpreterError, SubinterpreterPool
+
+pytestmark = pytest.mark.skipif(
+    not subinterp.available(), reason="no subinterpreter support"
+)
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+# Every worker imports extension modules that are not isolation-safe on
+# 3.12 (datetime, decimal...) while interpreters are replaced underneath.
+_CONCURRENT_RUN = """
+from app.subinterp import SubinterpreterPool
+
+exercise = {"id": "d", "validation": {"tests": "def test_m():\\n    assert mana == 100"}}
+codes = [
+    "mana = 100",
+    "mana = 1 / 0",
+    "import datetime, decimal, statistics\\nmana = int(decimal.Decimal(100))",
+]
+pool = SubinterpreterPool(4, max_runs=3)
+futures = [pool.submit(codes[i % 3], exercise) for i in range(48)]
+print(sum(f.result()["success"] for f in futures))
+"""
+
+_ABANDON_RUN = """
+import os
+from app.subinterp import SubinterpreterPool
+
+exercise = {"id": "d", "validation": {"tests": "def test_m():\\n    assert mana == 100"}}
+pool = SubinterpreterPool(1)
+stuck = pool.submit("while True:\\n    pass", exercise)
+try:
+    stuck.result(timeout=0.2)
+except TimeoutError:
+    pool.abandon(stuck)
+print(pool.submit("mana = 100", exercise).result(timeout=30)["success"])
+pool.close()
+print(pool.abandoned(), flush=True)
+os._exit(0)
+"""
+
+_EXERCISE = {
+    "id": "demo",
+    "validation": {"tests": "def test_mana():\n    assert mana == 100, 'Need 100'"},
+}
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SubinterpreterPool(2, max_runs=2)
+    yield pool
+    pool.close()
+
+
+class TestPool:
+    def test_grades_in_interpreters(self, pool):
+        futures = [
+            pool.submit(code, _EXERCISE)
+            for code in ("mana = 100", "mana = 5", "mana = 1 / 0") * 2
+        ]
+        results = [grading.decode_result(f.result()) for f in futures]
+        assert [r["success"] for r in results] == [True, False, False] * 2
+        assert "Need 100" in results[1]["message"]
+        assert isinstance(results[2]["error"], ErrorReport)
+        assert results[2]["error"].exc_type == "ZeroDivisionError"
+
+    def test_interpreters_are_replaced_after_max_runs(self, pool):
+        futures = [pool.submit("mana = 100", _EXERCISE) for _ in range(5)]
+        assert all(f.result()["success"] for f in futures)
+
+    def test_grading_errors_are_raised(self, pool):
+        kata = {"id": "p", "type": "performance", "validation": {"tests": ""}}
+        with pytest.raises(SubinterpreterError, match="reference solution"):
+            pool.submit("x = 1", kata).result()
+
+
+def test_grade_uses_pool(pool, monkeypatch):
+    monkeypatch.delenv(grading.GRADER_URL_ENV, raising=False)
+    monkeypatch.setattr(subinterp, "_pool", pool)
+    monkeypatch.setattr(subinterp, "_pool_checked", True)
+    counter = metrics.GRADING_REQUESTS.labels("subinterpreter")
+    before = counter.value()
+    result = grading.grade("mana = 1 / 0", {**_EXERCISE, "hints": ["x"]})
+    assert isinstance(result["error"], ErrorReport)
+    assert counter.value() == before + 1
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="per-interpreter GIL")
+def test_endless_job_is_abandoned():
+    # Run in a child: the stuck interpreter would abort the test process's exit.
+    done = subprocess.run(
+        [sys.executable, "-c", _ABANDON_RUN],
+        cwd=_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.split() == ["True", "1"]
+
+
+def test_service_backend():
+    server = GradingServer(("127.0.0.1", 0), workers=1, backend="subinterpreters")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = GradingClient(f"http://127.0.0.1:{server.server_port}")
+        data = client.grade({"user_code": "mana = 100", "exercise": _EXERCISE})
+        assert data["success"] is True
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="per-interpreter GIL")
+def test_concurrent_grading_exits_cleanly():
+    # Run in a child: heap corruption would abort the test process itself.
+    done = subprocess.run(
+        [sys.executable, "-c", _CONCURRENT_RUN],
+        cwd=_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.strip() == "32"
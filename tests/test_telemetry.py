@@ -0,0 +1,78 @@
+import pytest
+
+from app.telemetry import (
+    MAX_KEYS_PER_SECOND,
+    PACE_BONUS,
+    TypingStats,
+    pace_bonus,
+    par_seconds,
+    typing_stats,
+)
+
+_HOUR = 3600.0
+
+
+def _exercise(difficulty: str = "beginner", boss: bool = False) -> dict:
+    return {"id": "ex", "metadata": {"difficulty": difficulty}, "boss": boss}
+
+
+class TestTypingStats:
+    def test_parses_batch_for_window(self):
+        batch = {
+            "window": "ex:0",
+            "seq": 3,
+            "keys": 42,
+            "pauses": 2,
+            "active_ms": 61500,
+        }
+        assert typing_stats(batch, "ex:0") == TypingStats(42, 2, 61.5)
+
+    def test_other_window_is_ignored(self):
+        batch = {"window": "ex:0", "keys": 42, "pauses": 2, "active_ms": 1000}
+        assert typing_stats(batch, "ex:1") is None
+
+    @pytest.mark.parametrize(
+        "batch",
+        [
+            None,
+            "ex:0",
+            {"window": "ex:0"},
+            {"window": "ex:0", "keys": "many", "pauses": 0, "active_ms": 0},
+            {"window": "ex:0", "keys": -1, "pauses": 0, "active_ms": 0},
+            {"window": "ex:0", "keys": 3, "pauses": 4, "active_ms": 9000},
+        ],
+    )
+    def test_malformed_batch_is_missing(self, batch):
+        assert typing_stats(batch, "ex:0") is None
+
+
+class TestPaceBonus:
+    def test_par_by_difficulty(self):
+        assert par_seconds(_exercise("beginner")) == 120
+        assert par_seconds(_exercise("beginner", boss=True)) == 240
+        assert par_seconds(_exercise("unknown")) == 300
+
+    def test_full_bonus_within_par(self):
+        assert pace_bonus(TypingStats(10, 0, 120.0), _exercise(), _HOUR) == PACE_BONUS
+
+    def test_bonus_falls_to_zero_at_three_times_par(self):
+        assert (
+            pace_bonus(TypingStats(10, 0, 240.0), _exercise(), _HOUR) == PACE_BONUS // 2
+        )
+        assert pace_bonus(TypingStats(10, 0, 360.0), _exercise(), _HOUR) == 0
+
+    def test_no_bonus_without_typing(self):
+        assert pace_bonus(None, _exercise(), _HOUR) == 0
+        assert pace_bonus(TypingStats(0, 0, 1.0), _exercise(), _HOUR) == 0
+
+    def test_claims_beyond_server_time_earn_nothing(self):
+        # Opened 30 s ago on the server, but the batch claims more.
+        assert pace_bonus(TypingStats(10, 0, 90.0), _exercise(), 30.0) == 0
+        keys = MAX_KEYS_PER_SECOND * 60
+        assert pace_bonus(TypingStats(keys, 0, 10.0), _exercise(), 30.0) == 0
+
+    def test_active_time_is_at_least_typing_time(self):
+        # 240 s worth of keystrokes with a forged 1 s of active time.
+        keys = MAX_KEYS_PER_SECOND * 240
+        stats = TypingStats(keys, 0, 1.0)
+        assert pace_bonus(stats, _exercise(), _HOUR) == PACE_BONUS // 2
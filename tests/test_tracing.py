@@ -0,0 +1,90 @@
+import json
+import sys
+
+import pytest
+
+from app import tracing
+from app.engine import execute_code_with_tests
+
+needs_monitoring = pytest.mark.skipif(
+    not tracing.AVAILABLE, reason="sys.monitoring needs Python 3.12+"
+)
+
+_FACT = "def fact(n):\n    if n <= 1:\n        return 1\n    return n * fact(n - 1)\n"
+
+
+class TestEngineTraceFlag:
+    def test_untraced_result_has_no_trace_key(self):
+        result = execute_code_with_tests("x = 1", "def test_x():\n    assert x == 1")
+        assert "trace" not in result
+
+    def test_syntax_error_is_reported_as_usual(self):
+        result = execute_code_with_tests(
+            "x = ", "def test_x():\n    assert x == 1", trace=True
+        )
+        assert result["success"] is False
+        assert result["trace"] is None
+        assert "During handling" not in str(result["error"])
+        assert "SyntaxError" in str(result["error"])
+
+    @pytest.mark.skipif(tracing.AVAILABLE, reason="only without sys.monitoring")
+    def test_trace_is_none_without_monitoring(self):
+        result = execute_code_with_tests(
+            "x = 1", "def test_x():\n    assert x == 1", trace=True
+        )
+        assert result["success"] is True
+        assert result["trace"] is None
+
+
+@needs_monitoring
+class TestCapture:
+    def test_records_lines_and_locals_called_from_tests(self):
+        result = execute_code_with_tests(
+            _FACT, "def test_fact():\n    assert fact(3) == 6", trace=True
+        )
+        trace = result["trace"]
+        assert result["success"] is True
+        events = list(trace.events())
+        assert events[0].function == "<module>"
+        calls = [(e.line, e.variables["n"]) for e in events if e.function == "fact"]
+        assert calls == [(2, "3"), (4, "3"), (2, "2"), (4, "2"), (2, "1"), (3, "1")]
+        assert not trace.truncated
+
+    def test_event_cap_truncates_and_disables(self):
+        code = compile("t = 0\nfor i in range(1000):\n    t += i\n", "<string>", "exec")
+        with tracing.capture(code, max_events=50) as trace:
+            exec(code, {})
+        assert len(trace) == 50
+        assert trace.truncated
+
+    def test_snapshots_are_deduplicated_and_bounded(self):
+        code = compile("a = 'x' * 500\nb = a\nc = b\n", "<string>", "exec")
+        with tracing.capture(code) as trace:
+            exec(code, {})
+        assert len(trace.snapshots) == 3
+        assert all(len(text) <= 40 for snap in trace.snapshots for _n, text in snap)
+
+    def test_functions_are_not_snapshotted(self):
+        code = compile(_FACT + "y = fact(1)\n", "<string>", "exec")
+        with tracing.capture(code) as trace:
+            exec(code, {})
+        names = {name for snap in trace.snapshots for name, _t in snap}
+        assert "fact" not in names
+
+    def test_to_dict_is_json_serializable(self):
+        code = compile("x = [1, 2]\n", "<string>", "exec")
+        with tracing.capture(code) as trace:
+            exec(code, {})
+        data = json.loads(json.dumps(trace.to_dict()))
+        assert data["lines"] == [1]
+        assert data["functions"] == ["<module>"]
+
+    def test_code_run_after_capture_is_not_traced(self):
+        code = compile("def f():\n    return 1\n", "<string>", "exec")
+        namespace: dict = {}
+        with tracing.capture(code) as trace:
+            exec(code, namespace)
+        recorded = len(trace)
+        namespace["f"]()
+        assert len(trace) == recorded
+        assert sys.monitoring.get_tool(tracing._tool_id) == tracing.TOOL_NAME
@@ -0,0 +1,115 @@
+import pytest
+
+from app import profiler, ui
+from app.analytics import ClassroomSummary
+from app.session import MASTERY_THRESHOLD
+from app.ui import (
+    TEACHER_KEY_ENV,
+    _exercise_outline,
+    _exercise_table,
+    _progress_panel_html,
+    _stats_bar_html,
+    _teacher_key_ok,
+    _theme_style_block,
+)
+
+
+def _make_exercise(chapter: int, theme: str) -> dict:
+    return {"metadata": {"chapter": chapter, "theme": theme}}
+
+
+class TestStatsBar:
+    def test_contains_all_cells(self):
+        html = _stats_bar_html(2, 150, 4, 15, 1)
+        assert html.startswith('<div class="stats-bar">')
+        for label in ("LIVES", "SCORE", "EXERCISE", "PROGRESS"):
+            assert label in html
+        assert "5/15" in html
+        assert f"1/{MASTERY_THRESHOLD}" in html
+
+    def test_is_memoized(self):
+        _stats_bar_html.cache_clear()
+        _stats_bar_html(3, 0, 0, 15, 0)
+        _stats_bar_html(3, 0, 0, 15, 0)
+        assert _stats_bar_html.cache_info().hits == 1
+
+
+class TestProgressPanel:
+    def test_groups_rows_by_chapter(self):
+        outline = _exercise_outline(
+            [_make_exercise(2, "rpg"), _make_exercise(1, "hacking")]
+        )
+        panels = _progress_panel_html(outline, (0, MASTERY_THRESHOLD), 0)
+        assert [label for label, _html in panels] == ["Ch 1", "Ch 2"]
+        assert "mastered" in panels[0][1]
+        assert "Hacking" in panels[0][1]
+        assert "👉 Rpg" in panels[1][1]
+
+    def test_dot_classes_follow_success_count(self):
+        outline = _exercise_outline([_make_exercise(1, "a")] * 3)
+        _label, html = _progress_panel_html(outline, (0, 1, MASTERY_THRESHOLD), 1)[0]
+        assert html.count('class="dot not-started"') == 1
+        assert html.count('class="dot in-progress"') == 1
+        assert html.count('class="dot mastered"') == 1
+        assert html.count("progress-item current") == 1
+
+
+class TestThemeCss:
+    def test_style_block_is_read_once(self):
+        _theme_style_block.cache_clear()
+        first = _theme_style_block()
+        assert first.startswith("<style>")
+        assert _theme_style_block() is first
+
+
+class TestTeacherKey:
+    def test_dashboard_is_off_without_a_key(self, monkeypatch):
+        monkeypatch.delenv(TEACHER_KEY_ENV, raising=False)
+        assert not _teacher_key_ok("")
+
+    def test_key_must_match(self, monkeypatch):
+        monkeypatch.setenv(TEACHER_KEY_ENV, "sensei")
+        assert _teacher_key_ok("sensei")
+        assert not _teacher_key_ok("")
+        assert not _teacher_key_ok("senpai")
+
+
+class TestExerciseTable:
+    def test_rows_follow_the_current_exercises(self):
+        summary = ClassroomSummary(
+            ["gone", "b", "a"],
+            2,
+            [9, 4, 2],
+            [1.0, 0.5, 0.0],
+            [None, 3.0, 1.0],
+            [1.0, 0.5, 0.0],
+            [],
+        )
+        exercises = [
+            {"id": ex_id, **_make_exercise(1, "loops")} for ex_id in ("a", "b", "new")
+        ]
+        table = _exercise_table(exercises, summary)
+        assert table["Exercise"] == ["a", "b", "new"]
+        assert table["Attempts"] == [2, 4, 0]
+        assert table["Failure rate"] == [0.0, 50.0, 0.0]
+        assert table["Attempts to mastery"] == [1.0, 3.0, None]
+
+
+class TestRenderApp:
+    def test_profile_samples_never_outlive_a_rerun(self, monkeypatch):
+        monkeypatch.setattr(profiler, "ENABLED", True)
+        monkeypatch.setattr(ui.metrics, "start_exporters", lambda: None)
+        panels = []
+        monkeypatch.setattr(ui, "_render_profiler_panel", panels.append)
+
+        def interrupted():
+            raise RuntimeError("like st.stop()")
+
+        monkeypatch.setattr(ui, "_render_page", interrupted)
+        with pytest.raises(RuntimeError):
+            ui.render_app()
+        assert profiler.collect_samples() == []
+
+        monkeypatch.setattr(ui, "_render_page", lambda: None)  # an early return
+        ui.render_app()
+        assert [[s.name for s in samples] for samples in panels] == [["render_app"]]
@@ -0,0 +1,84 @@
+import os
+
+from vistree import GitignoreMatcher, main
+
+
+def _matcher(*rules: str) -> GitignoreMatcher:
+    return GitignoreMatcher(list(rules))
+
+
+class TestGitignoreMatcher:
+    def test_unanchored_glob_matches_at_any_depth(self):
+        m = _matcher("*.pyc")
+        assert m.is_ignored("a.pyc", False)
+        assert m.is_ignored("pkg/sub/a.pyc", False)
+        assert not m.is_ignored("a.py", False)
+
+    def test_anchored_pattern_only_matches_from_root(self):
+        m = _matcher("/build")
+        assert m.is_ignored("build", True)
+        assert not m.is_ignored("src/build", True)
+
+    def test_directory_only_pattern_skips_files(self):
+        m = _matcher("cache/")
+        assert m.is_ignored("cache", True)
+        assert m.is_ignored("a/cache", True)
+        assert not m.is_ignored("cache", False)
+
+    def test_last_matching_rule_wins_for_negation(self):
+        m = _matcher("/data/*", "!/data/keep.csv")
+        assert not m.is_ignored("data", True)
+        assert m.is_ignored("data/big.csv", False)
+        assert not m.is_ignored("data/keep.csv", False)
+
+    def test_double_star_and_character_classes(self):
+        m = _matcher("docs/**/build", "log[0-9].txt")
+        assert m.is_ignored("docs/build", True)
+        assert m.is_ignored("docs/a/b/build", True)
+        assert m.is_ignored("log7.txt", False)
+        assert not m.is_ignored("logx.txt", False)
+
+    def test_wildcards_do_not_match_directory_marker(self):
+        assert not _matcher("ab?").is_ignored("ab", True)
+        assert _matcher("ab?").is_ignored("abc", True)
+        assert not _matcher("ab[!x]").is_ignored("ab", True)
+        assert not _matcher("ab**?").is_ignored("ab", True)
+
+    def test_no_rules_ignores_nothing(self):
+        assert not _matcher().is_ignored("anything", False)
+
+
+class TestTreeOutput:
+    def test_ignored_directories_are_pruned(self, tmp_path, monkeypatch):
+        root = tmp_path / "proj"
+        (root / "src").mkdir(parents=True)
+        (root / "src" / "app.py").touch()
+        (root / "venv" / "lib").mkdir(parents=True)
+        (root / ".venv").mkdir()
+        (root / "notes.pyc").touch()
+        (root / ".gitignore").write_text("*.pyc\n.venv/\n", encoding="utf-8")
+        monkeypatch.chdir(root)
+
+        scanned = []
+        real_scandir = os.scandir
+
+        def spy(path):
+            scanned.append(os.path.basename(path))
+            return real_scandir(path)
+
+        monkeypatch.setattr("vistree.os.scandir", spy)
+        main()
+
+        tree = (root / "vistree.txt").read_text(encoding="utf-8").splitlines()
+        assert tree == [
+            "proj/",
+            "│   .gitignore",
+            "│   src/",
+            "│       app.py",
+            "│   structure.dot",
+            "    vistree.txt",
+        ]
+        assert "venv" not in scanned and ".venv" not in scanned
+        dot = (root / "structure.dot").read_text(encoding="utf-8")
+        assert dot.startswith("digraph G {") and dot.endswith("}\n")
+        assert '"proj_src" -> "proj_src_app.py";' in dot
@@ -14,8 +14,9 @@ Usage:
 The script automatically:
 - Reads .gitignore rules from the project root
 - Excludes .git/ and venv/ directories
-- Traverses the directory tree recursively
-- Generates both text and DOT format outputs
+- Traverses the directory tree with os.scandir, never descending into
+  ignored directories
+- Streams both text and DOT output to disk as it goes
 
 Example vistree.txt output:
     foo/
@@ -40,147 +41,232 @@ License: Apache 2.0
 """
 
 import os
+import re
 from pathlib import Path
-import fnmatch
 
+# Directory names that are always skipped, wherever they appear.
+EXCLUDED_DIRS = frozenset({".git", "venv"})
 
-def is_gitignored(path, gitignore_rules):
+# Appended to directory paths before matching. It cannot occur in a path,
+# so globs like ``data/*`` never match the bare ``data`` directory.
+_DIR_MARKER = "\x00"
+
+
+class GitignoreMatcher:
+    """
+    All gitignore rules compiled into a single regular expression.
+
+    Each rule becomes one named alternative. Alternatives are ordered from
+    the last rule to the first, so the alternative that matches is the last
+    matching rule in the file, which is the one git honours. Whether the
+    path is ignored then depends only on whether that rule is a negation.
+
+    Paths are matched relative to the project root with "/" separators;
+    directories are matched with a trailing NUL marker so that
+    directory-only patterns (``build/``) do not match files.
     """
-    Check if a path should be excluded based on gitignore rules.
 
-    Checks both specific gitignore patterns and hardcoded exclusions
-    (.git, venv directories).
+    def __init__(self, rules):
+        """
+        Compile gitignore rules.
+
+        Args:
+            rules (List[str]): Pattern strings as returned by parse_gitignore()
+        """
+        alternatives = []
+        self._negated = []
+        for rule in rules:
+            compiled = _translate_rule(rule)
+            if compiled is None:
+                continue
+            regex, negated = compiled
+            alternatives.append(f"(?P<r{len(self._negated)}>{regex})")
+            self._negated.append(negated)
+
+        self._pattern = (
+            re.compile("|".join(reversed(alternatives))) if alternatives else None
+        )
+
+    def is_ignored(self, relpath, is_dir):
+        """
+        Check a path against the compiled rules.
+
+        Args:
+            relpath (str): Path relative to the root, using "/" separators
+            is_dir (bool): Whether the path is a directory
+
+        Returns:
+            bool: True if the last matching rule ignores the path
+        """
+        if self._pattern is None:
+            return False
+        match = self._pattern.fullmatch(relpath + _DIR_MARKER if is_dir else relpath)
+        if match is None:
+            return False
+        return not self._negated[int(match.lastgroup[1:])]
+
+
+def _translate_glob(pattern):
+    """
+    Translate a gitignore glob (without anchoring) to a regex fragment.
 
     Args:
-        path (str): The path to check (can be file or directory)
-        gitignore_rules (List[str]): List of gitignore pattern strings
+        pattern (str): Glob such as ``*.py``, ``docs/**/build`` or ``a[0-9]``
 
     Returns:
-        bool: True if the path should be ignored, False otherwise
+        str: Regular expression fragment using only non-capturing groups.
+        Wildcards never match _DIR_MARKER, so ``ab?`` does not match the
+        directory ``ab``.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append("[^\\x00]*")
+            i += 2
+        elif c == "*":
+            out.append("[^/\\x00]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/\\x00]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1 : end]
+                negate = body.startswith("!")
+                body = body[1:] if negate else body
+                body = body.replace(chr(92), chr(92) * 2)
+                out.append(f"[^{body}\\x00]" if negate else f"[{body}]")
+                i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
 
-    Note:
-        Uses fnmatch for pattern matching, which supports wildcards like
-        *, ?, and [seq]
+
+def _translate_rule(rule):
     """
-    # Convert path to relative and normalize for comparison
-    relpath = str(Path(path).relative_to(Path.cwd()))
+    Translate one gitignore line into a full-path regex.
 
-    # Check if any gitignore rule matches
-    excluded_dirs = [".git", "venv"]
-    if any(relpath.startswith(d) for d in excluded_dirs):
-        return True
+    Supports negation (``!pattern``), escaped leading ``!``/``#``,
+    directory-only patterns (trailing ``/``), anchored patterns (leading or
+    embedded ``/``) and ``*``, ``?``, ``[...]`` and ``**`` wildcards.
+
+    Args:
+        rule (str): One non-comment line from .gitignore
+
+    Returns:
+        Tuple[str, bool] | None: (regex, negated), or None for an empty rule
+    """
+    negated = rule.startswith("!")
+    if negated or rule.startswith(("\\!", "\\#")):
+        rule = rule[1:]
 
-    # Check against gitignore patterns
-    for rule in gitignore_rules:
-        if fnmatch.fnmatch(relpath, rule) or fnmatch.fnmatch(
-            os.path.basename(path), rule
-        ):
-            return True
-    return False
+    dir_only = rule.endswith("/")
+    rule = rule.rstrip("/")
+    if not rule:
+        return None
+
+    anchored = "/" in rule
+    rule = rule.lstrip("/")
+    body = _translate_glob(rule)
+    prefix = "" if anchored else "(?:.*/)?"
+    suffix = _DIR_MARKER if dir_only else f"{_DIR_MARKER}?"
+    return f"{prefix}{body}{suffix}", negated
 
 
 def parse_gitignore(gitignore_path):
     """
     Parse .gitignore file and extract pattern rules.
 
-    Reads the .gitignore file line by line and converts patterns into
-    a format suitable for fnmatch comparison. Ignores comments and
-    empty lines.
+    Reads the .gitignore file line by line, dropping comments and empty
+    lines. Patterns are returned unchanged; GitignoreMatcher interprets
+    negation, anchoring and directory-only suffixes.
 
     Args:
         gitignore_path (Path): Path to the .gitignore file
 
     Returns:
         List[str]: List of gitignore pattern strings
-
-    Note:
-        This is a simplified implementation. Full gitignore spec includes
-        negation (!), directory-only patterns (/), and more complex rules.
     """
     rules = []
     if not gitignore_path.exists():
         return rules
 
-    with open(gitignore_path, "r") as f:
+    with open(gitignore_path, encoding="utf-8") as f:
         for line in f:
-            line = line.strip()
+            line = line.rstrip("\n").rstrip()
             # Skip comments and empty lines
             if line and not line.startswith("#"):
-                # Convert directory patterns to glob patterns
-                if line.endswith("/"):
-                    line = line[:-1] + "/**"
-                else:
-                    line = line
                 rules.append(line)
     return rules
 
 
-def traverse_and_print(
-    path, prefix, gitignore_rules, tree, dot_nodes, parent_node=None
-):
+def _dot_id(node_id):
+    return node_id.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def traverse_and_print(path, relpath, prefix, matcher, tree_out, dot_out, parent_node):
     """
-    Recursively traverse directory tree and generate output.
+    Recursively traverse one directory and stream its entries.
 
-    Walks the directory structure, respecting gitignore rules, and builds
-    both plain text and DOT graph representations simultaneously.
+    Lists the directory once with os.scandir, drops ignored entries before
+    sorting, and only recurses into directories that survived the filter,
+    so ignored trees (virtualenvs, data dumps) are never read.
 
     Args:
-        path (Path): Current path being processed
-        prefix (str): Indentation prefix for text output (e.g., "│   ")
-        gitignore_rules (List[str]): Gitignore patterns to exclude
-        tree (List[str]): Accumulator for text output lines
-        dot_nodes (List[str]): Accumulator for DOT graph statements
-        parent_node (str, optional): Parent node ID in DOT graph
-
-    Side Effects:
-        Modifies tree and dot_nodes lists in place
+        path (str): Absolute path of the directory being processed
+        relpath (str): Its path relative to the root ("" for the root)
+        prefix (str): Indentation prefix of this directory (e.g., "│   ")
+        matcher (GitignoreMatcher): Compiled gitignore rules
+        tree_out (TextIO): Open vistree.txt stream
+        dot_out (TextIO): Open structure.dot stream
+        parent_node (str): DOT node ID of this directory
 
     Note:
-        Uses depth-first traversal with alphabetical sorting at each level
+        Uses depth-first traversal with alphabetical sorting at each level.
+        Symlinked directories are listed but not followed.
     """
-    path = Path(path)
-
-    # Skip if path matches gitignore rules
-    if is_gitignored(str(path), gitignore_rules):
+    try:
+        with os.scandir(path) as it:
+            entries = []
+            for entry in it:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir and entry.name in EXCLUDED_DIRS:
+                    continue
+                child_rel = f"{relpath}/{entry.name}" if relpath else entry.name
+                if not matcher.is_ignored(child_rel, is_dir):
+                    entries.append((entry.name, entry.path, child_rel, is_dir))
+    except OSError:
         return
 
-    if path.is_dir():
-        name = path.name
-        # Generate unique node ID for DOT graph
-        if parent_node is None:
-            node_id = name
-        else:
-            node_id = f"{parent_node}_{name}"
-
-        # Add DOT graph nodes and edges
-        dot_nodes.append(f'"{node_id}" [label="{name}"];')
-        if parent_node is not None:
-            dot_nodes.append(f'"{parent_node}" -> "{node_id}";')
-
-        # Add to text tree
-        tree.append(f"{prefix}{name}/")
-
-        # Recursively process directory contents
-        items = sorted(os.listdir(path))
-        for i, item in enumerate(items):
-            is_last = i == len(items) - 1
-            # Adjust prefix for tree structure visualization
-            new_prefix = prefix + ("    " if is_last else "│   ")
-            traverse_and_print(
-                path / item, new_prefix, gitignore_rules, tree, dot_nodes, node_id
-            )
-    else:
-        # Handle files
-        name = path.name
+    entries.sort()
+    last = len(entries) - 1
+    for i, (name, child_path, child_rel, is_dir) in enumerate(entries):
         node_id = f"{parent_node}_{name}"
+        dot_out.write(f'"{_dot_id(node_id)}" [label="{_dot_id(name)}"];\n')
+        dot_out.write(f'"{_dot_id(parent_node)}" -> "{_dot_id(node_id)}";\n')
 
-        # Add to DOT graph
-        dot_nodes.append(f'"{node_id}" [label="{name}"];')
-        if parent_node is not None:
-            dot_nodes.append(f'"{parent_node}" -> "{node_id}";')
-
-        # Add to text tree
-        tree.append(f"{prefix}{name}")
+        # Adjust prefix for tree structure visualization
+        item_prefix = prefix + ("    " if i == last else "│   ")
+        if is_dir:
+            tree_out.write(f"\n{item_prefix}{name}/")
+            traverse_and_print(
+                child_path, child_rel, item_prefix, matcher, tree_out, dot_out, node_id
+            )
+        else:
+            tree_out.write(f"\n{item_prefix}{name}")
 
 
 def main():
@@ -188,38 +274,32 @@ def main():
     Main entry point for directory tree visualization.
 
     Orchestrates the entire process:
-    1. Load gitignore rules from .gitignore
-    2. Traverse directory tree from current working directory
-    3. Generate plain text ASCII tree
-    4. Generate Graphviz DOT file
-    5. Write both outputs to files
+    1. Load and compile gitignore rules from .gitignore
+    2. Open vistree.txt and structure.dot for streaming output
+    3. Traverse directory tree from current working directory
+    4. Close the DOT graph
 
     Outputs:
         vistree.txt: Plain text tree visualization
         structure.dot: Graphviz DOT file for diagram generation
     """
     cwd = Path.cwd()
-    gitignore_path = cwd / ".gitignore"
-    gitignore_rules = parse_gitignore(gitignore_path)
-
-    # Accumulators for output
-    tree = []
-    dot_nodes = []
-
-    # Traverse and build both representations
-    traverse_and_print(cwd, "", gitignore_rules, tree, dot_nodes)
-
-    # Write ASCII tree to file
-    with open("vistree.txt", "w", encoding="utf-8") as f:
-        f.write("\n".join(tree))
-
-    # Write DOT file for Graphviz
-    with open("structure.dot", "w") as f:
-        f.write("digraph G {\n")
-        f.write("  rankdir=TB;\n")
-        f.write('  node [shape=box, fontname="Arial"];\n')
-        f.write("\n".join(dot_nodes) + "\n")
-        f.write("}\n")
+    matcher = GitignoreMatcher(parse_gitignore(cwd / ".gitignore"))
+    root = cwd.name
+
+    with (
+        open("vistree.txt", "w", encoding="utf-8") as tree_out,
+        open("structure.dot", "w", encoding="utf-8") as dot_out,
+    ):
+        dot_out.write("digraph G {\n")
+        dot_out.write("  rankdir=TB;\n")
+        dot_out.write('  node [shape=box, fontname="Arial"];\n')
+        dot_out.write(f'"{_dot_id(root)}" [label="{_dot_id(root)}"];\n')
+        tree_out.write(f"{root}/")
+
+        traverse_and_print(str(cwd), "", "", matcher, tree_out, dot_out, root)
+
+        dot_out.write("}\n")
 
     print("✅ Generated vistree.txt and structure.dot")
     print("   To create a visual diagram: dot -Tpng structure.dot -o structure.png")